@@ -0,0 +1,158 @@
+# app/api/controller/debug.py
+import secrets
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from platform_common.errors.base import AuthError, ForbiddenError
+from platform_common.logging.logging import get_logger
+
+from app.core.config import get_service_settings
+from app.db.statements import statement_stats
+from app.internal.drain import drain_controller
+from app.internal.memory import allocation_tracker, memory_report
+from app.internal.metrics import metrics
+from app.internal.prewarm import prewarmer
+from app.internal.startup_profile import startup_profile
+from app.internal.tenants import db_limiter, file_status_fanout
+from app.internal.ws_connections import ws_connections
+
+logger = get_logger("debug")
+
+
+async def require_debug_token(
+    x_debug_token: Optional[str] = Header(default=None),
+) -> None:
+    expected = get_service_settings().debug_token
+    if not expected:
+        raise ForbiddenError("Debug endpoints are disabled")
+    if not x_debug_token or not secrets.compare_digest(x_debug_token, expected):
+        raise AuthError("Invalid debug token")
+
+
+router = APIRouter(dependencies=[Depends(require_debug_token)])
+
+
+@router.get("/startup")
+async def startup_report() -> Dict[str, Any]:
+    """
+    Cold start milestones for this process. For the per-module import
+    breakdown run `python -m app.debug.startup_report`.
+    """
+    return {**startup_profile.report(), "prewarm": prewarmer.report()}
+
+
+@router.get("/metrics")
+async def metrics_snapshot(
+    format: str = Query("json", pattern="^(json|prometheus)$"),
+) -> Response:
+    """
+    In-process counters and gauges (DB pool split, subscriptions, ...).
+    `?format=prometheus` returns the text exposition format for scraping.
+    """
+    if format == "prometheus":
+        return PlainTextResponse(metrics.render_prometheus())
+    return JSONResponse(metrics.snapshot())
+
+
+@router.get("/statements")
+async def statement_report(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|calls|max_ms)$"),
+) -> Dict[str, Any]:
+    """Hottest SQL statements by total time, call count or worst latency."""
+    return {"statements": statement_stats.top(limit, order_by)}
+
+
+@router.post("/statements/reset")
+async def statement_report_reset() -> Dict[str, Any]:
+    statement_stats.reset()
+    return {"ok": True}
+
+
+_CONNECTION_ORDER = (
+    "^(queued_bytes|queued_events|active_subscriptions|rate_per_s|events_total)$"
+)
+
+
+@router.get("/connections")
+async def connection_report(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("queued_bytes", pattern=_CONNECTION_ORDER),
+) -> Dict[str, Any]:
+    """Heaviest websocket connections and users on this process."""
+    s = get_service_settings()
+    return {
+        "connections": ws_connections.heaviest(limit, order_by),
+        "users": ws_connections.by_user(limit),
+        "limits": {
+            "subscriptions_per_connection": s.ws_max_subscriptions_per_connection,
+            "subscriptions_per_user": s.ws_max_subscriptions_per_user,
+            "queue_size": s.ws_subscription_queue_size,
+            "queued_bytes_per_connection": s.ws_max_queued_bytes_per_connection,
+        },
+    }
+
+
+@router.get("/memory")
+async def memory_snapshot(
+    limit: int = Query(20, ge=1, le=500),
+    allocations: bool = Query(True),
+) -> Dict[str, Any]:
+    """
+    Subscriber registry and event bus sizes (deepest keys first), pending
+    tasks, RSS and, while tracemalloc is on, the allocation sites that grew
+    most since the previous call.
+    """
+    report = memory_report(limit)
+    if allocations:
+        report["allocations"] = allocation_tracker.diff(limit)
+    return report
+
+
+@router.post("/memory/tracemalloc")
+async def memory_tracing(
+    enabled: bool = Query(True),
+    frames: int = Query(1, ge=1, le=50),
+) -> Dict[str, Any]:
+    if enabled:
+        allocation_tracker.start(frames)
+    else:
+        allocation_tracker.stop()
+    logger.info(
+        "tracemalloc %s via debug endpoint", "started" if enabled else "stopped"
+    )
+    return {"tracing": allocation_tracker.tracing}
+
+
+@router.get("/tenants")
+async def tenant_report() -> Dict[str, Any]:
+    """
+    Per-tenant DB slots (running / queued) and queued file:status events.
+    Cumulative shares are in the tenant_* counters on /debug/metrics.
+    """
+    return {
+        "db": {
+            "capacity": db_limiter.capacity,
+            "per_tenant": db_limiter.per_tenant,
+            "tenants": db_limiter.snapshot(),
+        },
+        "file_status_fanout": file_status_fanout.depths(),
+    }
+
+
+@router.get("/drain")
+async def drain_status() -> Dict[str, Any]:
+    return drain_controller.status()
+
+
+@router.post("/drain")
+async def drain_start(
+    window_seconds: Optional[float] = Query(None, ge=0, le=3600),
+) -> Dict[str, Any]:
+    """
+    Put this process in drain mode without exiting: no new subscriptions,
+    existing websockets moved off over the window. Irreversible until restart.
+    """
+    drain_controller.start("admin endpoint", window_seconds)
+    return drain_controller.status()
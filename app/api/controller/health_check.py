@@ -1,10 +1,14 @@
 # app/api/controller/health_check.py
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 from platform_common.logging.logging import get_logger, set_request_context
 from platform_common.config.settings import get_settings
 from platform_common.pubsub.factory import get_subscriber
 from redis.asyncio import Redis
 
+from app.internal.drain import drain_controller
+from app.internal.prewarm import prewarmer
+
 router = APIRouter()
 logger = get_logger("health")
 
@@ -29,9 +33,15 @@ async def health_check(request: Request):
         await r.close()
     except Exception as e:
         ok = f"error: {e!r}"
-    return {
+    body = {
         "service": "ed-graphql",
         "redis_url": url,
         "redis_ping": ok,
         "channel": "user:changes",
+        "draining": drain_controller.draining,
+        "prewarm": prewarmer.report(),
     }
+    if drain_controller.draining:
+        # Take the pod out of the load balancer while clients move away.
+        return JSONResponse(body, status_code=503)
+    return body
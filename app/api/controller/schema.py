@@ -0,0 +1,26 @@
+# app/api/controller/schema.py
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse, Response
+from platform_common.errors.base import AuthError
+
+from app.auth.get_current_user import decode_access_token
+from app.graphql.schema_cache import etag_matches, schema_cache
+
+router = APIRouter()
+
+
+@router.get("/schema.graphql")
+async def schema_sdl(request: Request) -> Response:
+    """
+    The schema as SDL, printed once at startup. Same access rule as
+    /graphql (a valid access token), checked without loading the user.
+    """
+    access_token = request.cookies.get("access_token")
+    if not access_token:
+        raise AuthError("Not authenticated")
+    decode_access_token(access_token)
+
+    headers = {"ETag": schema_cache.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), schema_cache.etag):
+        return Response(status_code=304, headers=headers)
+    return PlainTextResponse(schema_cache.sdl, headers=headers)
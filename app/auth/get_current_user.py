@@ -3,10 +3,11 @@
 from fastapi import Request
 from platform_common.auth.jwt_utils import decode_jwt
 from platform_common.db.dal.user_dal import UserDAL
-from platform_common.db.session import get_session
 from platform_common.errors.base import AuthError, NotFoundError
 from platform_common.logging.logging import get_logger
 
+from app.db.routing import get_session
+
 logger = get_logger("graphql_auth")
 
 
@@ -16,19 +17,39 @@ async def get_current_user_from_request(request: Request):
         logger.info("No access_token cookie present on GraphQL request")
         raise AuthError("Not authenticated")
 
+    return await authenticate_access_token(access_token)
+
+
+async def authenticate_access_token(access_token: str):
+    """
+    Decode `access_token` and load its user. Shared by HTTP requests and the
+    websocket handshake.
+    """
+    payload = decode_access_token(access_token)
+    user = await load_user(payload["sub"])
+
+    return {
+        "user": user,
+        "session_id": payload.get("session_id"),
+        "token_payload": payload,
+    }
+
+
+def decode_access_token(access_token: str):
     try:
         payload = decode_jwt(access_token)
     except Exception as e:
         logger.warning(f"Failed to decode access token in GraphQL: {e}")
         raise AuthError("Invalid or expired token")
 
-    user_id = payload.get("sub")
-    session_id = payload.get("session_id")
-
-    if not user_id:
+    if not payload.get("sub"):
         logger.error("JWT payload missing 'sub' (user_id)")
         raise AuthError("Invalid token payload")
 
+    return payload
+
+
+async def load_user(user_id: str):
     # 🔑 Use get_session as an async generator
     async for session in get_session():
         user_dal = UserDAL(session)
@@ -40,8 +61,4 @@ async def get_current_user_from_request(request: Request):
         logger.error(f"User not found in GraphQL for user_id={user_id}")
         raise NotFoundError("User not found")
 
-    return {
-        "user": user,
-        "session_id": session_id,
-        "token_payload": payload,
-    }
+    return user
@@ -0,0 +1,141 @@
+# app/auth/ws_auth.py
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from platform_common.errors.base import NotFoundError
+from platform_common.logging.logging import get_logger
+
+from app.auth.get_current_user import decode_access_token, load_user
+from app.internal.metrics import Sample, metrics
+
+logger = get_logger("graphql_ws_auth")
+
+
+class _CachedUser:
+    """One user row shared by every websocket connection of that user."""
+
+    __slots__ = ("user", "stale", "refs", "lock")
+
+    def __init__(self) -> None:
+        self.user: Any = None
+        self.stale = True
+        self.refs = 0
+        self.lock = asyncio.Lock()
+
+
+_USERS: Dict[str, _CachedUser] = {}
+
+
+class WebSocketIdentity:
+    """
+    Authenticated principal of one websocket connection.
+
+    Created once per socket (cookie handshake or connection_init payload) and
+    shared by every operation multiplexed on it. The user row is cached per
+    user id across connections and only reloaded after `invalidate_user`
+    (fed by user:changes); once the token expires the identity resolves to
+    no user and the client has to reconnect with a fresh token.
+    """
+
+    __slots__ = ("user_id", "session_id", "expires_at", "_released")
+
+    def __init__(
+        self, user_id: str, session_id: Optional[str], expires_at: Optional[float]
+    ) -> None:
+        self.user_id = user_id
+        self.session_id = session_id
+        self.expires_at = expires_at
+        self._released = False
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    async def current_user(self) -> Any:
+        if self._released or self.expired:
+            return None
+
+        entry = _USERS.get(self.user_id)
+        if entry is None:
+            return None
+
+        if entry.stale:
+            async with entry.lock:
+                if entry.stale:
+                    try:
+                        entry.user = await load_user(self.user_id)
+                    except NotFoundError:
+                        entry.user = None
+                    entry.stale = False
+                    metrics.counter("ws_auth_user_loads_total").inc()
+
+        return entry.user
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        entry = _USERS.get(self.user_id)
+        if entry is None:
+            return
+        entry.refs -= 1
+        if entry.refs <= 0:
+            _USERS.pop(self.user_id, None)
+
+
+async def authenticate_connection(access_token: str) -> WebSocketIdentity:
+    """
+    Authenticate a websocket once. Raises AuthError / NotFoundError like the
+    HTTP path; the caller must `release()` the identity when the socket closes.
+    """
+    payload = decode_access_token(access_token)
+    user_id = str(payload["sub"])
+
+    entry = _USERS.get(user_id)
+    if entry is None:
+        entry = _USERS[user_id] = _CachedUser()
+    entry.refs += 1
+
+    exp = payload.get("exp")
+    identity = WebSocketIdentity(
+        user_id=user_id,
+        session_id=payload.get("session_id"),
+        expires_at=float(exp) if exp is not None else None,
+    )
+
+    if await identity.current_user() is None:
+        identity.release()
+        raise NotFoundError("User not found")
+
+    return identity
+
+
+def invalidate_user(user_id: str) -> None:
+    """Force the next operation of every socket of `user_id` to reload it."""
+    entry = _USERS.get(user_id)
+    if entry is not None:
+        entry.stale = True
+        logger.debug("Invalidated cached websocket user_id=%s", user_id)
+
+
+def extract_connection_token(params: Any) -> Optional[str]:
+    """Access token from a connection_init payload, if the client sent one."""
+    if not isinstance(params, dict):
+        return None
+    for key in ("accessToken", "access_token", "token"):
+        value = params.get(key)
+        if isinstance(value, str) and value:
+            return value
+    auth = params.get("Authorization") or params.get("authorization")
+    if isinstance(auth, str) and auth.lower().startswith("bearer "):
+        return auth[7:].strip() or None
+    return None
+
+
+def _collect() -> Iterable[Sample]:
+    yield "ws_auth_cached_users", {}, len(_USERS)
+    yield "ws_auth_connections", {}, sum(e.refs for e in _USERS.values())
+
+
+metrics.register_collector(_collect)
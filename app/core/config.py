@@ -0,0 +1,206 @@
+# app/core/config.py
+from functools import lru_cache
+from typing import Dict, List, Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ServiceSettings(BaseSettings):
+    """
+    Knobs that only this service cares about.
+
+    Shared settings (database, redis, jwt) stay in platform_common's
+    get_settings(); everything here is read from GRAPHQL_* env vars.
+    """
+
+    model_config = SettingsConfigDict(
+        env_prefix="GRAPHQL_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+    # Shared secret for the /debug endpoints; unset disables them entirely.
+    debug_token: Optional[str] = None
+
+    # Start the raw redis tap (app/debug/raw_tap.py) in lifespan.
+    enable_raw_tap: bool = False
+
+    # Rows fetched per round trip when reading from a server-side cursor
+    # (@stream list fields, exports).
+    stream_fetch_size: int = 500
+    # Rows per record batch in Arrow exports (/export/...?format=arrow).
+    export_arrow_batch_rows: int = 65_536
+
+    # Primary database. Unset means platform_common's database; either way
+    # the engine is our own, tuned with the db_* options below.
+    primary_database_url: Optional[str] = None
+
+    # Read replicas for query operations (JSON list of async SQLAlchemy URLs).
+    # Empty means every statement goes to the primary.
+    replica_database_urls: List[str] = []
+    # Replicas lagging more than this are taken out of rotation.
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_interval_seconds: float = 5.0
+    # After a mutation, that user's queries stay on the primary this long.
+    # "redis" shares the marker between pods (a mutation on one pod keeps
+    # the next query on any other off the replicas); "local" is per process.
+    read_your_writes_seconds: float = 10.0
+    read_your_writes_backend: Literal["local", "redis"] = "redis"
+    # Unset: the platform Redis (see resolve_redis_url).
+    read_your_writes_redis_url: Optional[str] = None
+
+    # SQLAlchemy compiled-SQL cache entries per engine.
+    db_compiled_cache_size: int = 1200
+    # Prepared statements kept per asyncpg connection.
+    db_prepared_statement_cache_size: int = 256
+    # "none": direct Postgres or pgbouncer session pooling.
+    # "transaction": pgbouncer transaction pooling (no prepared statement reuse).
+    # "transaction_prepared": pgbouncer >= 1.21 with max_prepared_statements.
+    db_pgbouncer_mode: Literal["none", "transaction", "transaction_prepared"] = "none"
+    # Record per-statement call counts and latency (/debug/statements).
+    db_statement_stats: bool = True
+    # Return per-operation DB statement counts in `extensions.dbQueries` for
+    # every request (otherwise only for requests with a valid X-Debug-Token).
+    debug_query_counts: bool = False
+
+    # Items accepted by one createDatasets / attachDatasetsToProjects call.
+    bulk_max_items: int = 500
+
+    # Mutations sent with an Idempotency-Key header (or an `idempotencyKey`
+    # request extension) run once per user and key; retries within the TTL
+    # get the stored response. "local" is per process, "redis" shared.
+    idempotency_backend: Literal["local", "redis"] = "local"
+    # Unset: the platform Redis (see resolve_redis_url).
+    idempotency_redis_url: Optional[str] = None
+    idempotency_ttl_seconds: float = 24 * 3600
+    # How long a duplicate waits for the first request before giving up,
+    # and how long a redis claim outlives a pod that died mid-request.
+    idempotency_wait_seconds: float = 30.0
+    idempotency_lock_seconds: float = 120.0
+    idempotency_max_keys: int = 10_000
+
+    # Tenant isolation (tenant = organization, or the user without one).
+    # GraphQL queries and mutations take one of `tenant_db_slots`, at most
+    # `tenant_max_db_slots` per tenant; when all are taken, waiters are
+    # admitted by weighted fair queuing (weights by tenant key, e.g.
+    # {"org:<id>": 2}, default 1) and fail with TENANT_BUSY after
+    # `tenant_db_wait_seconds`. Off (0) by default: a slot is held for the
+    # whole operation, so this caps concurrent operations per pod. When
+    # enabling it, size it to at least the primary pool (pool size plus
+    # overflow).
+    tenant_db_slots: int = 0
+    tenant_max_db_slots: int = 8
+    tenant_db_wait_seconds: float = 10.0
+    tenant_weights: Dict[str, float] = {}
+    # file:status fan-out: per-tenant queues drained round robin by this many
+    # workers, running at most `tenant_fanout_concurrency` events of one
+    # tenant at a time; a full tenant queue drops its oldest event.
+    tenant_fanout_workers: int = 4
+    tenant_fanout_concurrency: int = 1
+    tenant_fanout_queue_size: int = 10_000
+
+    # Websocket subscription caps; starting one more is rejected with a
+    # SUBSCRIPTION_LIMIT error.
+    ws_max_subscriptions_per_connection: int = 20
+    ws_max_subscriptions_per_user: int = 100
+    # Events buffered per subscription, and bytes per connection, before new
+    # events for that client are dropped.
+    ws_subscription_queue_size: int = 256
+    ws_max_queued_bytes_per_connection: int = 4 * 1024 * 1024
+    # Slow consumers: past the first pair of thresholds (queued events, age
+    # of the oldest one) a subscription's backlog is coalesced; past the
+    # second it is evicted and the websocket closed with 4008.
+    ws_slow_consumer_depth: int = 50
+    ws_slow_consumer_age_seconds: float = 2.0
+    ws_evict_consumer_depth: int = 200
+    ws_evict_consumer_age_seconds: float = 15.0
+
+    # graphql-transport-ws keepalive: ping this often (0 disables) and close
+    # sockets that send nothing back within the timeout. graphql-ws (legacy)
+    # sockets get a `ka` message at the same interval.
+    ws_ping_interval_seconds: float = 20.0
+    ws_pong_timeout_seconds: float = 10.0
+    # Close sockets without that ping/pong keepalive (graphql-ws ones, or all
+    # of them with pings disabled) after this long without a frame from the
+    # client (0 disables). graphql-ws clients that only listen send nothing,
+    # so they are closed too and reconnect.
+    ws_idle_timeout_seconds: float = 300.0
+    # How often subscriber registries are swept for orphaned queues.
+    ws_sweep_interval_seconds: float = 30.0
+
+    # Trace allocations from startup so /debug/memory can report the top
+    # allocation sites (costs memory and CPU; it can also be started later
+    # with POST /debug/memory/tracemalloc). Frames kept per traceback.
+    debug_tracemalloc: bool = False
+    debug_tracemalloc_frames: int = 1
+
+    # Encoder for GraphQL HTTP responses and websocket frames. "orjson" falls
+    # back to the stdlib per message when orjson rejects a value (e.g. a
+    # BigInt beyond 64 bits) and entirely when orjson is not installed.
+    json_encoder: Literal["orjson", "stdlib"] = "orjson"
+
+    # Transport for file:status and upload_session:status. "pubsub" uses
+    # platform_common's subscriber; "streams" reads Redis Streams through a
+    # per-pod consumer group (app/pubsub/streams.py).
+    pubsub_transport: Literal["pubsub", "streams"] = "pubsub"
+    # Unset: the platform Redis (see resolve_redis_url).
+    streams_redis_url: Optional[str] = None
+    # One group per pod, with a name that is stable across its restarts, or
+    # events published while it is down are never read. Unset derives it
+    # from the hostname, which then has to be a StatefulSet pod name
+    # (<set>-<ordinal>); startup fails otherwise.
+    streams_group: Optional[str] = None
+    streams_batch_size: int = 100
+    streams_block_ms: int = 5000
+    # Approximate cap (XTRIM MAXLEN ~) applied to each stream.
+    streams_maxlen: int = 100_000
+    # Where a new consumer group starts: "$" = new entries only, "0" = all.
+    streams_start_id: str = "$"
+    # Other pods' groups this far behind the stream are deleted on startup
+    # (0 keeps them); a pod that comes back later starts from
+    # `streams_start_id`.
+    streams_stale_group_seconds: float = 86_400.0
+
+    # Drain mode (SIGTERM or POST /debug/drain): websockets are closed at
+    # random points over this window, each told to wait a random delay of up
+    # to the jitter before reconnecting. Keep terminationGracePeriodSeconds
+    # above the window.
+    drain_window_seconds: float = 30.0
+    drain_reconnect_jitter_seconds: float = 10.0
+
+    # Recent file status events kept per datastore for `afterSeq` replay, and
+    # how many datastores keep a log at all (least recently active dropped).
+    event_log_size: int = 1000
+    event_log_max_streams: int = 10_000
+
+    # Startup prewarm (app/internal/prewarm.py), run in lifespan before the
+    # service takes traffic: pool connections opened per engine, and the
+    # metrics cache filled for the N datastores with the most recent uploads
+    # (0 = skip; also skipped when the metrics cache is off).
+    prewarm_enabled: bool = True
+    prewarm_pool_connections: int = 5
+    prewarm_top_datastores: int = 0
+    # Startup goes ahead with whatever is warm by then.
+    prewarm_timeout_seconds: float = 30.0
+
+    # How long replica-read datastore metrics are served from memory
+    # (0 = always recompute). Dropped early when this pod sees an update.
+    datastore_metrics_cache_seconds: float = 5.0
+
+
+@lru_cache
+def get_service_settings() -> ServiceSettings:
+    return ServiceSettings()
+
+
+def resolve_redis_url(url: Optional[str] = None) -> str:
+    """
+    `url` if set, otherwise the platform Redis from platform_common's
+    settings, which the pubsub subscribers and the health check use.
+    """
+    if url:
+        return url
+    from platform_common.config.settings import get_settings
+
+    s = get_settings()
+    return getattr(s, "redis_url_effective", s.redis_url)
@@ -0,0 +1,63 @@
+# app/db/cursors.py
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy.sql import Select
+
+from app.core.config import get_service_settings
+from app.db.routing import create_session
+
+
+async def stream_scalars(
+    stmt: Select[Any],
+    fetch_size: Optional[int] = None,
+    role: Optional[str] = None,
+) -> AsyncIterator[Any]:
+    """
+    Yield ORM objects for `stmt` from a server-side cursor.
+
+    Rows are pulled from Postgres `fetch_size` at a time, so the first rows
+    reach the caller before the full result set has been read and memory stays
+    bounded by one batch.
+
+    Each stream gets its own session: a cursor stays open for as long as the
+    consumer keeps reading, and AsyncSession cannot be shared with the other
+    resolvers that run concurrently for the same request. Closing the iterator
+    early (client cancelled, @stream abandoned) closes the cursor and session.
+
+    `role` pins the session to a pool (see app.db.routing); by default it
+    follows the current GraphQL operation.
+    """
+    if fetch_size is None:
+        fetch_size = get_service_settings().stream_fetch_size
+
+    async with await create_session(role) as session:
+        result = await session.stream_scalars(
+            stmt.execution_options(yield_per=fetch_size)
+        )
+        try:
+            async for obj in result:
+                yield obj
+        finally:
+            await result.close()
+
+
+async def stream_row_batches(
+    stmt: Select[Any],
+    batch_size: int,
+    fetch_size: Optional[int] = None,
+    role: Optional[str] = None,
+) -> AsyncIterator[Sequence[Any]]:
+    """
+    Like stream_scalars, but yields plain rows (no ORM objects) in lists of
+    `batch_size`, for exports that build columnar batches from them.
+    """
+    if fetch_size is None:
+        fetch_size = get_service_settings().stream_fetch_size
+
+    async with await create_session(role) as session:
+        result = await session.stream(stmt.execution_options(yield_per=fetch_size))
+        try:
+            async for rows in result.partitions(batch_size):
+                yield rows
+        finally:
+            await result.close()
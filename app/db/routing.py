@@ -0,0 +1,328 @@
+# app/db/routing.py
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.orm.session import Session
+
+from platform_common.db.engine import get_engine
+from platform_common.logging.logging import get_logger
+
+from app.core.config import get_service_settings, resolve_redis_url
+from app.db.statements import engine_options, query_counter, statement_stats
+from app.internal.metrics import Sample, metrics
+
+logger = get_logger("db_routing")
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+# Which pool reads in the current operation should use. Defaults to the
+# primary; DatabaseRoutingExtension flips it to REPLICA for query operations.
+_db_role: ContextVar[str] = ContextVar("db_role", default=PRIMARY)
+
+_LAG_SQL = text(
+    "SELECT COALESCE(" "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+)
+
+
+@dataclass
+class ReplicaState:
+    name: str
+    engine: AsyncEngine
+    lag_seconds: float = 0.0
+    healthy: bool = True
+
+
+class EngineRouter:
+    """
+    Owns the primary engine (GRAPHQL_PRIMARY_DATABASE_URL, or platform_common's
+    database) and the replica engines, and decides which one a statement
+    goes to. Every engine is created with engine_options().
+
+    Replicas are used round-robin. A replica whose replay lag exceeds
+    GRAPHQL_REPLICA_MAX_LAG_SECONDS, or whose lag check failed, is skipped
+    until the next check; with no usable replica, reads fall back to the
+    primary.
+    """
+
+    def __init__(self) -> None:
+        self._primary: Optional[AsyncEngine] = None
+        self._replicas: List[ReplicaState] = []
+        self._rr = itertools.count()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def primary(self) -> AsyncEngine:
+        if self._primary is None:
+            raise RuntimeError("EngineRouter used before start()")
+        return self._primary
+
+    @property
+    def replicas(self) -> List[ReplicaState]:
+        return self._replicas
+
+    async def start(self) -> None:
+        if self._primary is not None:
+            return
+        async with self._start_lock:
+            if self._primary is not None:
+                return
+            settings = get_service_settings()
+            self._replicas = [
+                ReplicaState(
+                    name=f"replica-{i}",
+                    engine=create_async_engine(url, **engine_options()),
+                )
+                for i, url in enumerate(settings.replica_database_urls)
+            ]
+            # platform_common's engine is built without engine_options(), so
+            # only its URL is reused: under pgbouncer transaction pooling its
+            # prepared statements would break.
+            url = settings.primary_database_url or (await get_engine()).url
+            self._primary = create_async_engine(url, **engine_options())
+
+            for engine in [self._primary, *(r.engine for r in self._replicas)]:
+                query_counter.attach(engine)
+                if settings.db_statement_stats:
+                    statement_stats.attach(engine)
+            logger.info("DB routing started with %d replica(s)", len(self._replicas))
+
+    def pick_read_engine(self) -> Tuple[str, AsyncEngine]:
+        healthy = [r for r in self._replicas if r.healthy]
+        if not healthy:
+            return PRIMARY, self.primary
+        replica = healthy[next(self._rr) % len(healthy)]
+        return replica.name, replica.engine
+
+    async def check_lag(self) -> None:
+        max_lag = get_service_settings().replica_max_lag_seconds
+        for replica in self._replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    lag = float((await conn.execute(_LAG_SQL)).scalar_one())
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning("Replica %s lag check failed: %r", replica.name, e)
+                replica.healthy = False
+                continue
+
+            replica.lag_seconds = lag
+            was_healthy = replica.healthy
+            replica.healthy = lag <= max_lag
+            if was_healthy != replica.healthy:
+                logger.info(
+                    "Replica %s %s (lag=%.2fs, max=%.2fs)",
+                    replica.name,
+                    "back in rotation" if replica.healthy else "taken out",
+                    lag,
+                    max_lag,
+                )
+
+    async def run_lag_monitor(self) -> None:
+        """Background task started by lifespan when replicas are configured."""
+        interval = get_service_settings().replica_lag_check_interval_seconds
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self._replicas:
+            await replica.engine.dispose()
+        if self._primary is not None:
+            await self._primary.dispose()
+
+    def engines(self) -> List[Tuple[str, AsyncEngine]]:
+        """Primary and replica engines, by pool name (empty before start())."""
+        if self._primary is None:
+            return []
+        return [(PRIMARY, self._primary), *((r.name, r.engine) for r in self._replicas)]
+
+    def collect(self) -> Iterable[Sample]:
+        for name, engine in self.engines():
+            pool: Any = engine.sync_engine.pool
+            if hasattr(pool, "checkedout"):
+                yield "db_pool_checked_out", {"pool": name}, pool.checkedout()
+                yield "db_pool_size", {"pool": name}, pool.size()
+        for r in self._replicas:
+            yield "db_replica_lag_seconds", {"pool": r.name}, r.lag_seconds
+            yield "db_replica_healthy", {"pool": r.name}, 1.0 if r.healthy else 0.0
+
+
+engine_router = EngineRouter()
+metrics.register_collector(engine_router.collect)
+
+
+def _is_read(clause: Any) -> bool:
+    """Plain SELECTs only: text() may write and FOR UPDATE takes row locks."""
+    return bool(getattr(clause, "is_select", False)) and (
+        getattr(clause, "_for_update_arg", None) is None
+    )
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads of REPLICA-routed operations to a replica.
+
+    Writes, flushes, anything that is not a plain SELECT (text(),
+    SELECT ... FOR UPDATE) and everything outside a REPLICA-routed operation
+    go to the primary. The replica is picked on the session's first read and
+    kept in `session.info["read_engine"]`, so all its reads see one replica;
+    after a statement went to the primary, reads follow it there and see
+    what the session wrote. `session.info["db_role"]` pins a session to one
+    role regardless of the current operation (used by non-GraphQL readers
+    such as exports).
+    """
+
+    def get_bind(  # type: ignore[override]
+        self, mapper: Any = None, clause: Any = None, **kw: Any
+    ) -> Engine:
+        role = self.info.get("db_role") or _db_role.get()
+        if role == REPLICA and not self._flushing and _is_read(clause):
+            read_engine = self.info.get("read_engine")
+            if read_engine is None:
+                read_engine = self.info["read_engine"] = (
+                    engine_router.pick_read_engine()
+                )
+            name, engine = read_engine
+        else:
+            name, engine = PRIMARY, engine_router.primary
+            if role == REPLICA:
+                self.info["read_engine"] = (name, engine)
+
+        metrics.counter("db_statements_routed_total", pool=name).inc()
+        return engine.sync_engine
+
+
+async def create_session(role: Optional[str] = None) -> AsyncSession:
+    await engine_router.start()
+    info: Dict[str, Any] = {"db_role": role} if role else {}
+    return AsyncSession(
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info=info,
+    )
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Drop-in replacement for platform_common.db.session.get_session that
+    routes reads according to the current operation.
+    """
+    session = await create_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def has_replicas() -> bool:
+    return bool(engine_router.replicas)
+
+
+def read_role() -> str:
+    """Role reads of the current operation go to (sessions not pinned)."""
+    return _db_role.get()
+
+
+@contextmanager
+def route_reads(role: str) -> Iterator[None]:
+    token = _db_role.set(role)
+    try:
+        yield
+    finally:
+        _db_role.reset(token)
+
+
+# ─────────────────────────────────────────
+# Read-your-writes
+# ─────────────────────────────────────────
+
+
+class LocalWriteMarks:
+    """
+    Per process: only queries that land on the pod that ran the mutation
+    stay on the primary. For a single pod, or tests.
+    """
+
+    MAX_USERS = 10_000
+
+    def __init__(self) -> None:
+        self._last_write_at: Dict[str, float] = {}
+
+    async def note_write(self, user_id: str, window: float) -> None:
+        now = time.monotonic()
+        self._last_write_at[user_id] = now
+        if len(self._last_write_at) > self.MAX_USERS:
+            for uid, at in list(self._last_write_at.items()):
+                if now - at > window:
+                    del self._last_write_at[uid]
+
+    async def wrote_recently(self, user_id: str, window: float) -> bool:
+        at = self._last_write_at.get(user_id)
+        return at is not None and time.monotonic() - at <= window
+
+
+class RedisWriteMarks:
+    """
+    Shared across pods: one key per user, expiring with the window, so a
+    query reaching any pod after a mutation on another reads the primary.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ryw:") -> None:
+        self._client = client
+        self._prefix = prefix
+
+    async def note_write(self, user_id: str, window: float) -> None:
+        await self._client.set(self._prefix + user_id, "1", px=int(window * 1000))
+
+    async def wrote_recently(self, user_id: str, window: float) -> bool:
+        return bool(await self._client.exists(self._prefix + user_id))
+
+
+@lru_cache(maxsize=1)
+def get_write_marks() -> Any:
+    settings = get_service_settings()
+    if settings.read_your_writes_backend == "redis":
+        url = resolve_redis_url(settings.read_your_writes_redis_url)
+        return RedisWriteMarks(Redis.from_url(url, decode_responses=True))
+    return LocalWriteMarks()
+
+
+async def note_write(user_id: str) -> None:
+    """Record that `user_id` just ran a mutation."""
+    window = get_service_settings().read_your_writes_seconds
+    try:
+        await get_write_marks().note_write(user_id, window)
+    except Exception as e:
+        # The mutation itself went through; only the follow-up routing
+        # may read a replica that has not caught up.
+        logger.warning("Could not record write by user %s: %r", user_id, e)
+
+
+async def wrote_recently(user_id: str) -> bool:
+    window = get_service_settings().read_your_writes_seconds
+    try:
+        return await get_write_marks().wrote_recently(user_id, window)
+    except Exception as e:
+        logger.warning("Could not check recent writes by user %s: %r", user_id, e)
+        return True  # unknown: read the primary
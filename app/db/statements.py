@@ -0,0 +1,276 @@
+# app/db/statements.py
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_service_settings
+from app.internal.metrics import Sample, metrics
+
+# `IN ($1, $2, $3)` renders a different string per list length; fold them so
+# one logical statement is one row in the report.
+_IN_LIST = re.compile(r"\(\s*\$\d+(?:\s*,\s*\$\d+)+\s*\)")
+_WS = re.compile(r"\s+")
+
+OTHER_STATEMENTS = "<other>"
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options() -> Dict[str, Any]:
+    """
+    create_async_engine() kwargs for engines this service creates itself.
+
+    SQLAlchemy caches compiled SQL per engine (`query_cache_size`) and the
+    asyncpg dialect prepares statements once per connection
+    (`prepared_statement_cache_size`). Behind pgbouncer in transaction mode a
+    statement prepared on one server connection may not exist on the next
+    one, so there we use unique statement names and no prepared statement
+    cache. pgbouncer >= 1.21 with `max_prepared_statements` set tracks
+    prepared statements itself; `transaction_prepared` keeps reuse on for
+    that setup.
+    """
+    s = get_service_settings()
+    connect_args: Dict[str, Any] = {}
+    if s.db_pgbouncer_mode == "transaction":
+        connect_args["prepared_statement_name_func"] = _unique_statement_name
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["statement_cache_size"] = 0
+    else:
+        connect_args["prepared_statement_cache_size"] = (
+            s.db_prepared_statement_cache_size
+        )
+    return {
+        "pool_pre_ping": True,
+        "query_cache_size": s.db_compiled_cache_size,
+        "connect_args": connect_args,
+    }
+
+
+def normalize_sql(statement: str) -> str:
+    return _IN_LIST.sub("($n...)", _WS.sub(" ", statement).strip())
+
+
+@dataclass
+class StatementStat:
+    sql: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    compiled_cache_hits: int = 0
+    compiled_cache_misses: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class StatementStats:
+    """
+    Per-statement call counts and latency, fed by engine cursor events.
+
+    Covers every statement on an attached engine, including the
+    platform_common DAL queries we cannot change. Latency is the
+    cursor.execute round trip as seen by the client. Compiled-cache hits
+    come from SQLAlchemy's own cache bookkeeping, so a statement that keeps
+    missing is one that is being rebuilt in a non-cacheable way.
+    """
+
+    def __init__(self, max_statements: int = 500) -> None:
+        self.max_statements = max_statements
+        self._stats: Dict[str, StatementStat] = {}
+        self._attached: Set[int] = set()
+
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        if id(sync_engine) in self._attached:
+            return
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        self._attached.add(id(sync_engine))
+
+    def _before(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault("statement_t0", []).append(time.perf_counter())
+
+    def _after(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started = conn.info.get("statement_t0")
+        if not started:
+            return
+        self.record(
+            statement,
+            (time.perf_counter() - started.pop()) * 1000.0,
+            getattr(context, "cache_hit", None),
+        )
+
+    def record(self, statement: str, elapsed_ms: float, cache_hit: Any = None) -> None:
+        key = normalize_sql(statement)
+        stat = self._stats.get(key)
+        if stat is None:
+            if len(self._stats) >= self.max_statements:
+                key = OTHER_STATEMENTS
+                stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = StatementStat(sql=key)
+
+        stat.calls += 1
+        stat.total_ms += elapsed_ms
+        if elapsed_ms > stat.max_ms:
+            stat.max_ms = elapsed_ms
+        if cache_hit is CACHE_HIT:
+            stat.compiled_cache_hits += 1
+        elif cache_hit is CACHE_MISS:
+            stat.compiled_cache_misses += 1
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        rows = sorted(
+            self._stats.values(),
+            key=lambda s: getattr(s, order_by),
+            reverse=True,
+        )[:limit]
+        return [{**asdict(s), "mean_ms": round(s.mean_ms, 3)} for s in rows]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def collect(self) -> Iterable[Sample]:
+        hits = sum(s.compiled_cache_hits for s in self._stats.values())
+        misses = sum(s.compiled_cache_misses for s in self._stats.values())
+        yield "db_compiled_cache_hits_total", {}, hits
+        yield "db_compiled_cache_misses_total", {}, misses
+        yield "db_distinct_statements", {}, len(self._stats)
+
+
+statement_stats = StatementStats()
+metrics.register_collector(statement_stats.collect)
+
+
+# ─────────────────────────────────────────
+# Per-operation query counts
+# ─────────────────────────────────────────
+
+
+class QueryCount:
+    """Statements issued while one `count_queries()` block was active."""
+
+    __slots__ = ("statements", "round_trips", "elapsed_ms", "by_statement", "parent")
+
+    def __init__(self, parent: Optional["QueryCount"] = None) -> None:
+        # Enclosing count_queries() block, which also gets our statements.
+        self.parent = parent
+        # executemany() sends many parameter sets in one round trip.
+        self.statements = 0
+        self.round_trips = 0
+        self.elapsed_ms = 0.0
+        self.by_statement: Dict[str, int] = {}
+
+    def record(self, statement: str, parameter_sets: int, elapsed_ms: float) -> None:
+        self.statements += parameter_sets
+        self.round_trips += 1
+        self.elapsed_ms += elapsed_ms
+        key = normalize_sql(statement)
+        self.by_statement[key] = self.by_statement.get(key, 0) + 1
+        if self.parent is not None:
+            self.parent.record(statement, parameter_sets, elapsed_ms)
+
+    def as_dict(self, top: int = 5) -> Dict[str, Any]:
+        repeated = sorted(self.by_statement.items(), key=lambda kv: -kv[1])[:top]
+        return {
+            "statements": self.statements,
+            "roundTrips": self.round_trips,
+            "elapsedMs": round(self.elapsed_ms, 3),
+            "distinct": len(self.by_statement),
+            "top": [{"sql": sql, "count": n} for sql, n in repeated],
+        }
+
+
+_query_count: ContextVar[Optional[QueryCount]] = ContextVar("query_count", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """
+    Count statements run by this task and the tasks it starts (resolvers run
+    as child tasks of the operation) on engines with `query_counter`
+    attached. Blocks nest: statements count towards every enclosing block
+    as well, e.g. a test's block around QueryCountExtension's own.
+    """
+    counts = QueryCount(_query_count.get())
+    token = _query_count.set(counts)
+    try:
+        yield counts
+    finally:
+        _query_count.reset(token)
+
+
+class OperationQueryCounter:
+    """
+    Engine hook feeding `count_queries()`; a context variable lookup per
+    statement when nothing is counting.
+    """
+
+    def __init__(self) -> None:
+        self._attached: Set[int] = set()
+
+    def attach(self, engine: Any) -> None:
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if id(sync_engine) in self._attached:
+            return
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        self._attached.add(id(sync_engine))
+
+    def _before(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if _query_count.get() is not None:
+            conn.info.setdefault("query_count_t0", []).append(time.perf_counter())
+
+    def _after(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        counts = _query_count.get()
+        started = conn.info.get("query_count_t0")
+        if counts is None or not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000.0
+        counts.record(statement, len(parameters) if executemany else 1, elapsed_ms)
+
+
+query_counter = OperationQueryCounter()
@@ -0,0 +1,13 @@
+# app/debug/__init__.py
+#
+# Debug helpers are only imported when actually enabled.
+from app.internal.lazy import lazy_exports
+
+__getattr__ = lazy_exports(
+    globals(),
+    {
+        "start_raw_tap": "app.debug.raw_tap",
+    },
+)
+
+__all__ = ["start_raw_tap"]
@@ -0,0 +1,116 @@
+# app/debug/startup_report.py
+"""
+Import-time breakdown for a cold start of the service.
+
+    python -m app.debug.startup_report [--target app.main] [--top 25]
+
+Runs the target import in a fresh interpreter with ``-X importtime`` so the
+numbers are not skewed by modules already loaded in this process.
+"""
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parse the stderr of ``python -X importtime``.
+
+    Lines look like ``import time:       123 |        456 |   package.mod``;
+    the indentation of the module name encodes nesting depth.
+    """
+    timings: List[ImportTiming] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        raw_self, raw_cumulative, raw_name = parts
+        try:
+            self_us = int(raw_self.strip())
+            cumulative_us = int(raw_cumulative.strip())
+        except ValueError:
+            # header line: "self [us] | cumulative | imported package"
+            continue
+        name = raw_name.rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        timings.append(ImportTiming(stripped, self_us, cumulative_us, depth))
+    return timings
+
+
+def collect_import_times(
+    target: str = "app.main", cwd: Optional[str] = None
+) -> List[ImportTiming]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["<no output>"]
+        raise RuntimeError(f"importing {target} failed: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def total_import_ms(timings: List[ImportTiming], target: str = "app.main") -> float:
+    for t in timings:
+        if t.module == target:
+            return t.cumulative_us / 1000.0
+    raise KeyError(f"{target} not found in import timings")
+
+
+def self_time_by_package(timings: List[ImportTiming]) -> Dict[str, float]:
+    """Self time in ms grouped by top-level package, largest first."""
+    totals: Dict[str, float] = {}
+    for t in timings:
+        top = t.module.split(".", 1)[0]
+        totals[top] = totals.get(top, 0.0) + t.self_us / 1000.0
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def format_report(
+    timings: List[ImportTiming], target: str = "app.main", top: int = 25
+) -> str:
+    lines = [f"Total import of {target}: {total_import_ms(timings, target):.1f} ms", ""]
+
+    lines.append("Self time by top-level package (ms):")
+    for package, ms in list(self_time_by_package(timings).items())[:top]:
+        lines.append(f"  {ms:10.1f}  {package}")
+
+    lines.append("")
+    lines.append(f"Slowest {top} modules by cumulative time (ms):")
+    slowest = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]
+    for t in slowest:
+        lines.append(
+            f"  {t.cumulative_us / 1000.0:10.1f}  "
+            f"(self {t.self_us / 1000.0:7.1f})  {t.module}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    timings = collect_import_times(args.target)
+    print(format_report(timings, args.target, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,11 @@ from strawberry.fastapi.context import BaseContext
 
 
 from app.auth.get_current_user import get_current_user_from_request
+from app.auth.ws_auth import WebSocketIdentity, authenticate_connection
+from platform_common.errors.base import AuthError, NotFoundError
 from platform_common.logging.logging import get_logger
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
-from platform_common.db.engine import get_engine
 
 from platform_common.db.dal.dataset_dal import DatasetDAL
 from platform_common.db.dal.dataset_item_dal import DatasetItemDAL
@@ -18,6 +18,8 @@ from platform_common.db.dal.project_dal import ProjectDAL
 from platform_common.db.dal.file_dal import FileDAL
 from platform_common.db.dal.dataset_file_link_dal import DatasetFileLinkDAL
 
+from app.db.routing import create_session
+from app.internal.ws_connections import ws_connections
 
 logger = get_logger("graphql_context")
 
@@ -37,13 +39,8 @@ class GraphQLContext(BaseContext):
 
 
 async def create_db_session() -> AsyncSession:
-    engine = await get_engine()
-    async_session_factory = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-    return async_session_factory()
+    # Reads of query operations go to one replica, everything else to the primary.
+    return await create_session()
 
 
 async def get_context(request: Request = None, websocket: WebSocket = None):
@@ -67,10 +64,28 @@ async def get_context(request: Request = None, websocket: WebSocket = None):
             return
 
         if websocket is not None:
-            yield GraphQLContext(
+            # Authenticate once per socket. The cookie from the handshake is
+            # tried here; otherwise AppGraphQLRouter.on_ws_connect looks at
+            # the connection_init payload. Operations then share this identity.
+            identity: Optional[WebSocketIdentity] = None
+            access_token = websocket.cookies.get("access_token")
+            if access_token:
+                try:
+                    identity = await authenticate_connection(access_token)
+                except (AuthError, NotFoundError) as e:
+                    logger.info("Websocket cookie auth failed: %r", e)
+
+            ctx = GraphQLContext(
                 request=websocket,
-                current_user=None,
-                session_id=None,
+                current_user=await identity.current_user() if identity else None,
+                session_id=identity.session_id if identity else None,
+                ws_identity=identity,
+                # Lets drain, slow-consumer eviction and the idle reaper
+                # close this socket from outside its handler.
+                ws_connection=ws_connections.open(
+                    identity.user_id if identity else None,
+                    closer=lambda code, reason: websocket.close(code, reason),
+                ),
                 db_session=session,
                 dataset_dal=DatasetDAL(session),
                 dataset_item_dal=DatasetItemDAL(session),
@@ -78,6 +93,12 @@ async def get_context(request: Request = None, websocket: WebSocket = None):
                 project_dal=ProjectDAL(session),
                 file_dal=FileDAL(session),
             )
+            try:
+                yield ctx
+            finally:
+                ws_connections.close(ctx.ws_connection)
+                if ctx.ws_identity is not None:
+                    ctx.ws_identity.release()
 
             return
 
@@ -1,6 +1,7 @@
 # app/graphql/dashboard/mutation.py
 import strawberry
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List
+from sqlalchemy import select
 from strawberry.types import Info
 
 from platform_common.db.dal.dataset_dal import DatasetDAL
@@ -8,15 +9,51 @@ from platform_common.db.dal.dataset_item_dal import DatasetItemDAL
 from platform_common.db.dal.project_dataset_link_dal import ProjectDatasetLinkDAL
 from platform_common.db.dal.project_dal import ProjectDAL
 from platform_common.db.dal.file_dal import FileDAL
-from platform_common.db.session import get_session
 from platform_common.errors.base import AuthError, ForbiddenError, NotFoundError
 from platform_common.models.dataset import Dataset
 from platform_common.models.dataset_item import DatasetItem
+from platform_common.models.datastore import Datastore
+from platform_common.models.project import Project
+from platform_common.models.project_dataset_link import ProjectDatasetLink
 from platform_common.utils.time_helpers import to_datetime_utc
 from platform_common.db.dal.dataset_file_link_dal import DatasetFileLinkDAL
 
+from app.core.config import get_service_settings
+from app.db.routing import get_session
+from app.graphql.schema.dataset_schema import (
+    AttachDatasetInput,
+    BulkDatasetResult,
+    BulkItemError,
+    DatasetType,
+    CreateDatasetInput,
+)
+from app.internal.bulk import (
+    ItemError,
+    apply_atomic,
+    check_limit,
+    new_pairs,
+    plan_attach,
+    plan_create,
+)
 
-from app.graphql.schema.dataset_schema import DatasetType, CreateDatasetInput
+
+async def _load_by_ids(session, model, ids: Iterable[str]) -> Dict[str, Any]:
+    """One `WHERE id IN (...)` for all ids, keyed by id."""
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    result = await session.execute(select(model).where(model.id.in_(ids)))
+    return {str(row.id): row for row in result.scalars()}
+
+
+def _bulk_result(
+    index: int, dataset: Optional[Dataset], error: Optional[ItemError]
+) -> BulkDatasetResult:
+    if error is not None:
+        return BulkDatasetResult(
+            index=index, error=BulkItemError(code=error.code, message=error.message)
+        )
+    return BulkDatasetResult(index=index, dataset=DatasetType.from_model(dataset))
 
 
 @strawberry.type
@@ -154,3 +191,133 @@ class DashboardMutation:
             break
 
         return DatasetType.from_model(updated)
+
+    @strawberry.mutation
+    async def createDatasets(
+        self,
+        info: Info,
+        input: List[CreateDatasetInput],
+        atomic: bool = False,
+    ) -> List[BulkDatasetResult]:
+        """
+        createDataset for many items in one transaction: datastore and
+        project ownership are checked with one query each for all items,
+        datasets and project links
+        are written with one multi-row insert each. Invalid items get an
+        error in their result; with `atomic` nothing is written unless every
+        item is valid.
+        """
+        current_user = info.context.get("current_user")
+        if not current_user:
+            raise AuthError("Not authenticated")
+        check_limit(input, get_service_settings().bulk_max_items)
+
+        datastore_ids = [str(i.datastore_id) for i in input]
+        project_ids = [str(i.project_id) if i.project_id else None for i in input]
+
+        async for session in get_session():
+            datastores = await _load_by_ids(session, Datastore, datastore_ids)
+            projects = await _load_by_ids(session, Project, filter(None, project_ids))
+            errors = plan_create(
+                datastore_ids,
+                project_ids,
+                [i.name for i in input],
+                datastores,
+                projects,
+                current_user.id,
+            )
+            if atomic:
+                errors = apply_atomic(errors)
+
+            created: Dict[int, Dataset] = {
+                index: Dataset(
+                    datastore_id=datastore_ids[index],
+                    name=item.name,
+                    description=item.description,
+                    owner_id=current_user.id,
+                )
+                for index, (item, error) in enumerate(zip(input, errors))
+                if error is None
+            }
+            created_ids: Dict[int, str] = {}
+            try:
+                if created:
+                    session.add_all(created.values())
+                    # Datasets first: the links reference them.
+                    await session.flush()
+                    session.add_all(
+                        ProjectDatasetLink(
+                            project_id=project_ids[index], dataset_id=dataset.id
+                        )
+                        for index, dataset in created.items()
+                        if project_ids[index]
+                    )
+                # Read before commit expires the instances.
+                created_ids = {index: str(d.id) for index, d in created.items()}
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+            # Reload to pick up server-side defaults (created_at, ...).
+            rows = await _load_by_ids(session, Dataset, created_ids.values())
+            break
+
+        return [
+            _bulk_result(index, rows.get(created_ids.get(index, "")), errors[index])
+            for index in range(len(input))
+        ]
+
+    @strawberry.mutation
+    async def attachDatasetsToProjects(
+        self,
+        info: Info,
+        input: List[AttachDatasetInput],
+        atomic: bool = False,
+    ) -> List[BulkDatasetResult]:
+        """
+        attachDatasetToProject for many pairs in one transaction, with the
+        same set-based checks and per-item errors as createDatasets. Pairs
+        that are already linked succeed without a new row.
+        """
+        current_user = info.context.get("current_user")
+        if not current_user:
+            raise AuthError("Not authenticated")
+        check_limit(input, get_service_settings().bulk_max_items)
+
+        pairs = [(str(i.dataset_id), str(i.project_id)) for i in input]
+
+        async for session in get_session():
+            datasets = await _load_by_ids(session, Dataset, (d for d, _ in pairs))
+            projects = await _load_by_ids(session, Project, (p for _, p in pairs))
+            errors = plan_attach(pairs, datasets, projects, current_user.id)
+            if atomic:
+                errors = apply_atomic(errors)
+
+            valid = [pair for pair, error in zip(pairs, errors) if error is None]
+            results = [
+                _bulk_result(index, datasets.get(pair[0]), error)
+                for index, (pair, error) in enumerate(zip(pairs, errors))
+            ]
+            try:
+                if valid:
+                    result = await session.execute(
+                        select(
+                            ProjectDatasetLink.dataset_id, ProjectDatasetLink.project_id
+                        ).where(
+                            ProjectDatasetLink.dataset_id.in_({d for d, _ in valid}),
+                            ProjectDatasetLink.project_id.in_({p for _, p in valid}),
+                        )
+                    )
+                    existing = {(str(d), str(p)) for d, p in result.all()}
+                    session.add_all(
+                        ProjectDatasetLink(project_id=p, dataset_id=d)
+                        for d, p in new_pairs(valid, existing)
+                    )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            break
+
+        return results
@@ -3,12 +3,11 @@
 import strawberry
 
 from platform_common.models.user import User as UserModel
-from platform_common.errors.base import ForbiddenError, NotFoundError
+from platform_common.errors.base import ForbiddenError
 from platform_common.logging.logging import get_logger
-from platform_common.db.session import get_session
-from platform_common.db.dal.datastore_dal import DatastoreDAL
 from platform_common.utils.time_helpers import to_datetime_utc  # 👈 add this
 
+from app import resolvers
 from app.graphql.dashboard.types import UserType
 from app.graphql.dashboard.types.datastore_type import DatastoreType
 
@@ -39,22 +38,7 @@ class DashboardQuery:
     ) -> DatastoreType:
         current_user: UserModel = info.context["current_user"]
 
-        async for session in get_session():
-            datastore_dal = DatastoreDAL(session)
-            ds_row = await datastore_dal.get_by_id(id)
-            break
-
-        if ds_row is None:
-            raise NotFoundError("Datastore not found")
-
-        mapping = getattr(ds_row, "_mapping", None)
-        if mapping is not None and "Datastore" in mapping:
-            ds = mapping["Datastore"]
-        else:
-            ds = ds_row
-
-        if getattr(ds, "user_id", None) and ds.user_id != current_user.id:
-            raise ForbiddenError("You do not have access to this datastore")
+        ds = await resolvers.get_datastore_for_user(id, current_user)
 
         # 👇 convert epoch -> datetime if needed
         raw_created_at = getattr(ds, "created_at", None)
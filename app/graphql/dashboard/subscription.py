@@ -1,15 +1,30 @@
 # app/graphql/dashboard/subscription.py
 from typing import AsyncGenerator, Dict, List, Optional
-import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 
 import strawberry
 from strawberry.types import Info
 from graphql import GraphQLError
 
+from platform_common.errors.base import AuthError
 from platform_common.logging.logging import get_logger
+from app import resolvers
+from app.graphql.dashboard.scalars import BigInt
+from app.internal.event_log import file_status_log
+from app.internal.metrics import metrics
+from app.internal.reaper import subscription_reaper
+from app.internal.snapshots import Snapshot, VersionedSnapshots
+from app.internal.tenants import UNKNOWN_TENANT, tenant_key
+from app.internal.ttl_cache import metrics_cache
+from app.internal.ws_connections import (
+    SubscriptionQueue,
+    registry_depths,
+    sweep_registry,
+    ws_connections,
+)
 from app.utils.db_helpers import get_datastore_dal
 from app.graphql.dashboard.types import DatastoreType
+from app.graphql.dashboard.types.datastore_type import DatastoreDeltaType
 
 logger = get_logger("graphql_dashboard_subscription")
 
@@ -17,10 +32,11 @@ logger = get_logger("graphql_dashboard_subscription")
 # Existing datastore subscription state
 # ─────────────────────────────────────────
 
-_DATASTORE_SUBSCRIBERS: Dict[str, List[asyncio.Queue[None]]] = {}
+_DATASTORE_SUBSCRIBERS: Dict[str, List[SubscriptionQueue]] = {}
 
 
 async def push_datastore_update_to_clients(datastore_id: str) -> None:
+    metrics_cache.invalidate(datastore_id)
     queues = _DATASTORE_SUBSCRIBERS.get(datastore_id, [])
     if not queues:
         return
@@ -31,19 +47,21 @@ async def push_datastore_update_to_clients(datastore_id: str) -> None:
         datastore_id,
     )
 
+    datastore_snapshots.invalidate(datastore_id)
     for q in list(queues):
-        await q.put(None)
+        # Each notification means "refetch"; one pending is enough.
+        if not q.pending:
+            q.offer(None)
 
 
-def _register_datastore_subscriber(
-    datastore_id: str, queue: asyncio.Queue[None]
-) -> None:
+def _register_datastore_subscriber(datastore_id: str, queue: SubscriptionQueue) -> None:
     _DATASTORE_SUBSCRIBERS.setdefault(datastore_id, []).append(queue)
 
 
 def _unregister_datastore_subscriber(
-    datastore_id: str, queue: asyncio.Queue[None]
+    datastore_id: str, queue: SubscriptionQueue
 ) -> None:
+    queue.discard()
     queues = _DATASTORE_SUBSCRIBERS.get(datastore_id)
     if not queues:
         return
@@ -55,6 +73,17 @@ def _unregister_datastore_subscriber(
         _DATASTORE_SUBSCRIBERS.pop(datastore_id, None)
 
 
+async def _authorize_datastore(info: Info, datastore_id: str) -> None:
+    """
+    Subscriptions only run on an authenticated socket; still check the
+    datastore belongs to the user, like the query does.
+    """
+    current_user = info.context.get("current_user")
+    if current_user is None:
+        raise AuthError("Not authenticated")
+    await resolvers.get_datastore_for_user(datastore_id, current_user)
+
+
 async def _fetch_datastore_snapshot(datastore_id: str):
     """
     Open a new DAL/session and fetch the latest *active* datastore.
@@ -67,6 +96,44 @@ async def _fetch_datastore_snapshot(datastore_id: str):
         return ds
 
 
+# ─────────────────────────────────────────
+# Delta mode for datastore updates
+# ─────────────────────────────────────────
+
+
+async def _load_datastore_delta_snapshot(datastore_id: str) -> Snapshot:
+    ds = await _fetch_datastore_snapshot(datastore_id)
+    m = await resolvers.get_datastore_metrics(None, datastore_id=datastore_id)
+    return {
+        "name": ds.name,
+        "description": ds.description,
+        "capacity_bytes": m.capacity_bytes,
+        "used_bytes": m.used_bytes,
+        "free_bytes": m.free_bytes,
+        "used_percent": m.used_percent,
+        "file_count": m.file_count,
+        "last_upload_at": m.last_upload_at,
+        # Sorted so an unchanged breakdown compares equal.
+        "by_category": sorted(m.by_category, key=lambda c: c.category),
+    }
+
+
+datastore_snapshots = VersionedSnapshots("datastore", _load_datastore_delta_snapshot)
+metrics.register_collector(datastore_snapshots.collect)
+
+
+def _delta_message(
+    datastore_id: str, version: int, changes: Snapshot, full: bool
+) -> DatastoreDeltaType:
+    return DatastoreDeltaType(
+        datastore_id=datastore_id,
+        version=version,
+        full=full,
+        changed=sorted(changes),
+        **changes,
+    )
+
+
 # ─────────────────────────────────────────
 # NEW: file status subscription state
 # ─────────────────────────────────────────
@@ -74,22 +141,66 @@ async def _fetch_datastore_snapshot(datastore_id: str):
 
 @strawberry.type
 class FileStatusEvent:
+    """
+    `seq`/`log_epoch` are the position to pass back as `after_seq`/`log_epoch`
+    when resubscribing. A `resync_required` marker carries no file (empty ids
+    and statuses) and means events were missed and cannot be sent, so refetch
+    the datastore instead. It answers an `after_seq` that is no longer in the
+    log, or replaces events this server had to drop.
+    """
+
     file_id: strawberry.ID
     datastore_id: strawberry.ID
     upload_session_id: Optional[strawberry.ID]
     old_status: str
     new_status: str
     occurred_at: datetime
+    seq: Optional[BigInt] = None
+    log_epoch: Optional[str] = None
+    resync_required: bool = False
+
+    @classmethod
+    def resync(cls, datastore_id: str, seq: Optional[int] = None) -> "FileStatusEvent":
+        return cls(
+            file_id=strawberry.ID(""),
+            datastore_id=strawberry.ID(datastore_id),
+            upload_session_id=None,
+            old_status="",
+            new_status="",
+            occurred_at=datetime.now(timezone.utc),
+            seq=file_status_log.head if seq is None else seq,
+            log_epoch=file_status_log.epoch,
+            resync_required=True,
+        )
 
 
 # per-datastore list of queues that carry FileStatusEvent
-_FILE_STATUS_SUBSCRIBERS: Dict[str, List[asyncio.Queue[FileStatusEvent]]] = {}
+_FILE_STATUS_SUBSCRIBERS: Dict[str, List[SubscriptionQueue]] = {}
+# Tenant (organization) of each datastore with file status subscribers, so
+# the pubsub bridge can queue its events per tenant without a lookup. Set by
+# the first subscriber and kept until the last one leaves, so the events a
+# subscriber receives all go through one (FIFO) fan-out queue.
+_DATASTORE_TENANTS: Dict[str, str] = {}
+
+
+def datastore_tenant(datastore_id: str) -> str:
+    return _DATASTORE_TENANTS.get(datastore_id, UNKNOWN_TENANT)
+
+
+def log_file_status_event(event: FileStatusEvent) -> None:
+    """
+    Give a file:status event its position in the event log, as soon as it
+    arrives: the log order is the order clients see. Logged even without
+    subscribers, so clients that are reconnecting can still replay it.
+    """
+    event.seq = file_status_log.append(str(event.datastore_id), event)
+    event.log_epoch = file_status_log.epoch
 
 
 async def push_file_status_event_to_clients(event: FileStatusEvent) -> None:
     """
-    Called by the Redis subscriber when a file:status message arrives.
-    It fans out the event to all subscribers for this datastore.
+    Fan a logged event (see log_file_status_event) out to all subscribers
+    for its datastore. Runs later, from the tenant fan-out queue.
     """
     datastore_id = str(event.datastore_id)
     queues = _FILE_STATUS_SUBSCRIBERS.get(datastore_id, [])
@@ -103,18 +214,33 @@ async def push_file_status_event_to_clients(event: FileStatusEvent) -> None:
     )
 
     for q in list(queues):
-        await q.put(event)
+        q.offer(event)
+
+
+def file_status_events_dropped(event: FileStatusEvent) -> None:
+    """
+    `event` was logged but will not be delivered (its fan-out job was
+    dropped): send current subscribers a resync marker in its place.
+    """
+    marker = FileStatusEvent.resync(str(event.datastore_id), event.seq)
+    for q in list(_FILE_STATUS_SUBSCRIBERS.get(str(event.datastore_id), [])):
+        q.offer(marker)
 
 
 def _register_file_status_subscriber(
-    datastore_id: str, queue: asyncio.Queue[FileStatusEvent]
-) -> None:
+    datastore_id: str, queue: SubscriptionQueue, tenant: str
+) -> int:
+    """Returns the log position the subscriber joined at: queued events at
+    or below it are covered by its replay (or predate it)."""
     _FILE_STATUS_SUBSCRIBERS.setdefault(datastore_id, []).append(queue)
+    _DATASTORE_TENANTS.setdefault(datastore_id, tenant)
+    return file_status_log.head
 
 
 def _unregister_file_status_subscriber(
-    datastore_id: str, queue: asyncio.Queue[FileStatusEvent]
+    datastore_id: str, queue: SubscriptionQueue
 ) -> None:
+    queue.discard()
     queues = _FILE_STATUS_SUBSCRIBERS.get(datastore_id)
     if not queues:
         return
@@ -124,6 +250,26 @@ def _unregister_file_status_subscriber(
         pass
     if not queues:
         _FILE_STATUS_SUBSCRIBERS.pop(datastore_id, None)
+        _DATASTORE_TENANTS.pop(datastore_id, None)
+
+
+def _sweep_file_status_subscribers() -> int:
+    removed = sweep_registry(_FILE_STATUS_SUBSCRIBERS)
+    for datastore_id in _DATASTORE_TENANTS.keys() - _FILE_STATUS_SUBSCRIBERS.keys():
+        del _DATASTORE_TENANTS[datastore_id]
+    return removed
+
+
+subscription_reaper.register(
+    "datastore",
+    lambda: sweep_registry(_DATASTORE_SUBSCRIBERS),
+    lambda: registry_depths(_DATASTORE_SUBSCRIBERS),
+)
+subscription_reaper.register(
+    "file_status",
+    _sweep_file_status_subscribers,
+    lambda: registry_depths(_FILE_STATUS_SUBSCRIBERS),
+)
 
 
 @strawberry.type
@@ -137,39 +283,87 @@ class Subscription:
         info: Info,
     ) -> AsyncGenerator[DatastoreType, None]:
         datastore_id_str = str(datastore_id)
+        await _authorize_datastore(info, datastore_id_str)
 
-        # 1 Initial snapshot
-        ds = await _fetch_datastore_snapshot(datastore_id_str)
-
-        initial_payload = DatastoreType(
-            id=ds.id,
-            name=ds.name,
-            description=ds.description,
-            created_at=ds.created_at,
-        )
-
-        yield initial_payload
-
-        # 2 Subscribe to further updates
-        queue: asyncio.Queue[None] = asyncio.Queue()
-        _register_datastore_subscriber(datastore_id_str, queue)
-
-        try:
-            while True:
-                await queue.get()  # wait for push_datastore_update_to_clients()
+        # Take the subscription slot first: a client over its cap, or one
+        # connecting while the pod drains, gets no snapshot either.
+        with ws_connections.subscription(info.context, "datastore_updated") as conn:
+            # A refresh that does not fit is still delivered, as the marker.
+            queue = SubscriptionQueue(conn, maxsize=1, resync=lambda: None)
+            _register_datastore_subscriber(datastore_id_str, queue)
 
+            try:
+                # 1 Initial snapshot
                 ds = await _fetch_datastore_snapshot(datastore_id_str)
 
-                next_payload = DatastoreType(
+                initial_payload = DatastoreType(
                     id=ds.id,
                     name=ds.name,
                     description=ds.description,
                     created_at=ds.created_at,
                 )
 
-                yield next_payload
-        finally:
-            _unregister_datastore_subscriber(datastore_id_str, queue)
+                yield initial_payload
+
+                # 2 Further updates
+                while True:
+                    await queue.get()  # wait for push_datastore_update_to_clients()
+
+                    ds = await _fetch_datastore_snapshot(datastore_id_str)
+
+                    next_payload = DatastoreType(
+                        id=ds.id,
+                        name=ds.name,
+                        description=ds.description,
+                        created_at=ds.created_at,
+                    )
+
+                    yield next_payload
+            finally:
+                _unregister_datastore_subscriber(datastore_id_str, queue)
+
+    @strawberry.subscription
+    async def datastore_deltas(
+        self,
+        datastore_id: strawberry.ID,
+        info: Info,
+    ) -> AsyncGenerator[DatastoreDeltaType, None]:
+        """
+        Like datastore_updated (including metrics), but after the first,
+        full message only the fields that changed are sent, with a version
+        number. The snapshot is loaded once per update for all subscribers of
+        a datastore. Resubscribe to get a full snapshot again.
+        """
+        datastore_id_str = str(datastore_id)
+        await _authorize_datastore(info, datastore_id_str)
+
+        with ws_connections.subscription(info.context, "datastore_deltas") as conn:
+            # A refresh that does not fit is still delivered, as the marker.
+            queue = SubscriptionQueue(conn, maxsize=1, resync=lambda: None)
+            _register_datastore_subscriber(datastore_id_str, queue)
+            datastore_snapshots.acquire(datastore_id_str)
+
+            try:
+                version, snapshot = await datastore_snapshots.current(datastore_id_str)
+                yield _delta_message(datastore_id_str, version, snapshot, full=True)
+
+                while True:
+                    await queue.get()  # wait for push_datastore_update_to_clients()
+
+                    new_version, new_snapshot = await datastore_snapshots.current(
+                        datastore_id_str
+                    )
+                    if new_version == version:
+                        continue
+
+                    changes = datastore_snapshots.delta(
+                        datastore_id_str, version, snapshot
+                    )
+                    version, snapshot = new_version, new_snapshot
+                    yield _delta_message(datastore_id_str, version, changes, full=False)
+            finally:
+                datastore_snapshots.release(datastore_id_str)
+                _unregister_datastore_subscriber(datastore_id_str, queue)
 
     # NEW: File status subscription
     @strawberry.subscription
@@ -178,28 +372,65 @@ class Subscription:
         datastore_id: strawberry.ID,
         upload_session_id: Optional[strawberry.ID],
         info: Info,
+        after_seq: Optional[BigInt] = None,
+        log_epoch: Optional[str] = None,
     ) -> AsyncGenerator[FileStatusEvent, None]:
         """
         Stream per-file status changes for a given datastore.
         Optionally filter by upload_session_id.
+
+        With `after_seq` (the `seq` of the last event the client saw), first
+        replay the events it missed from the event log, or send a single
+        `resync_required` marker if they are no longer there.
         """
         datastore_id_str = str(datastore_id)
         upload_session_id_str = str(upload_session_id) if upload_session_id else None
+        await _authorize_datastore(info, datastore_id_str)
 
         # No initial snapshot; we only stream changes
-        queue: asyncio.Queue[FileStatusEvent] = asyncio.Queue()
-        _register_file_status_subscriber(datastore_id_str, queue)
-
-        try:
-            while True:
-                event = await queue.get()
+        with ws_connections.subscription(info.context, "file_status_updated") as conn:
+            # Slow readers get the latest status per file instead of each step,
+            # and a resync marker in place of events that did not fit.
+            queue = SubscriptionQueue(
+                conn,
+                coalesce_key=lambda e: e.file_id,
+                resync=lambda: FileStatusEvent.resync(datastore_id_str),
+            )
+            # Register and read the log without awaiting in between: every
+            # event is then either replayed or queued, never both or neither.
+            joined_at = _register_file_status_subscriber(
+                datastore_id_str, queue, tenant_key(info.context.get("current_user"))
+            )
+            backlog: List[FileStatusEvent] = []
+            if after_seq is not None:
+                entries = file_status_log.since(
+                    datastore_id_str, int(after_seq), log_epoch
+                )
+                if entries is None:
+                    backlog = [FileStatusEvent.resync(datastore_id_str)]
+                else:
+                    backlog = [e for _, e in entries]
 
-                if (
+            def wanted(event: FileStatusEvent) -> bool:
+                return event.resync_required or not (
                     upload_session_id_str
                     and str(event.upload_session_id) != upload_session_id_str
-                ):
-                    continue
+                )
+
+            try:
+                for event in backlog:
+                    if wanted(event):
+                        yield event
+
+                while True:
+                    event = await queue.get()
+
+                    # Logged before we joined but delivered after.
+                    if event.seq is not None and event.seq <= joined_at:
+                        continue
+                    if not wanted(event):
+                        continue
 
-                yield event
-        finally:
-            _unregister_file_status_subscriber(datastore_id_str, queue)
+                    yield event
+            finally:
+                _unregister_file_status_subscriber(datastore_id_str, queue)
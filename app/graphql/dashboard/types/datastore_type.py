@@ -3,6 +3,7 @@
 from datetime import datetime
 from typing import Optional, List
 from app.graphql.dashboard.scalars import BigInt
+from app import resolvers
 
 import strawberry
 
@@ -60,6 +61,31 @@ class DatastoreFilesPageType:
     offset: int
 
 
+@strawberry.type
+class DatastoreDeltaType:
+    """
+    One message of the `datastore_deltas` subscription. Only the fields named
+    in `changed` are set; the rest are null because they did not change since
+    `version - 1` (or since the client's previous message). `full` messages
+    carry every field.
+    """
+
+    datastore_id: str
+    version: int
+    full: bool
+    changed: List[str]
+
+    name: Optional[str] = None
+    description: Optional[str] = None
+    capacity_bytes: Optional[BigInt] = None
+    used_bytes: Optional[BigInt] = None
+    free_bytes: Optional[BigInt] = None
+    used_percent: Optional[float] = None
+    file_count: Optional[int] = None
+    last_upload_at: Optional[datetime] = None
+    by_category: Optional[List[DatastoreFileCategoryBreakdownType]] = None
+
+
 @strawberry.type
 class DatastoreType:
     id: str
@@ -69,9 +95,7 @@ class DatastoreType:
 
     @strawberry.field
     async def metrics(self, info) -> DatastoreMetricsType:
-        from app.resolvers.datastore_resolvers import get_datastore_metrics
-
-        return await get_datastore_metrics(info, datastore_id=self.id)
+        return await resolvers.get_datastore_metrics(info, datastore_id=self.id)
 
     @strawberry.field
     async def files(
@@ -80,9 +104,7 @@ class DatastoreType:
         limit: int = 25,
         offset: int = 0,
     ) -> DatastoreFilesPageType:
-        from app.resolvers.datastore_resolvers import get_datastore_files_page
-
-        return await get_datastore_files_page(
+        return await resolvers.get_datastore_files_page(
             info,
             datastore_id=self.id,
             limit=limit,
@@ -6,11 +6,11 @@ import strawberry
 from strawberry.types import Info
 
 from platform_common.db.dal.dataset_dal import DatasetDAL
-from platform_common.db.session import get_session
 from platform_common.errors.base import ForbiddenError, InternalServerError
 from platform_common.logging.logging import get_logger
 from platform_common.utils.time_helpers import to_datetime_utc
 
+from app.db.routing import get_session
 from app.graphql.schema.dataset_schema import DatasetType
 
 logger = get_logger("graphql_dashboard_project")
@@ -7,11 +7,12 @@ from platform_common.db.dal.datastore_dal import DatastoreDAL
 from platform_common.db.dal.project_dal import ProjectDAL
 from platform_common.db.dal.dataset_dal import DatasetDAL
 from platform_common.db.dal.organization_dal import OrganizationDAL
-from platform_common.db.session import get_session
 from platform_common.errors.base import ForbiddenError, InternalServerError
 from platform_common.logging.logging import get_logger
 from platform_common.utils.time_helpers import to_datetime_utc
 
+from app.db.routing import get_session
+
 from .organization_type import OrganizationType
 from .datastore_type import DatastoreType
 from .project_type import ProjectType
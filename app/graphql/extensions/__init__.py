@@ -0,0 +1,14 @@
+# app/graphql/extensions/__init__.py
+from .db_routing import DatabaseRoutingExtension
+from .idempotency import IdempotencyExtension
+from .query_count import QueryCountExtension
+from .tenant_isolation import TenantIsolationExtension
+from .ws_auth import WebSocketAuthExtension
+
+__all__ = [
+    "DatabaseRoutingExtension",
+    "IdempotencyExtension",
+    "QueryCountExtension",
+    "TenantIsolationExtension",
+    "WebSocketAuthExtension",
+]
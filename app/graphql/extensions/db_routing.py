@@ -0,0 +1,45 @@
+# app/graphql/extensions/db_routing.py
+from typing import AsyncIterator
+
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.db.routing import (
+    REPLICA,
+    has_replicas,
+    note_write,
+    route_reads,
+    wrote_recently,
+)
+
+
+class DatabaseRoutingExtension(SchemaExtension):
+    """
+    Send query operations to the read replicas and everything else to the
+    primary.
+
+    A user who ran a mutation in the last GRAPHQL_READ_YOUR_WRITES_SECONDS
+    (on any pod, with the default "redis" backend) keeps reading from the
+    primary so they see their own changes; without replicas there is
+    nothing to track. Subscriptions stay on the primary: they refetch in
+    response to change events and must not read a replica that has not
+    replayed them yet.
+    """
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        ctx = self.execution_context
+        user = ctx.context.get("current_user") if ctx.context else None
+        user_id = getattr(user, "id", None) if has_replicas() else None
+        operation_type = ctx.operation_type
+
+        if operation_type == OperationType.QUERY and not (
+            user_id and await wrote_recently(str(user_id))
+        ):
+            with route_reads(REPLICA):
+                yield
+        else:
+            # PRIMARY is the default role; nothing to set.
+            yield
+
+        if operation_type == OperationType.MUTATION and user_id:
+            await note_write(str(user_id))
@@ -0,0 +1,104 @@
+# app/graphql/extensions/idempotency.py
+import hashlib
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from graphql import ExecutionResult, GraphQLError
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.core.config import get_service_settings
+from app.internal.idempotency import get_idempotency_store, request_fingerprint
+from app.internal.metrics import metrics
+
+HEADER = "idempotency-key"
+
+
+def _idempotency_key(execution_context: Any) -> Optional[str]:
+    extensions = execution_context.operation_extensions or {}
+    key = extensions.get("idempotencyKey")
+    if key:
+        return str(key)
+    # Headers only count on plain HTTP: a websocket's handshake headers
+    # would apply the same key to every operation on it.
+    context = execution_context.context
+    request = context.get("request") if context else None
+    if request is None or request.scope.get("type") != "http":
+        return None
+    return request.headers.get(HEADER)
+
+
+class IdempotencyExtension(SchemaExtension):
+    """
+    Mutations sent with an Idempotency-Key header (or an `idempotencyKey`
+    request extension) run at most once per user and key: a retry within
+    GRAPHQL_IDEMPOTENCY_TTL_SECONDS gets the stored response, with
+    `extensions.idempotency.replayed` set, and a duplicate arriving while
+    the first is still running waits for it. Responses with errors are not
+    stored, so those can be retried. Reusing a key for a different request
+    fails with IDEMPOTENCY_KEY_REUSED.
+    """
+
+    _replayed = False
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        ctx = self.execution_context
+        user = ctx.context.get("current_user") if ctx.context else None
+        key = _idempotency_key(ctx)
+        if ctx.operation_type != OperationType.MUTATION or not key or user is None:
+            yield
+            return
+
+        settings = get_service_settings()
+        store = get_idempotency_store()
+        scoped = hashlib.sha256(f"{user.id}:{key}".encode()).hexdigest()
+        fingerprint = request_fingerprint(ctx.query, ctx.operation_name, ctx.variables)
+        owner = uuid.uuid4().hex
+
+        try:
+            stored = await store.acquire(
+                scoped, owner, fingerprint, settings.idempotency_wait_seconds
+            )
+        except GraphQLError as e:
+            metrics.counter(
+                "idempotency_requests_total", outcome=e.extensions["code"].lower()
+            ).inc()
+            ctx.result = ExecutionResult(data=None, errors=[e])
+            yield
+            return
+
+        if stored is not None:
+            metrics.counter("idempotency_requests_total", outcome="replayed").inc()
+            self._replayed = True
+            ctx.result = ExecutionResult(data=stored)
+            yield
+            return
+
+        outcome = "released"
+        try:
+            yield
+            result = ctx.result
+            if (
+                isinstance(result, ExecutionResult)
+                and not result.errors
+                and result.data is not None
+            ):
+                kept = await store.complete(
+                    scoped,
+                    owner,
+                    fingerprint,
+                    result.data,
+                    settings.idempotency_ttl_seconds,
+                )
+                # Not kept: our claim expired mid-request and a retry owns
+                # the key now; its outcome is the one stored.
+                outcome = "executed" if kept else "claim_lost"
+        finally:
+            if outcome == "released" and not await store.release(scoped, owner):
+                outcome = "claim_lost"
+            metrics.counter("idempotency_requests_total", outcome=outcome).inc()
+
+    def get_results(self) -> Dict[str, Any]:
+        if not self._replayed:
+            return {}
+        return {"idempotency": {"replayed": True}}
@@ -0,0 +1,62 @@
+# app/graphql/extensions/query_count.py
+import secrets
+from typing import Any, Dict, Iterator, Optional
+
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.core.config import get_service_settings
+from app.db.statements import QueryCount, count_queries
+from app.internal.metrics import metrics
+
+
+def _debug_requested(context: Any) -> bool:
+    settings = get_service_settings()
+    if settings.debug_query_counts:
+        return True
+    request = context.get("request") if context else None
+    token = request.headers.get("x-debug-token") if request is not None else None
+    return bool(
+        settings.debug_token
+        and token
+        and secrets.compare_digest(token, settings.debug_token)
+    )
+
+
+class QueryCountExtension(SchemaExtension):
+    """
+    Count the DB statements and round trips of each query and mutation.
+
+    Totals go to graphql_operation_db_statements_total{operation}; the
+    per-operation breakdown (including the most repeated statements, which
+    is where an N+1 shows up) is returned in `extensions.dbQueries` when
+    GRAPHQL_DEBUG_QUERY_COUNTS is on or the request carries a valid
+    X-Debug-Token. Rows still streamed after the initial @defer/@stream
+    payload are not included.
+    """
+
+    _counts: Optional[QueryCount] = None
+
+    def on_execute(self) -> Iterator[None]:
+        ctx = self.execution_context
+        if ctx.operation_type == OperationType.SUBSCRIPTION:
+            yield
+            return
+
+        with count_queries() as counts:
+            yield
+        self._counts = counts
+
+        operation = ctx.operation_name or "anonymous"
+        metrics.counter("graphql_operations_counted_total", operation=operation).inc()
+        metrics.counter(
+            "graphql_operation_db_statements_total", operation=operation
+        ).inc(counts.statements)
+        metrics.counter(
+            "graphql_operation_db_round_trips_total", operation=operation
+        ).inc(counts.round_trips)
+
+    def get_results(self) -> Dict[str, Any]:
+        if self._counts is None or not _debug_requested(self.execution_context.context):
+            return {}
+        return {"dbQueries": self._counts.as_dict()}
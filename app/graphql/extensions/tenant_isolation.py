@@ -0,0 +1,42 @@
+# app/graphql/extensions/tenant_isolation.py
+from typing import AsyncIterator
+
+from graphql import ExecutionResult
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.core.config import get_service_settings
+from app.internal.tenants import TenantBusyError, db_limiter, tenant_key
+
+
+class TenantIsolationExtension(SchemaExtension):
+    """
+    With GRAPHQL_TENANT_DB_SLOTS set (it is off by default), queries and
+    mutations run inside a db_limiter slot of their tenant
+    (organization): one tenant can hold at most GRAPHQL_TENANT_MAX_DB_SLOTS
+    of the shared slots, and when they are all in use the next one goes to
+    the tenant with the least weighted service so far. A request that waits
+    longer than GRAPHQL_TENANT_DB_WAIT_SECONDS fails with TENANT_BUSY.
+    Subscriptions hold no slot between events and are not limited here.
+    """
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        ctx = self.execution_context
+        if ctx.operation_type == OperationType.SUBSCRIPTION:
+            yield
+            return
+
+        user = ctx.context.get("current_user") if ctx.context else None
+        tenant = tenant_key(user)
+        try:
+            entered = await db_limiter.enter(
+                tenant, get_service_settings().tenant_db_wait_seconds
+            )
+        except TenantBusyError as e:
+            ctx.result = ExecutionResult(data=None, errors=[e])
+            yield
+            return
+        try:
+            yield
+        finally:
+            db_limiter.exit(tenant, entered)
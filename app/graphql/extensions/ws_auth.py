@@ -0,0 +1,23 @@
+# app/graphql/extensions/ws_auth.py
+from typing import AsyncIterator
+
+from strawberry.extensions import SchemaExtension
+
+
+class WebSocketAuthExtension(SchemaExtension):
+    """
+    Refresh `current_user` from the socket's cached identity before each
+    operation on a websocket.
+
+    This does not touch the database unless the user was invalidated by a
+    user:changes event; an expired token yields no user, so resolvers reject
+    the operation as unauthenticated. HTTP contexts have no identity and are
+    left alone.
+    """
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        ctx = self.execution_context.context
+        identity = ctx.get("ws_identity") if ctx is not None else None
+        if identity is not None:
+            ctx.current_user = await identity.current_user()
+        yield
@@ -0,0 +1,99 @@
+# app/graphql/incremental.py
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from strawberry.types import Info
+from strawberry.types.nodes import InlineFragment, SelectedField, Selection
+
+try:  # the @defer/@stream executor: graphql-core 3.3, still a pre-release
+    from graphql import ExperimentalIncrementalExecutionResults
+except ImportError:  # pragma: no cover - depends on the environment
+    ExperimentalIncrementalExecutionResults = None  # type: ignore[assignment,misc]
+
+if TYPE_CHECKING:
+    from graphql import (
+        InitialIncrementalExecutionResult,
+        SubsequentIncrementalExecutionResult,
+    )
+    from graphql.execution.incremental_publisher import PendingResult
+
+
+def incremental_execution_available() -> bool:
+    """
+    False with graphql-core 3.2: the schema is then built without @defer /
+    @stream instead of failing at the first operation.
+    """
+    return ExperimentalIncrementalExecutionResults is not None
+
+
+def _has_stream(selections: List[Selection], name: str) -> bool:
+    for s in selections:
+        if isinstance(s, SelectedField):
+            if s.name == name and "stream" in s.directives:
+                return True
+        elif isinstance(s, InlineFragment):
+            if _has_stream(s.selections, name):
+                return True
+    return False
+
+
+def is_streamed(info: Info[Any, Any], child: Optional[str] = None) -> bool:
+    """
+    True when the client asked for `@stream` on the current list field, or on
+    its `child` sub-field when the list lives one level down (e.g.
+    `files { items @stream }`).
+
+    Resolvers use this to switch to a server-side cursor only when the client
+    will actually consume rows incrementally; otherwise the regular DAL query
+    is cheaper than holding a cursor open.
+    """
+    field = info.selected_fields[0]
+    if child is None:
+        return "stream" in field.directives
+    return _has_stream(field.selections, child)
+
+
+def initial_payload(result: "InitialIncrementalExecutionResult") -> Dict[str, Any]:
+    """First `next` payload of an @defer/@stream operation, shaped like the
+    first part of strawberry's multipart HTTP response."""
+    payload: Dict[str, Any] = {"data": result.data}
+    if result.errors:
+        payload["errors"] = [e.formatted for e in result.errors]
+    payload["hasNext"] = result.has_next
+    payload["pending"] = [p.formatted for p in result.pending]
+    payload["extensions"] = result.extensions
+    return payload
+
+
+def subsequent_payload(
+    result: "SubsequentIncrementalExecutionResult", pending: Dict[str, "PendingResult"]
+) -> Dict[str, Any]:
+    """
+    A later `next` payload. `pending` maps ids announced so far to their
+    PendingResult; it is updated here, and each incremental entry gets the
+    path and label of its id like in the multipart HTTP response.
+    """
+    payload: Dict[str, Any] = {"hasNext": result.has_next}
+    payload["extensions"] = result.extensions
+    if result.pending:
+        pending.update((p.id, p) for p in result.pending)
+        payload["pending"] = [p.formatted for p in result.pending]
+    if result.completed:
+        payload["completed"] = [c.formatted for c in result.completed]
+    if result.incremental:
+        payload["incremental"] = [
+            {
+                **value.formatted,
+                "path": pending[value.id].path,
+                "label": pending[value.id].label,
+            }
+            for value in result.incremental
+        ]
+    return payload
+
+
+def subsequent_errors(result: "SubsequentIncrementalExecutionResult") -> List[Any]:
+    """GraphQLErrors carried by a later payload (deferred / streamed parts)."""
+    errors: List[Any] = []
+    for part in [*(result.incremental or ()), *(result.completed or ())]:
+        errors.extend(part.errors or ())
+    return errors
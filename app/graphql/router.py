@@ -0,0 +1,123 @@
+# app/graphql/router.py
+from typing import Dict, List, Optional, Union
+
+from platform_common.errors.base import AuthError, NotFoundError
+from platform_common.logging.logging import get_logger
+from strawberry.exceptions import ConnectionRejectionError
+from fastapi import Request, Response, status
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLHTTPResponse, GraphQLRequestData
+from strawberry.http.async_base_view import AsyncHTTPRequestAdapter
+from strawberry.types import ExecutionResult
+
+from app.auth.ws_auth import authenticate_connection, extract_connection_token
+from app.graphql.context import GraphQLContext
+from app.graphql.schema_cache import etag_matches, schema_cache
+from app.graphql.transport_ws import GraphQLTransportWSHandler, GraphQLWSHandler
+from app.internal import json_codec
+from app.internal.drain import reconnect_hint_ms
+from app.internal.ws_connections import ws_connections
+
+logger = get_logger("graphql_router")
+
+
+class AppGraphQLRouter(GraphQLRouter[GraphQLContext, None]):
+    """
+    GraphQLRouter with the service's transport hooks plugged in.
+
+    Keep per-transport behaviour here (websocket handler, encoding) so
+    app/main.py only wires the router up.
+    """
+
+    graphql_transport_ws_handler_class = GraphQLTransportWSHandler
+    graphql_ws_handler_class = GraphQLWSHandler
+
+    def encode_json(self, data: object) -> str:
+        # Websocket frames (sent as text) and multipart chunks.
+        return json_codec.dumps(data)
+
+    def create_response(
+        self,
+        response_data: Union[GraphQLHTTPResponse, List[GraphQLHTTPResponse]],
+        sub_response: Response,
+    ) -> Response:
+        if sub_response.status_code == status.HTTP_304_NOT_MODIFIED:
+            response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+            response.headers.raw.extend(sub_response.headers.raw)
+            return response
+
+        # Same as GraphQLRouter.create_response, minus the str round trip.
+        response = Response(
+            json_codec.dumps_bytes(response_data),
+            media_type="application/json",
+            status_code=sub_response.status_code or status.HTTP_200_OK,
+        )
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    async def execute_single(
+        self,
+        request: Request,
+        request_adapter: AsyncHTTPRequestAdapter,
+        sub_response: Response,
+        context: GraphQLContext,
+        root_value: Optional[None],
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        """
+        Introspection documents seen before are answered from schema_cache
+        (no parse, validation or execution), with the schema ETag; a
+        matching If-None-Match gets a 304.
+        """
+        query, name, variables = (
+            request_data.query,
+            request_data.operation_name,
+            request_data.variables,
+        )
+        cached = schema_cache.lookup(query, name, variables)
+        if cached is None:
+            result = await super().execute_single(
+                request=request,
+                request_adapter=request_adapter,
+                sub_response=sub_response,
+                context=context,
+                root_value=root_value,
+                request_data=request_data,
+            )
+            schema_cache.remember(query, name, variables, result)
+            return result
+
+        sub_response.headers["ETag"] = schema_cache.etag
+        if etag_matches(request.headers.get("if-none-match"), schema_cache.etag):
+            sub_response.status_code = status.HTTP_304_NOT_MODIFIED
+        return ExecutionResult(data=cached, errors=None)
+
+    async def on_ws_connect(
+        self, context: GraphQLContext
+    ) -> Optional[Dict[str, object]]:
+        """
+        connection_init: accept sockets already authenticated by cookie,
+        otherwise authenticate the token in the payload. Anything else is
+        closed with 4403 before any operation can run. While draining, new
+        connections are turned away with a reconnect hint.
+        """
+        if not ws_connections.accepting:
+            raise ConnectionRejectionError(
+                {"reason": "draining", "reconnectAfterMs": reconnect_hint_ms()}
+            )
+
+        if context.ws_identity is None:
+            token = extract_connection_token(context.connection_params)
+            if not token:
+                raise ConnectionRejectionError({"reason": "Not authenticated"})
+            try:
+                context.ws_identity = await authenticate_connection(token)
+            except (AuthError, NotFoundError) as e:
+                logger.info("Websocket connection_init auth failed: %r", e)
+                raise ConnectionRejectionError({"reason": "Invalid token"})
+
+            context.session_id = context.ws_identity.session_id
+            context.ws_connection.user_id = context.ws_identity.user_id
+
+        context.current_user = await context.ws_identity.current_user()
+        return None
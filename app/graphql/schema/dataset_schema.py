@@ -1,17 +1,22 @@
 # app/graphql/schema/dataset_schema.py
 
 import strawberry
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from datetime import datetime
+from sqlalchemy import select
 from strawberry.types import Info
 
 from platform_common.db.dal.dataset_item_dal import DatasetItemDAL
 from platform_common.models.dataset import Dataset
+from platform_common.models.dataset_item import DatasetItem
 from platform_common.models.project_dataset_link import ProjectDatasetLink
 from platform_common.utils.time_helpers import to_datetime_utc
 from platform_common.db.dal.dataset_file_link_dal import DatasetFileLinkDAL
 
+from app.db.cursors import stream_scalars
+from app.db.routing import read_role
 from app.graphql.context import GraphQLContext
+from app.graphql.incremental import is_streamed
 
 
 @strawberry.type
@@ -30,6 +35,28 @@ class DatasetItemType:
     created_at: datetime
     status: Optional[str] = None
 
+    @staticmethod
+    def from_model(item: DatasetItem) -> "DatasetItemType":
+        return DatasetItemType(
+            id=item.id,
+            dataset_id=item.dataset_id,
+            file_id=item.file_id,
+            created_at=item.created_at,
+            status=getattr(item, "status", None),
+        )
+
+
+async def _stream_dataset_items(
+    dataset_id: str, role: str
+) -> AsyncIterator[DatasetItemType]:
+    stmt = (
+        select(DatasetItem)
+        .where(DatasetItem.dataset_id == dataset_id)
+        .order_by(DatasetItem.created_at, DatasetItem.id)
+    )
+    async for item in stream_scalars(stmt, role=role):
+        yield DatasetItemType.from_model(item)
+
 
 @strawberry.type
 class DatasetType:
@@ -48,19 +75,18 @@ class DatasetType:
         self,
         info: Info[GraphQLContext, None],
     ) -> List[DatasetItemType]:
+        # `items @stream`: hand graphql-core an async iterator backed by a
+        # server-side cursor instead of loading the whole list first. Rows are
+        # read after the operation's routing scope ends: pin the role now.
+        if is_streamed(info):
+            return _stream_dataset_items(  # type: ignore[return-value]
+                str(self.id), read_role()
+            )
+
         ctx = info.context
         dataset_item_dal: DatasetItemDAL = ctx.dataset_item_dal
         items = await dataset_item_dal.list_by_dataset(str(self.id))
-        return [
-            DatasetItemType(
-                id=item.id,
-                dataset_id=item.dataset_id,
-                file_id=item.file_id,
-                created_at=item.created_at,
-                status=getattr(item, "status", None),
-            )
-            for item in items
-        ]
+        return [DatasetItemType.from_model(item) for item in items]
 
     # -----------------------------------
     # (Optional) Resolver: dataset → projects
@@ -125,3 +151,25 @@ class CreateDatasetInput:
     datastore_id: strawberry.ID
     name: str
     description: Optional[str] = None
+
+
+@strawberry.input
+class AttachDatasetInput:
+    dataset_id: strawberry.ID
+    project_id: strawberry.ID
+
+
+@strawberry.type
+class BulkItemError:
+    # NOT_FOUND | FORBIDDEN | INVALID | SKIPPED (atomic and another item failed)
+    code: str
+    message: str
+
+
+@strawberry.type
+class BulkDatasetResult:
+    """One per input item, in input order: the dataset, or why it failed."""
+
+    index: int
+    dataset: Optional[DatasetType] = None
+    error: Optional[BulkItemError] = None
@@ -1,11 +1,21 @@
 # app/graphql/root_schema.py
 import strawberry
+from strawberry.schema.config import StrawberryConfig
 
 from app.graphql.dashboard.query import DashboardQuery
 from app.graphql.dashboard.subscription import Subscription as DashboardSubscription
 from app.graphql.dashboard.mutation import DashboardMutation
 
 from app.graphql.schema.query.dataset_query import DatasetQuery
+from app.graphql.schema.user_schema import UserChangeSubscription
+from app.graphql.incremental import incremental_execution_available
+from app.graphql.extensions import (
+    DatabaseRoutingExtension,
+    IdempotencyExtension,
+    QueryCountExtension,
+    TenantIsolationExtension,
+    WebSocketAuthExtension,
+)
 
 
 @strawberry.type
@@ -16,7 +26,7 @@ class Query(DashboardQuery, DatasetQuery):
 
 
 @strawberry.type
-class Subscription(DashboardSubscription):
+class Subscription(DashboardSubscription, UserChangeSubscription):
     """Root Subscription type."""
 
     pass
@@ -33,4 +43,18 @@ schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
     subscription=Subscription,
+    # WebSocketAuthExtension first: routing and idempotency look at
+    # current_user. A replayed mutation skips execution entirely.
+    extensions=[
+        WebSocketAuthExtension,
+        IdempotencyExtension,
+        TenantIsolationExtension,
+        DatabaseRoutingExtension,
+        QueryCountExtension,
+    ],
+    # @defer / @stream (multipart HTTP and graphql-transport-ws) when the
+    # installed graphql-core has the incremental executor (3.3 pre-releases).
+    config=StrawberryConfig(
+        enable_experimental_incremental_execution=incremental_execution_available()
+    ),
 )
@@ -1,58 +1,134 @@
 # app/graphql/user_schema.py
 import strawberry
-from typing import AsyncGenerator, Optional
-from app.internal.event_bus import bus
+from strawberry.types import Info
+from typing import AsyncGenerator, List, Optional
 from app.graphql.types import UserChange
+from app.internal.user_changes import (
+    USER_CHANGE_KEYS,
+    UnknownUserChangeOpError,
+    UserChangeFilter,
+    user_change_index,
+)
+from app.internal.ws_connections import SubscriptionQueue, ws_connections
+from platform_common.errors.base import AuthError, ForbiddenError
 from platform_common.logging.logging import get_logger
 
 logger = get_logger("graphql_subscriptions")
 
+RESYNC_OPERATION = "resync_required"
 
-@strawberry.type
-class Subscription:
-    @strawberry.subscription
-    async def user_created(self) -> AsyncGenerator[UserChange, None]:
+
+async def _stream(
+    info: Info, name: str, flt: UserChangeFilter
+) -> AsyncGenerator[UserChange, None]:
+    """Serve one subscriber from the user change index."""
+    with ws_connections.subscription(info.context, name) as conn:
+        queue = SubscriptionQueue(conn, resync=lambda: None)
+        sub = user_change_index.add(flt, queue)
         try:
-            async for msg in bus.subscribe("user_created"):
-                yield UserChange(operation=msg.get("operation", ""), payload=msg)
+            while True:
+                change = await queue.get()
+                if change is None:
+                    yield UserChange(
+                        operation=RESYNC_OPERATION, payload={}, resync_required=True
+                    )
+                    continue
+                operation, payload = change
+                yield UserChange(operation=operation, payload=payload)
         except Exception as e:
-            logger.error("user_created generator crashed: %r", e, exc_info=True)
+            logger.error("%s generator crashed: %r", name, e, exc_info=True)
             raise
+        finally:
+            user_change_index.remove(sub)
+            queue.discard()
+
+
+@strawberry.input
+class UserChangeFilterInput:
+    # user_created / user_updated / user_deleted; all when empty.
+    ops: Optional[List[str]] = None
+    user_ids: Optional[List[strawberry.ID]] = None
+    organization_ids: Optional[List[strawberry.ID]] = None
+    # Only UPDATEs touching at least one of these columns.
+    changed_columns: Optional[List[str]] = None
+    # Trim `data` / `old_data` to these columns (plus `id`).
+    columns: Optional[List[str]] = None
+
 
+def _scoped_filter(info: Info, where: Optional[UserChangeFilterInput]):
+    """
+    Build the caller's filter, restricted to what they may see: users of
+    their own organization, or only themselves without one.
+    """
+    current_user = info.context.get("current_user")
+    if current_user is None:
+        raise AuthError("Not authenticated")
+    where = where or UserChangeFilterInput()
+    ops = [o.lower() for o in where.ops or []]
+    unknown = set(ops) - set(USER_CHANGE_KEYS)
+    if unknown:
+        raise UnknownUserChangeOpError(unknown)
+
+    user_ids = [str(u) for u in where.user_ids or []]
+    org_id = getattr(current_user, "organization_id", None)
+    if org_id is None:
+        if user_ids and set(user_ids) != {str(current_user.id)}:
+            raise ForbiddenError("Not allowed to watch other users")
+        user_ids, org_ids = [str(current_user.id)], []
+    else:
+        org_ids = [str(o) for o in where.organization_ids or []]
+        if org_ids and set(org_ids) != {str(org_id)}:
+            raise ForbiddenError("Not allowed to watch other organizations")
+        org_ids = [str(org_id)]
+
+    return UserChangeFilter(
+        ops=ops,
+        user_ids=user_ids,
+        organization_ids=org_ids,
+        changed_columns=where.changed_columns,
+        columns=where.columns,
+    )
+
+
+@strawberry.type
+class UserChangeSubscription:
     @strawberry.subscription
-    async def user_updated(self) -> AsyncGenerator[UserChange, None]:
-        try:
-            async for msg in bus.subscribe("user_updated"):
-                yield UserChange(operation=msg.get("operation", ""), payload=msg)
-        except Exception as e:
-            logger.error("user_updated generator crashed: %r", e, exc_info=True)
-            raise
+    async def user_changes_filtered(
+        self, info: Info, where: Optional[UserChangeFilterInput] = None
+    ) -> AsyncGenerator[UserChange, None]:
+        """
+        User changes matching `where`, filtered on the server and trimmed to
+        `where.columns` before they are sent.
+        """
+        flt = _scoped_filter(info, where)
+        async for change in _stream(info, "user_changes_filtered", flt):
+            yield change
+
 
+@strawberry.type
+class Subscription:
     @strawberry.subscription
-    async def user_deleted(self) -> AsyncGenerator[UserChange, None]:
-        try:
-            async for msg in bus.subscribe("user_deleted"):
-                yield UserChange(operation=msg.get("operation", ""), payload=msg)
-        except Exception as e:
-            logger.error("user_deleted generator crashed: %r", e, exc_info=True)
-            raise
+    async def user_created(self, info: Info) -> AsyncGenerator[UserChange, None]:
+        flt = UserChangeFilter(ops=["user_created"])
+        async for change in _stream(info, "user_created", flt):
+            yield change
+
+    @strawberry.subscription
+    async def user_updated(self, info: Info) -> AsyncGenerator[UserChange, None]:
+        flt = UserChangeFilter(ops=["user_updated"])
+        async for change in _stream(info, "user_updated", flt):
+            yield change
+
+    @strawberry.subscription
+    async def user_deleted(self, info: Info) -> AsyncGenerator[UserChange, None]:
+        flt = UserChangeFilter(ops=["user_deleted"])
+        async for change in _stream(info, "user_deleted", flt):
+            yield change
 
     @strawberry.subscription
     async def user_changes(
-        self, op: Optional[str] = None
+        self, info: Info, op: Optional[str] = None
     ) -> AsyncGenerator[UserChange, None]:
-        # NOTE: this is a bit hand-wavy as written; you might later refactor
-        # it to fan-in properly. For now, we leave your logic.
-        keys = (
-            (op.lower(),)
-            if op
-            else (
-                "user_created",
-                "user_updated",
-                "user_deleted",
-            )
-        )
-        while True:
-            for k in keys:
-                msg = await anext(bus.subscribe(k))
-                yield UserChange(operation=msg.get("operation", ""), payload=msg)
+        flt = UserChangeFilter(ops=[op] if op else None)
+        async for change in _stream(info, "user_changes", flt):
+            yield change
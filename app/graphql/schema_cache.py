@@ -0,0 +1,149 @@
+# app/graphql/schema_cache.py
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from graphql import (
+    FieldNode,
+    GraphQLError,
+    OperationType,
+    get_introspection_query,
+    get_operation_ast,
+    graphql_sync,
+    parse,
+)
+
+from app.internal.metrics import Sample, metrics
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _mentions_introspection(query: str) -> bool:
+    # Cheap filter first: most operations are never hashed or parsed here.
+    return "__schema" in query or "__type" in query
+
+
+def is_introspection_only(query: str, operation_name: Optional[str]) -> bool:
+    """A query operation selecting nothing but __schema / __type / __typename."""
+    if not _mentions_introspection(query):
+        return False
+    try:
+        operation = get_operation_ast(parse(query), operation_name)
+    except GraphQLError:
+        return False
+    if operation is None or operation.operation != OperationType.QUERY:
+        return False
+    return all(
+        isinstance(s, FieldNode) and s.name.value.startswith("__")
+        for s in operation.selection_set.selections
+    )
+
+
+DocumentKey = Tuple[str, str, str]
+
+
+def _document_key(
+    query: str, operation_name: Optional[str], variables: Optional[Dict[str, Any]]
+) -> DocumentKey:
+    return (
+        query,
+        operation_name or "",
+        json.dumps(variables, sort_keys=True) if variables else "",
+    )
+
+
+class SchemaCache:
+    """
+    The schema never changes while the process runs, so its SDL and
+    introspection results are computed once and then served from memory.
+
+    `build` (at startup) prints the SDL, hashes it into the ETag and runs
+    the standard introspection query. Other introspection documents (each
+    client tool words its own) are executed once on first use and kept,
+    up to `max_documents`. Entries are keyed by the schema hash.
+    """
+
+    def __init__(self, max_documents: int = 32) -> None:
+        self._max_documents = max_documents
+        self.sdl = ""
+        self.schema_hash = ""
+        self._results: "OrderedDict[Tuple[str, DocumentKey], Dict[str, Any]]" = (
+            OrderedDict()
+        )
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.schema_hash[:32]}"'
+
+    def build(self, schema: Any) -> str:
+        sdl = schema.as_str()
+        schema_hash = hashlib.sha256(sdl.encode()).hexdigest()
+        if schema_hash != self.schema_hash:
+            self._results.clear()
+        self.sdl, self.schema_hash = sdl, schema_hash
+
+        # graphql-core directly: introspection needs none of the schema
+        # extensions, some of which only run under async execution.
+        query = get_introspection_query()
+        result = graphql_sync(schema._schema, query)
+        if result.errors:
+            raise RuntimeError(f"Introspection failed: {result.errors[0].message}")
+        self._store(_document_key(query, None, None), result.data)
+        return schema_hash
+
+    def _store(self, key: DocumentKey, data: Dict[str, Any]) -> None:
+        self._results[(self.schema_hash, key)] = data
+        self._results.move_to_end((self.schema_hash, key))
+        while len(self._results) > self._max_documents:
+            self._results.popitem(last=False)
+
+    def lookup(
+        self,
+        query: Optional[str],
+        operation_name: Optional[str],
+        variables: Optional[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        if not query or not self.schema_hash or not _mentions_introspection(query):
+            return None
+        key = (self.schema_hash, _document_key(query, operation_name, variables))
+        data = self._results.get(key)
+        if data is not None:
+            self._results.move_to_end(key)
+            metrics.counter("graphql_introspection_cache_total", result="hit").inc()
+        return data
+
+    def remember(
+        self,
+        query: Optional[str],
+        operation_name: Optional[str],
+        variables: Optional[Dict[str, Any]],
+        result: Any,
+    ) -> None:
+        """Keep `result` if `query` was an introspection-only operation."""
+        data = getattr(result, "data", None)
+        if (
+            not query
+            or not self.schema_hash
+            or not data
+            or getattr(result, "errors", None)
+            # Clients add __typename everywhere; only parse when every
+            # response key looks like introspection.
+            or not all(key.startswith("__") for key in data)
+            or not is_introspection_only(query, operation_name)
+        ):
+            return
+        metrics.counter("graphql_introspection_cache_total", result="miss").inc()
+        self._store(_document_key(query, operation_name, variables), data)
+
+    def collect(self) -> Iterable[Sample]:
+        yield "graphql_introspection_cached_documents", {}, len(self._results)
+
+
+schema_cache = SchemaCache()
+metrics.register_collector(schema_cache.collect)
@@ -1,14 +1,43 @@
 # app/graphql/subscriptions.py
 import asyncio
 import strawberry
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Dict, Optional
 
+from platform_common.errors.base import AuthError
 from platform_common.logging.logging import get_logger
 from platform_common.pubsub.factory import get_subscriber
 from platform_common.pubsub.event import PubSubEvent
 
+from app.internal.reaper import subscription_reaper
+from app.internal.ws_connections import ConnectionStats, ws_connections
+from app.pubsub.payloads import DatasetUpdatedPayload
+
 logger = get_logger("graphql_subscriptions")
 
+# Per-client Redis subscription tasks, with the connection they serve.
+_DATASET_TASKS: Dict["asyncio.Task[None]", ConnectionStats] = {}
+
+
+def _sweep_dataset_tasks() -> int:
+    """Cancel Redis tasks whose subscription outlived its connection."""
+    orphaned = [t for t, conn in _DATASET_TASKS.items() if conn.closed]
+    for task in orphaned:
+        task.cancel()
+        del _DATASET_TASKS[task]
+    return len(orphaned)
+
+
+def _dataset_task_depths() -> Dict[str, int]:
+    per_conn: Dict[str, int] = {}
+    for conn in _DATASET_TASKS.values():
+        per_conn[conn.connection_id] = per_conn.get(conn.connection_id, 0) + 1
+    return per_conn
+
+
+subscription_reaper.register(
+    "dataset_updated", _sweep_dataset_tasks, _dataset_task_depths
+)
+
 
 @strawberry.type
 class DatasetUpdatedEvent:
@@ -28,40 +57,47 @@ class Subscription:
         datasetId: strawberry.ID,
     ) -> AsyncGenerator[DatasetUpdatedEvent, None]:
         user = info.context["current_user"]
+        if user is None:
+            raise AuthError("Not authenticated")
         dsid = str(datasetId)
 
         logger.info("datasetUpdated started user_id=%s dataset_id=%s", user.id, dsid)
 
-        subscriber = get_subscriber()
-        q: asyncio.Queue[DatasetUpdatedEvent] = asyncio.Queue()
-
-        async def on_any(event: PubSubEvent):
-            p = event.payload or {}
-            if p.get("dataset_id") != dsid:
-                return
-
-            await q.put(
-                DatasetUpdatedEvent(
-                    dataset_id=dsid,
-                    reason=str(p.get("event_name") or "DATASET_FILES_CHANGED").lower(),
-                    operation=str(p.get("operation") or ""),
-                    file_id=p.get("file_id"),
-                    role=p.get("role"),
+        with ws_connections.subscription(info.context, "datasetUpdated") as conn:
+            subscriber = get_subscriber()
+            q: asyncio.Queue[DatasetUpdatedEvent] = asyncio.Queue()
+
+            async def on_any(event: PubSubEvent):
+                msg = DatasetUpdatedPayload.decode(event.payload)
+                if msg is None or msg.dataset_id != dsid:
+                    return
+
+                await q.put(
+                    DatasetUpdatedEvent(
+                        dataset_id=dsid,
+                        reason=msg.reason,
+                        operation=msg.operation,
+                        file_id=msg.file_id,
+                        role=msg.role,
+                    )
                 )
-            )
 
-        # Run Redis subscription in background
-        sub_task = asyncio.create_task(
-            subscriber.subscribe({"dataset:updated": {"*": on_any}})
-        )
+            # Run Redis subscription in background
+            sub_task = asyncio.create_task(
+                subscriber.subscribe({DatasetUpdatedPayload.TOPIC: {"*": on_any}})
+            )
+            _DATASET_TASKS[sub_task] = conn
 
-        try:
-            while True:
-                yield await q.get()
-        finally:
-            sub_task.cancel()
             try:
-                await sub_task
-            except asyncio.CancelledError:
-                pass
-            logger.info("datasetUpdated closed user_id=%s dataset_id=%s", user.id, dsid)
+                while True:
+                    yield await q.get()
+            finally:
+                _DATASET_TASKS.pop(sub_task, None)
+                sub_task.cancel()
+                try:
+                    await sub_task
+                except asyncio.CancelledError:
+                    pass
+                logger.info(
+                    "datasetUpdated closed user_id=%s dataset_id=%s", user.id, dsid
+                )
@@ -0,0 +1,209 @@
+# app/graphql/transport_ws.py
+import asyncio
+import time
+from contextlib import suppress
+from contextvars import ContextVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+from strawberry.schema.base import BaseSchema
+from strawberry.subscriptions.protocols.graphql_transport_ws.handlers import (
+    BaseGraphQLTransportWSHandler,
+    Operation,
+)
+from strawberry.subscriptions.protocols.graphql_transport_ws.types import (
+    ConnectionInitMessage,
+    Message,
+)
+from strawberry.subscriptions.protocols.graphql_ws.handlers import (
+    BaseGraphQLWSHandler,
+)
+from strawberry.subscriptions.protocols.graphql_ws.types import OperationMessage
+
+from app.core.config import get_service_settings
+from app.graphql.context import GraphQLContext
+from app.graphql.incremental import (
+    ExperimentalIncrementalExecutionResults,
+    initial_payload,
+    subsequent_errors,
+    subsequent_payload,
+)
+from app.internal.metrics import metrics
+from app.internal.ws_connections import KEEPALIVE_CLOSE_CODE
+
+if TYPE_CHECKING:
+    from graphql.execution.incremental_publisher import PendingResult
+
+
+WSOperation = Operation[GraphQLContext, None]
+
+# Operation whose task is running; set by GraphQLTransportWSHandler.run_operation
+# (each operation runs in its own task, so this is per operation).
+_operation: ContextVar[Optional[WSOperation]] = ContextVar(
+    "graphql_ws_operation", default=None
+)
+
+
+async def _no_more_results() -> AsyncIterator[Any]:
+    return
+    yield
+
+
+class _IncrementalSchema:
+    """
+    The schema as the websocket handler sees it. Plain results go back to
+    strawberry's run_operation untouched (send_next / send_initial_errors,
+    `complete`, error handling). An @defer/@stream result is sent by `send`,
+    then replaced by an empty stream so run_operation only adds `complete`.
+    """
+
+    def __init__(
+        self,
+        schema: BaseSchema,
+        send: Callable[[WSOperation, Any], Awaitable[None]],
+    ) -> None:
+        self._schema = schema
+        self._send = send
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._schema, name)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        result = await self._schema.execute(*args, **kwargs)
+        if ExperimentalIncrementalExecutionResults is None or not isinstance(
+            result, ExperimentalIncrementalExecutionResults
+        ):
+            return result
+        operation = _operation.get()
+        assert operation is not None
+        await self._send(operation, result)
+        return _no_more_results()
+
+
+class GraphQLTransportWSHandler(BaseGraphQLTransportWSHandler[GraphQLContext, None]):
+    """
+    graphql-transport-ws handler used by AppGraphQLRouter.
+
+    Strawberry's handler only knows how to send a single result for queries
+    and mutations. With incremental execution enabled, an operation using
+    @defer/@stream returns an initial result plus a stream of patches; each
+    of those goes out as its own `next` message (same payload shape as the
+    multipart HTTP transport), with their errors logged through the schema
+    like any other result's. Everything else is strawberry's run_operation.
+
+    Keepalive: once the connection is acknowledged we send a protocol `ping`
+    every GRAPHQL_WS_PING_INTERVAL_SECONDS. A client that sends nothing
+    (normally the `pong`) within GRAPHQL_WS_PONG_TIMEOUT_SECONDS is closed
+    with 4504, which ends its subscriptions and unregisters their queues
+    instead of waiting for TCP to notice the peer is gone.
+    """
+
+    _keepalive_task: Optional["asyncio.Task[None]"] = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = _IncrementalSchema(  # type: ignore[assignment]
+            self.schema, self._send_incremental
+        )
+
+    async def handle_message(self, message: Message) -> None:
+        conn = self.context.get("ws_connection")
+        if conn is not None:
+            conn.touch()
+        await super().handle_message(message)
+
+    async def handle_connection_init(self, message: ConnectionInitMessage) -> None:
+        await super().handle_connection_init(message)
+        interval = get_service_settings().ws_ping_interval_seconds
+        if self.connection_acknowledged and interval > 0:
+            conn = self.context.get("ws_connection")
+            if conn is not None:
+                conn.pong_keepalive = True
+            self._keepalive_task = asyncio.create_task(self._keepalive(interval))
+
+    async def shutdown(self) -> None:
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._keepalive_task
+        await super().shutdown()
+
+    async def _keepalive(self, interval: float) -> None:
+        conn = self.context.get("ws_connection")
+        timeout = get_service_settings().ws_pong_timeout_seconds
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                pinged_at = time.monotonic()
+                await self.send_message({"type": "ping"})
+                await asyncio.sleep(timeout)
+                if conn is not None and conn.last_seen < pinged_at:
+                    metrics.counter("ws_reaped_total", reason="pong_timeout").inc()
+                    await self.websocket.close(
+                        code=KEEPALIVE_CLOSE_CODE, reason="keepalive timeout"
+                    )
+                    return
+        except Exception:
+            return  # socket already gone; handle() is shutting down
+
+    async def run_operation(self, operation: WSOperation) -> None:
+        _operation.set(operation)
+        await super().run_operation(operation)
+
+    async def _send_incremental(
+        self,
+        operation: WSOperation,
+        result: "ExperimentalIncrementalExecutionResults",
+    ) -> None:
+        initial = result.initial_result
+        if initial.errors:
+            self.schema.process_errors(initial.errors)
+        await self._send_payload(operation, initial_payload(initial))
+
+        pending: Dict[str, "PendingResult"] = {p.id: p for p in initial.pending}
+        subsequent_results = result.subsequent_results
+        try:
+            async for subsequent in subsequent_results:
+                errors: List[Any] = subsequent_errors(subsequent)
+                if errors:
+                    self.schema.process_errors(errors)
+                await self._send_payload(
+                    operation, subsequent_payload(subsequent, pending)
+                )
+        finally:
+            # Client sent `complete` (task cancelled) before the last patch:
+            # close the stream so open server-side cursors are released now.
+            aclose = getattr(subsequent_results, "aclose", None)
+            if aclose is not None:
+                with suppress(Exception):
+                    await aclose()
+
+    async def _send_payload(self, operation: WSOperation, payload: Any) -> None:
+        await operation.send_operation_message(
+            {"id": operation.id, "type": "next", "payload": payload}
+        )
+
+
+class GraphQLWSHandler(BaseGraphQLWSHandler[GraphQLContext, None]):
+    """
+    graphql-ws (legacy) handler used by AppGraphQLRouter.
+
+    The protocol only has a one-way `ka` from the server, so there is no
+    pong to wait for: inbound frames are recorded on the connection and
+    SubscriptionReaper closes sockets that stay silent for longer than
+    GRAPHQL_WS_IDLE_TIMEOUT_SECONDS.
+    """
+
+    async def handle_message(self, message: OperationMessage) -> None:
+        conn = self.context.get("ws_connection")
+        if conn is not None:
+            conn.touch()
+        await super().handle_message(message)
@@ -7,3 +7,6 @@ class UserChange:
     # Derived from your trigger payload
     operation: str  # "INSERT" | "UPDATE" | "DELETE"
     payload: JSON  # full payload from the trigger (table, data, old_data)
+    # Changes for this subscriber were dropped (it fell behind): refetch.
+    # Sent with operation "resync_required" and an empty payload.
+    resync_required: bool = False
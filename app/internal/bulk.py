@@ -0,0 +1,118 @@
+# app/internal/bulk.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from graphql import GraphQLError
+
+# Per-item error codes of the bulk mutations.
+NOT_FOUND = "NOT_FOUND"
+FORBIDDEN = "FORBIDDEN"
+INVALID = "INVALID"
+# The item was valid but not written because another one failed (atomic).
+SKIPPED = "SKIPPED"
+
+
+class BulkLimitError(GraphQLError):
+    def __init__(self, size: int, limit: int) -> None:
+        super().__init__(
+            f"Bulk mutation has {size} items; at most {limit} are allowed",
+            extensions={"code": "BULK_LIMIT"},
+        )
+
+
+class ItemError:
+    __slots__ = ("code", "message")
+
+    def __init__(self, code: str, message: str) -> None:
+        self.code = code
+        self.message = message
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ItemError) and (self.code, self.message) == (
+            other.code,
+            other.message,
+        )
+
+    def __repr__(self) -> str:
+        return f"ItemError({self.code!r}, {self.message!r})"
+
+
+def check_limit(items: Sequence[Any], limit: int) -> None:
+    if len(items) > limit:
+        raise BulkLimitError(len(items), limit)
+
+
+def _owned(
+    row: Any, user_id: Any, what: str, key: str, owner: str = "owner_id"
+) -> Optional[ItemError]:
+    """Same rule as the single mutations: unowned rows are open to anyone."""
+    if row is None:
+        return ItemError(NOT_FOUND, f"{what} {key} not found")
+    owner_id = getattr(row, owner, None)
+    if owner_id and owner_id != user_id:
+        return ItemError(FORBIDDEN, f"Not allowed to modify {what.lower()} {key}")
+    return None
+
+
+def plan_create(
+    datastore_ids: Sequence[str],
+    project_ids: Sequence[Optional[str]],
+    names: Sequence[str],
+    datastores: Dict[str, Any],
+    projects: Dict[str, Any],
+    user_id: Any,
+) -> List[Optional[ItemError]]:
+    """
+    Validate createDatasets items against the datastores and projects loaded
+    for all of them at once. One entry per item, in input order; None means
+    valid. Datastores are owned through `user_id`, like get_datastore_for_user.
+    """
+    errors: List[Optional[ItemError]] = []
+    for datastore_id, project_id, name in zip(datastore_ids, project_ids, names):
+        if not name.strip():
+            errors.append(ItemError(INVALID, "Dataset name must not be empty"))
+            continue
+        error = _owned(
+            datastores.get(datastore_id),
+            user_id,
+            "Datastore",
+            datastore_id,
+            owner="user_id",
+        )
+        if error is None and project_id is not None:
+            error = _owned(projects.get(project_id), user_id, "Project", project_id)
+        errors.append(error)
+    return errors
+
+
+def plan_attach(
+    pairs: Sequence[Tuple[str, str]],
+    datasets: Dict[str, Any],
+    projects: Dict[str, Any],
+    user_id: Any,
+) -> List[Optional[ItemError]]:
+    """Validate attachDatasetsToProjects (dataset_id, project_id) pairs."""
+    return [
+        _owned(datasets.get(dataset_id), user_id, "Dataset", dataset_id)
+        or _owned(projects.get(project_id), user_id, "Project", project_id)
+        for dataset_id, project_id in pairs
+    ]
+
+
+def apply_atomic(errors: List[Optional[ItemError]]) -> List[Optional[ItemError]]:
+    """All-or-nothing: if any item failed, mark the valid ones as skipped."""
+    if all(e is None for e in errors):
+        return errors
+    return [e or ItemError(SKIPPED, "Not applied: another item failed") for e in errors]
+
+
+def new_pairs(
+    pairs: Iterable[Tuple[str, str]], existing: Set[Tuple[str, str]]
+) -> List[Tuple[str, str]]:
+    """Pairs that still need a link row, without repeats, in input order."""
+    seen = set(existing)
+    out: List[Tuple[str, str]] = []
+    for pair in pairs:
+        if pair not in seen:
+            seen.add(pair)
+            out.append(pair)
+    return out
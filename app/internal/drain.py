@@ -0,0 +1,152 @@
+# app/internal/drain.py
+import asyncio
+import json
+import random
+import signal
+import time
+from types import FrameType
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from platform_common.logging.logging import get_logger
+
+from app.core.config import get_service_settings
+from app.internal.metrics import Sample, metrics
+from app.internal.ws_connections import ConnectionStats, ws_connections
+
+logger = get_logger("drain")
+
+# "Service Restart": graphql-ws clients treat it as retryable.
+DRAIN_CLOSE_CODE = 1012
+
+
+def reconnect_hint_ms() -> int:
+    """Randomized reconnect delay handed to a client leaving this pod."""
+    jitter = get_service_settings().drain_reconnect_jitter_seconds
+    return int(random.uniform(0, jitter) * 1000)
+
+
+def close_reason() -> str:
+    # Close reasons are limited to 123 bytes; this stays well below.
+    return json.dumps(
+        {"reason": "draining", "reconnectAfterMs": reconnect_hint_ms()},
+        separators=(",", ":"),
+    )
+
+
+class DrainController:
+    """
+    Moves websocket clients off this process gradually before shutdown.
+
+    Draining stops new subscriptions and connections (health reports 503),
+    then closes the existing websockets at random points spread over
+    GRAPHQL_DRAIN_WINDOW_SECONDS, each with close code 1012 and a randomized
+    `reconnectAfterMs` hint, so clients come back to the other pods spread
+    out rather than all at once. HTTP queries keep being served meanwhile.
+
+    Triggered by SIGTERM (before uvicorn's own handler, which is called once
+    the drain is over) or by POST /debug/drain. The pod's termination grace
+    period must be longer than the window.
+    """
+
+    def __init__(self) -> None:
+        self.started_at: Optional[float] = None
+        self.reason: Optional[str] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._closed = 0
+
+    @property
+    def draining(self) -> bool:
+        return self._task is not None
+
+    @property
+    def done(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    def start(
+        self, reason: str, window_seconds: Optional[float] = None
+    ) -> "asyncio.Task[None]":
+        if self._task is None:
+            window = (
+                get_service_settings().drain_window_seconds
+                if window_seconds is None
+                else window_seconds
+            )
+            self.started_at = time.time()
+            self.reason = reason
+            ws_connections.accepting = False
+            self._task = asyncio.create_task(self._drain(window))
+            logger.info("Draining (%s) over %.1fs", reason, window)
+        return self._task
+
+    async def drain(self, reason: str, window_seconds: Optional[float] = None) -> None:
+        await asyncio.shield(self.start(reason, window_seconds))
+
+    async def _drain(self, window: float) -> None:
+        connections = ws_connections.connections()
+        await asyncio.gather(
+            *(self._close_later(c, random.uniform(0, window)) for c in connections)
+        )
+        logger.info("Drain finished; closed %d websocket(s)", self._closed)
+
+    async def _close_later(self, conn: ConnectionStats, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if conn.closer is None:
+            return
+        try:
+            await conn.closer(DRAIN_CLOSE_CODE, close_reason())
+            self._closed += 1
+            metrics.counter("ws_drain_closed_total").inc()
+        except Exception as e:  # already gone
+            logger.debug("Drain close failed for %s: %r", conn.connection_id, e)
+
+    def install_signal_handler(self, sig: int = signal.SIGTERM) -> Callable[[], None]:
+        """
+        Drain on `sig`, then hand the signal to the previous handler
+        (uvicorn's, which starts the normal shutdown). A second signal skips
+        the drain. Returns a function restoring the previous handler.
+        """
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(sig)
+
+        def forward(frame: Optional[FrameType]) -> None:
+            if callable(previous):
+                previous(sig, frame)
+            else:
+                signal.signal(sig, previous)
+                signal.raise_signal(sig)
+
+        signalled = False
+
+        def handler(signum: int, frame: Optional[FrameType]) -> None:
+            nonlocal signalled
+            if signalled:
+                forward(frame)
+                return
+            signalled = True
+
+            def begin() -> None:
+                # Joins a drain already started from /debug/drain.
+                task = self.start(f"signal {signal.Signals(signum).name}")
+                task.add_done_callback(lambda _: forward(None))
+
+            loop.call_soon_threadsafe(begin)
+
+        signal.signal(sig, handler)
+        return lambda: signal.signal(sig, previous)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "draining": self.draining,
+            "done": self.done,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "closed": self._closed,
+            "remaining": len(ws_connections.connections()),
+        }
+
+    def collect(self) -> Iterable[Sample]:
+        yield "drain_active", {}, 1.0 if self.draining else 0.0
+
+
+drain_controller = DrainController()
+metrics.register_collector(drain_controller.collect)
@@ -1,6 +1,8 @@
 import asyncio
 from collections import defaultdict
-from typing import Any, Dict, AsyncIterator
+from typing import Any, Dict, AsyncIterator, Iterable
+
+from app.internal.metrics import Sample, metrics
 
 
 class EventBus:
@@ -41,6 +43,17 @@ class EventBus:
             finally:
                 q.task_done()
 
+    def depths(self) -> Dict[str, int]:
+        """Messages waiting per key."""
+        return {key: q.qsize() for key, q in self._queues.items()}
+
+    def collect(self) -> Iterable[Sample]:
+        depths = self.depths()
+        yield "event_bus_keys", {}, len(depths)
+        for key, depth in depths.items():
+            yield "event_bus_queue_depth", {"key": key}, depth
+
 
 # Global singleton
 bus = EventBus(maxsize=512)
+metrics.register_collector(bus.collect)
@@ -0,0 +1,106 @@
+# app/internal/event_log.py
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Iterable, List, Optional, Tuple
+
+from app.core.config import get_service_settings
+from app.internal.metrics import Sample, metrics
+
+Entry = Tuple[int, Any]
+
+
+class _Stream:
+    __slots__ = ("entries", "dropped_upto")
+
+    def __init__(self, maxlen: int) -> None:
+        self.entries: Deque[Entry] = deque(maxlen=maxlen)
+        # Highest seq that fell off this stream; positions at or below it
+        # can no longer be replayed.
+        self.dropped_upto = 0
+
+
+class EventLog:
+    """
+    Bounded, per-key (datastore) log of recent events with sequence numbers,
+    so reconnecting subscribers can replay what they missed.
+
+    Sequence numbers are shared by all keys and strictly increasing. They
+    start from the process boot time in microseconds, so positions handed
+    out by a previous process are always older than anything in this log
+    and resolve to a resync. `epoch` identifies this log; a client carrying
+    a position from another pod also gets a resync.
+
+    Only the last GRAPHQL_EVENT_LOG_SIZE events per key are kept, and only
+    for the GRAPHQL_EVENT_LOG_MAX_STREAMS most recently active keys.
+    """
+
+    def __init__(self) -> None:
+        self.epoch = uuid.uuid4().hex[:12]
+        self._start = int(time.time() * 1_000_000)
+        self._last = self._start - 1
+        self._streams: "OrderedDict[str, _Stream]" = OrderedDict()
+        # Highest seq of any stream evicted as a whole.
+        self._evicted_upto = 0
+
+    @property
+    def head(self) -> int:
+        return self._last
+
+    def append(self, key: str, item: Any) -> int:
+        settings = get_service_settings()
+        self._last += 1
+        seq = self._last
+
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream(settings.event_log_size)
+            # This key may have had a stream that was evicted earlier.
+            stream.dropped_upto = self._evicted_upto
+            while len(self._streams) > settings.event_log_max_streams:
+                _, evicted = self._streams.popitem(last=False)
+                if evicted.entries:
+                    self._evicted_upto = max(self._evicted_upto, evicted.entries[-1][0])
+        else:
+            self._streams.move_to_end(key)
+
+        if len(stream.entries) == stream.entries.maxlen:
+            stream.dropped_upto = stream.entries[0][0]
+        stream.entries.append((seq, item))
+        return seq
+
+    def since(
+        self, key: str, after_seq: int, epoch: Optional[str] = None
+    ) -> Optional[List[Entry]]:
+        """
+        Entries of `key` after `after_seq`, oldest first, or None when the
+        position cannot be served from the log and the client must resync.
+        """
+        if (
+            (epoch is not None and epoch != self.epoch)
+            or after_seq < self._start - 1
+            or after_seq > self._last
+        ):
+            metrics.counter("event_log_resyncs_total").inc()
+            return None
+
+        stream = self._streams.get(key)
+        floor = stream.dropped_upto if stream is not None else self._evicted_upto
+        if after_seq < floor:
+            metrics.counter("event_log_resyncs_total").inc()
+            return None
+
+        metrics.counter("event_log_replays_total").inc()
+        if stream is None:
+            return []
+        return [entry for entry in stream.entries if entry[0] > after_seq]
+
+    def collect(self) -> Iterable[Sample]:
+        yield "event_log_streams", {}, len(self._streams)
+        yield "event_log_entries", {}, sum(
+            len(s.entries) for s in self._streams.values()
+        )
+
+
+file_status_log = EventLog()
+metrics.register_collector(file_status_log.collect)
@@ -0,0 +1,250 @@
+# app/internal/idempotency.py
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+from graphql import GraphQLError
+from redis.asyncio import Redis
+
+from app.core.config import get_service_settings, resolve_redis_url
+from app.internal.metrics import Sample, metrics
+
+# What gets stored and replayed: the `data` of a successful response.
+Response = Dict[str, Any]
+
+
+class IdempotencyKeyReusedError(GraphQLError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Idempotency key was already used for a different request",
+            extensions={"code": "IDEMPOTENCY_KEY_REUSED"},
+        )
+
+
+class IdempotencyInProgressError(GraphQLError):
+    def __init__(self) -> None:
+        super().__init__(
+            "A request with this idempotency key is still running; retry later",
+            extensions={"code": "IDEMPOTENCY_IN_PROGRESS"},
+        )
+
+
+def request_fingerprint(
+    query: Optional[str],
+    operation_name: Optional[str],
+    variables: Optional[Dict[str, Any]],
+) -> str:
+    """Identifies the request a key was first used for."""
+    raw = json.dumps(
+        [query or "", operation_name or "", variables or {}],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "owner", "done", "response", "expires_at")
+
+    def __init__(self, fingerprint: str, owner: str) -> None:
+        self.fingerprint = fingerprint
+        self.owner = owner
+        # Set when the first execution completes or gives up.
+        self.done = asyncio.Event()
+        self.response: Optional[Response] = None
+        self.expires_at: Optional[float] = None
+
+
+class LocalIdempotencyStore:
+    """
+    Per-process store: retries that land on another pod run again. Keys
+    still executing are never evicted; completed ones expire after the TTL
+    or, past `max_keys`, oldest first.
+
+    `acquire` returns None when the caller should execute (and then call
+    `complete` or `release` with the same `owner`), otherwise the stored
+    response to replay. Duplicates arriving while the first one runs wait
+    for its outcome. `complete` and `release` only act on the caller's own
+    claim and return whether it was still held.
+    """
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self._max_keys = max_keys
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if entry.expires_at is not None and entry.expires_at <= now:
+                del self._entries[key]
+
+    def _trim(self) -> None:
+        overflow = len(self._entries) - self._max_keys
+        for key, entry in list(self._entries.items()):
+            if overflow <= 0:
+                break
+            if entry.expires_at is not None:
+                del self._entries[key]
+                overflow -= 1
+
+    async def acquire(
+        self, key: str, owner: str, fingerprint: str, wait: float
+    ) -> Optional[Response]:
+        deadline = time.monotonic() + wait
+        while True:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _Entry(fingerprint, owner)
+                self._trim()
+                return None
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyReusedError()
+            if entry.response is not None:
+                return entry.response
+            try:
+                await asyncio.wait_for(
+                    entry.done.wait(), max(deadline - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                raise IdempotencyInProgressError() from None
+            # Released without a response: the next waiter runs it.
+
+    async def complete(
+        self, key: str, owner: str, fingerprint: str, response: Response, ttl: float
+    ) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or entry.owner != owner or entry.response is not None:
+            return False
+        entry.response = response
+        entry.expires_at = time.monotonic() + ttl
+        entry.done.set()
+        return True
+
+    async def release(self, key: str, owner: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or entry.owner != owner or entry.response is not None:
+            return False
+        del self._entries[key]
+        entry.done.set()
+        return True
+
+
+# Replace / delete a key only while it still holds the claim of ARGV[1]. A
+# claim can expire under a slow request and be taken by a retry, which the
+# first request must then leave alone. Stored responses have no owner.
+_IS_CLAIMED_BY = """
+local raw = redis.call('GET', KEYS[1])
+local claimed = raw and cjson.decode(raw)['owner'] == ARGV[1]
+"""
+_SET_IF_CLAIMED = (
+    _IS_CLAIMED_BY
+    + """
+if claimed then
+    return redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+end
+return false
+"""
+)
+_DELETE_IF_CLAIMED = (
+    _IS_CLAIMED_BY
+    + """
+if claimed then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+)
+
+
+class RedisIdempotencyStore:
+    """
+    Shared across pods. The first request claims the key with SET NX and a
+    short lock TTL (so a crashed pod does not hold it forever); duplicates
+    poll until the response is stored or they run out of patience. The
+    claim names its owner, and `complete` / `release` go through a
+    compare-and-set script, so a request whose claim expired cannot
+    overwrite or free the claim of the retry that took over.
+    """
+
+    POLL_SECONDS = 0.1
+
+    def __init__(self, client: Any, lock_seconds: float, prefix: str = "idem:"):
+        self._client = client
+        self._lock_seconds = lock_seconds
+        self._prefix = prefix
+
+    async def acquire(
+        self, key: str, owner: str, fingerprint: str, wait: float
+    ) -> Optional[Response]:
+        name = self._prefix + key
+        deadline = time.monotonic() + wait
+        while True:
+            claimed = await self._client.set(
+                name,
+                json.dumps({"fingerprint": fingerprint, "owner": owner}),
+                nx=True,
+                px=int(self._lock_seconds * 1000),
+            )
+            if claimed:
+                return None
+            raw = await self._client.get(name)
+            if raw is None:
+                continue  # released or lock expired in between
+            record = json.loads(raw)
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyKeyReusedError()
+            if "response" in record:
+                return record["response"]
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgressError()
+            await asyncio.sleep(self.POLL_SECONDS)
+
+    async def complete(
+        self, key: str, owner: str, fingerprint: str, response: Response, ttl: float
+    ) -> bool:
+        stored = await self._client.eval(
+            _SET_IF_CLAIMED,
+            1,
+            self._prefix + key,
+            owner,
+            json.dumps({"fingerprint": fingerprint, "response": response}, default=str),
+            int(ttl * 1000),
+        )
+        return bool(stored)
+
+    async def release(self, key: str, owner: str) -> bool:
+        deleted = await self._client.eval(
+            _DELETE_IF_CLAIMED, 1, self._prefix + key, owner
+        )
+        return bool(deleted)
+
+
+@lru_cache(maxsize=1)
+def get_idempotency_store() -> Any:
+    settings = get_service_settings()
+    if settings.idempotency_backend == "redis":
+        return RedisIdempotencyStore(
+            Redis.from_url(
+                resolve_redis_url(settings.idempotency_redis_url),
+                decode_responses=True,
+            ),
+            lock_seconds=settings.idempotency_lock_seconds,
+        )
+    return LocalIdempotencyStore(settings.idempotency_max_keys)
+
+
+def collect() -> Iterable[Sample]:
+    store = get_idempotency_store()
+    if isinstance(store, LocalIdempotencyStore):
+        yield "idempotency_local_keys", {}, len(store)
+
+
+metrics.register_collector(collect)
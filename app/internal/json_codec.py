@@ -0,0 +1,74 @@
+# app/internal/json_codec.py
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from app.core.config import get_service_settings
+from app.internal.metrics import metrics
+
+try:  # optional: stdlib json is used when orjson is not installed
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+
+def _default(value: Any) -> Any:
+    """
+    Types GraphQL results can still carry after serialization (JSON scalar
+    payloads from pubsub, debug responses). Rendered the way strawberry's
+    scalars render them, so both encoders produce the same text.
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(data: Any) -> bytes:
+    return json.dumps(data, default=_default).encode()
+
+
+if orjson is not None:
+    # Datetimes go through _default (isoformat) instead of orjson's RFC 3339
+    # rendering so the output does not depend on which encoder ran.
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def _orjson_dumps(data: Any) -> bytes:
+        try:
+            return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # orjson only handles 64-bit integers; BigInt values beyond that
+            # (and anything else it rejects) take the stdlib path.
+            metrics.counter("json_encode_fallbacks_total").inc()
+            return _stdlib_dumps(data)
+
+
+def _select() -> Callable[[Any], bytes]:
+    name = get_service_settings().json_encoder
+    if name == "stdlib" or orjson is None:
+        return _stdlib_dumps
+    return _orjson_dumps
+
+
+_dumps: Optional[Callable[[Any], bytes]] = None
+
+
+def dumps_bytes(data: Any) -> bytes:
+    """Encode `data` with the configured encoder (GRAPHQL_JSON_ENCODER)."""
+    global _dumps
+    if _dumps is None:
+        _dumps = _select()
+    return _dumps(data)
+
+
+def dumps(data: Any) -> str:
+    return dumps_bytes(data).decode()
+
+
+def encoder_name() -> str:
+    return "stdlib" if _select() is _stdlib_dumps else "orjson"
@@ -0,0 +1,27 @@
+# app/internal/lazy.py
+import importlib
+from typing import Any, Callable, Dict
+
+
+def lazy_exports(
+    namespace: Dict[str, Any], exports: Dict[str, str]
+) -> Callable[[str], Any]:
+    """
+    Build a module-level ``__getattr__`` (PEP 562) for a package.
+
+    `namespace` is the package's ``globals()`` and `exports` maps an attribute
+    name to the module that defines it. The module is imported on first access
+    and the attribute is cached in the package globals, so later lookups are
+    plain module attribute reads with no import machinery on the hot path.
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        namespace[name] = value
+        return value
+
+    return __getattr__
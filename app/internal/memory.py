@@ -0,0 +1,142 @@
+# app/internal/memory.py
+import asyncio
+import os
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from app.internal.event_bus import bus
+from app.internal.metrics import Sample, metrics
+from app.internal.reaper import subscription_reaper
+from app.internal.ws_connections import background_tasks
+
+
+def top_keys(depths: Dict[str, int], limit: int) -> Dict[str, Any]:
+    """Total, key count and the `limit` deepest keys of one registry."""
+    deepest = sorted(depths.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+    return {
+        "total": sum(depths.values()),
+        "keys": len(depths),
+        "top": [{"key": k, "depth": d} for k, d in deepest],
+    }
+
+
+def task_counts() -> Dict[str, int]:
+    """Pending asyncio tasks on the running loop, grouped by coroutine."""
+    try:
+        tasks = asyncio.all_tasks()
+    except RuntimeError:  # no running loop
+        return {}
+    counts: Counter = Counter()
+    for task in tasks:
+        coro = task.get_coro()
+        counts[getattr(coro, "__qualname__", None) or type(coro).__name__] += 1
+    return dict(counts.most_common())
+
+
+def rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class AllocationTracker:
+    """
+    Opt-in tracemalloc: each `diff()` takes a snapshot and reports the
+    allocation sites that grew the most since the previous one (or since
+    tracing started), so calling it twice a few minutes apart shows what
+    is accumulating.
+    """
+
+    def __init__(self) -> None:
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._previous = None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+
+    def diff(self, limit: int = 20) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        snapshot = self._snapshot()
+        if self._previous is None:
+            stats = [
+                (s.traceback, s.size, s.size, s.count)
+                for s in snapshot.statistics("lineno")
+            ]
+        else:
+            stats = [
+                (s.traceback, s.size, s.size_diff, s.count_diff)
+                for s in snapshot.compare_to(self._previous, "lineno")
+            ]
+        self._previous = snapshot
+        stats.sort(key=lambda s: s[2], reverse=True)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [
+                {
+                    "site": str(tb[0]),
+                    "size_bytes": size,
+                    "size_diff_bytes": size_diff,
+                    "count_diff": count_diff,
+                }
+                for tb, size, size_diff, count_diff in stats[:limit]
+            ],
+        }
+
+    def collect(self) -> Iterable[Sample]:
+        if tracemalloc.is_tracing():
+            yield "tracemalloc_traced_bytes", {}, tracemalloc.get_traced_memory()[0]
+
+
+def memory_report(limit: int = 20) -> Dict[str, Any]:
+    """Everything /debug/memory returns except the allocation diff."""
+    tasks = task_counts()
+    return {
+        "rss_bytes": rss_bytes(),
+        "registries": {
+            name: top_keys(depths, limit)
+            for name, depths in subscription_reaper.depths().items()
+        },
+        "event_bus": top_keys(bus.depths(), limit),
+        "background_tasks": background_tasks(),
+        "asyncio_tasks": {
+            "total": sum(tasks.values()),
+            "top": dict(list(tasks.items())[:limit]),
+        },
+    }
+
+
+def collect() -> Iterable[Sample]:
+    rss = rss_bytes()
+    if rss is not None:
+        yield "process_rss_bytes", {}, rss
+    yield "ws_background_tasks", {}, background_tasks()
+    yield "asyncio_tasks", {}, sum(task_counts().values())
+
+
+allocation_tracker = AllocationTracker()
+metrics.register_collector(collect)
+metrics.register_collector(allocation_tracker.collect)
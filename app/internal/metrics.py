@@ -0,0 +1,104 @@
+# app/internal/metrics.py
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in key)
+    return "{" + inner + "}"
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics, exposed on /debug/metrics.
+
+    Counters and gauges are plain attributes bumped from the event loop
+    thread, so there is no locking. Values that are cheaper to read on demand
+    (pool sizes, registry lengths) are provided by collectors, which are
+    called only when a snapshot is taken.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, Dict[LabelKey, Counter]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, Gauge]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        series = self._counters.setdefault(name, {})
+        key = _label_key(labels)
+        c = series.get(key)
+        if c is None:
+            c = series[key] = Counter()
+        return c
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        series = self._gauges.setdefault(name, {})
+        key = _label_key(labels)
+        g = series.get(key)
+        if g is None:
+            g = series[key] = Gauge()
+        return g
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        out: List[Tuple[str, LabelKey, float]] = []
+        for name, counters in self._counters.items():
+            out.extend((name, key, c.value) for key, c in counters.items())
+        for name, gauges in self._gauges.items():
+            out.extend((name, key, g.value) for key, g in gauges.items())
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                out.append((name, _label_key(labels), float(value)))
+        return out
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            name + _format_labels(key): value for name, key, value in self.samples()
+        }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            f"{name}{_format_labels(key)} {value}"
+            for name, key, value in self.samples()
+        ]
+        return "\n".join(sorted(lines)) + "\n"
+
+
+# Global singleton
+metrics = MetricsRegistry()
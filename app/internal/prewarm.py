@@ -0,0 +1,136 @@
+# app/internal/prewarm.py
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from graphql import parse, validate
+from sqlalchemy import text
+
+from app.internal.metrics import Sample, metrics
+from app.internal.startup_profile import startup_profile
+
+Phase = Tuple[str, Callable[[], Awaitable[Any]]]
+
+# What clients send first after a deploy: GraphiQL / codegen introspection,
+# then the dashboard. Executed (introspection) or parsed and validated
+# (dashboard, which needs a user) before we take traffic.
+INTROSPECTION_QUERY = """
+query PrewarmIntrospection {
+  __schema {
+    queryType { name }
+    types { name kind fields { name type { name kind ofType { name kind } } } }
+  }
+}
+"""
+
+DASHBOARD_OPERATIONS = (
+    "query Me { me { id email displayName } }",
+    """
+    query Datastore($id: String!) {
+      datastore(id: $id) {
+        id name description createdAt
+        metrics {
+          capacityBytes usedBytes freeBytes usedPercent fileCount lastUploadAt
+          byCategory { category contentTypes fileCount totalBytes }
+        }
+        files(limit: 25, offset: 0) {
+          totalCount limit offset
+          items { id filename contentType size createdAt tags clientToken }
+        }
+      }
+    }
+    """,
+)
+
+
+async def warm_pool(engine: Any, connections: int) -> int:
+    """
+    Open `connections` pool connections at once (capped at the pool size)
+    and run a trivial statement on each, so they are established, pre-pinged
+    and back in the pool before the first request needs one.
+    """
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+    async with AsyncExitStack() as stack:
+        conns = [
+            await stack.enter_async_context(engine.connect())
+            for _ in range(connections)
+        ]
+        await asyncio.gather(*(c.execute(text("SELECT 1")) for c in conns))
+    return connections
+
+
+async def warm_operations(schema: Any, documents: Sequence[str]) -> int:
+    """
+    Execute introspection and parse/validate `documents` against `schema`,
+    paying graphql-core's and strawberry's first-use costs here.
+    """
+    result = await schema.execute(
+        INTROSPECTION_QUERY, context_value={"prewarm": True, "current_user": None}
+    )
+    if result.errors:
+        raise RuntimeError(f"introspection failed: {result.errors[0]}")
+    for doc in documents:
+        errors = validate(schema._schema, parse(doc))
+        if errors:
+            raise RuntimeError(f"prewarm operation is invalid: {errors[0]}")
+    return 1 + len(documents)
+
+
+class Prewarmer:
+    """
+    Runs the startup prewarm phases in order, timing each one.
+
+    A failing phase is recorded (and counted) but does not stop the others or
+    the startup: prewarming only moves first-request costs earlier. The
+    whole run is bounded by a timeout so a slow dependency cannot keep the
+    pod from becoming ready.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.done = False
+
+    async def _phase(self, name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        started = time.perf_counter()
+        row: Dict[str, Any] = {"ok": False}
+        self.phases[name] = row
+        try:
+            row["result"] = await fn()
+            row["ok"] = True
+        except Exception as e:
+            row["error"] = repr(e)
+            metrics.counter("prewarm_failures_total", phase=name).inc()
+        finally:
+            row["ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+            startup_profile.mark(f"prewarm_{name}")
+
+    async def run(self, phases: List[Phase], timeout: Optional[float]) -> None:
+        async def all_phases() -> None:
+            for name, fn in phases:
+                await self._phase(name, fn)
+
+        try:
+            await asyncio.wait_for(all_phases(), timeout)
+        except asyncio.TimeoutError:
+            for row in self.phases.values():
+                if not row["ok"]:
+                    row.setdefault("error", "timed out")
+        finally:
+            self.done = True
+
+    def report(self) -> Dict[str, Any]:
+        return {"done": self.done, "phases": self.phases}
+
+    def collect(self) -> List[Sample]:
+        return [
+            ("prewarm_phase_ms", {"phase": name}, row["ms"])
+            for name, row in self.phases.items()
+            if "ms" in row
+        ]
+
+
+prewarmer = Prewarmer()
+metrics.register_collector(prewarmer.collect)
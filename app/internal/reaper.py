@@ -0,0 +1,86 @@
+# app/internal/reaper.py
+import asyncio
+from typing import Callable, Dict, Iterable, Tuple
+
+from app.core.config import get_service_settings
+from app.internal.metrics import Sample, metrics
+from app.internal.ws_connections import (
+    KEEPALIVE_CLOSE_CODE,
+    run_in_background,
+    ws_connections,
+)
+
+# Removes orphaned entries from one subscriber registry; returns how many.
+Sweep = Callable[[], int]
+# Subscribers currently held by that registry, per key.
+Depths = Callable[[], Dict[str, int]]
+
+
+class SubscriptionReaper:
+    """
+    Periodic backstop against subscriptions outliving their clients.
+
+    Keepalive (GraphQLTransportWSHandler) closes sockets that stop answering
+    pings, which ends their subscriptions and unregisters their queues. This
+    sweeper catches what is left over: sockets that have no such keepalive
+    (graphql-ws clients only get a one-way `ka`) and sent nothing for
+    GRAPHQL_WS_IDLE_TIMEOUT_SECONDS, and queues still registered for a closed
+    or evicted connection (see SubscriptionQueue.orphaned).
+
+    Registries plug in with `register(name, sweep, depths)`; their sizes are
+    exported as gauges and detailed on /debug/memory.
+    """
+
+    def __init__(self) -> None:
+        self._registries: Dict[str, Tuple[Sweep, Depths]] = {}
+
+    def register(self, name: str, sweep: Sweep, depths: Depths) -> None:
+        self._registries[name] = (sweep, depths)
+
+    def depths(self) -> Dict[str, Dict[str, int]]:
+        return {name: depths() for name, (_, depths) in self._registries.items()}
+
+    def reap_idle(self) -> int:
+        timeout = get_service_settings().ws_idle_timeout_seconds
+        if timeout <= 0:
+            return 0
+        reaped = 0
+        for conn in ws_connections.connections():
+            # No closer: an HTTP subscription stream, not a socket.
+            if conn.pong_keepalive or conn.closer is None:
+                continue
+            if conn.idle_seconds < timeout:
+                continue
+            ws_connections.close(conn)
+            run_in_background(conn.closer(KEEPALIVE_CLOSE_CODE, "idle"))
+            reaped += 1
+        if reaped:
+            metrics.counter("ws_reaped_total", reason="idle").inc(reaped)
+        return reaped
+
+    def sweep(self) -> Dict[str, int]:
+        swept = {"idle_connections": self.reap_idle()}
+        for name, (sweep, _) in self._registries.items():
+            removed = sweep()
+            swept[name] = removed
+            if removed:
+                metrics.counter(
+                    "ws_reaped_total", reason="orphaned", registry=name
+                ).inc(removed)
+        return swept
+
+    async def run(self) -> None:
+        """Background task started by lifespan."""
+        interval = get_service_settings().ws_sweep_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def collect(self) -> Iterable[Sample]:
+        for name, per_key in self.depths().items():
+            yield "ws_registered_subscribers", {"registry": name}, sum(per_key.values())
+            yield "ws_registered_keys", {"registry": name}, len(per_key)
+
+
+subscription_reaper = SubscriptionReaper()
+metrics.register_collector(subscription_reaper.collect)
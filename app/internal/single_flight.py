@@ -0,0 +1,58 @@
+# app/internal/single_flight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, TypeVar
+
+from app.internal.metrics import Sample, metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent reads into one.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of starting their own. The key
+    is forgotten as soon as the task finishes, so this never serves stale
+    results; it only removes duplicate work that is in flight at the same
+    moment (e.g. every dashboard refetching a datastore that just became
+    ready). Results and exceptions are shared by all callers, so only use it
+    for reads whose result does not depend on the caller; authorization
+    stays with each caller. The work runs in the first caller's context,
+    including its DB role, so keys must include the role (read_role()):
+    a caller that has to read the primary must not join a replica read.
+
+    A caller being cancelled does not cancel the shared task.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            metrics.counter("single_flight_calls_total", flight=self.name).inc()
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            metrics.counter("single_flight_shared_total", flight=self.name).inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved; nobody may be waiting any more
+
+    def collect(self) -> Iterable[Sample]:
+        yield "single_flight_inflight", {"flight": self.name}, len(self._inflight)
+
+
+datastore_flight = SingleFlight("datastore")
+metrics_flight = SingleFlight("datastore_metrics")
+files_page_flight = SingleFlight("datastore_files_page")
+
+for _flight in (datastore_flight, metrics_flight, files_page_flight):
+    metrics.register_collector(_flight.collect)
@@ -0,0 +1,102 @@
+# app/internal/snapshots.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.internal.metrics import Sample, metrics
+
+Snapshot = Dict[str, Any]
+Loader = Callable[[str], Awaitable[Snapshot]]
+
+
+def diff_snapshots(old: Optional[Snapshot], new: Snapshot) -> Snapshot:
+    """Fields of `new` that differ from `old` (all of them when `old` is None)."""
+    if old is None:
+        return dict(new)
+    return {k: v for k, v in new.items() if k not in old or old[k] != v}
+
+
+class _Entry:
+    __slots__ = ("version", "snapshot", "dirty", "refs", "lock", "deltas")
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.snapshot: Optional[Snapshot] = None
+        self.dirty = True
+        self.refs = 0
+        self.lock = asyncio.Lock()
+        # Delta from a previous version to the current one, shared by every
+        # subscriber that is on that version.
+        self.deltas: Dict[int, Snapshot] = {}
+
+
+class VersionedSnapshots:
+    """
+    One shared, versioned snapshot per key for delta subscriptions.
+
+    `invalidate` only marks a key dirty; the first subscriber to ask for it
+    afterwards reloads it once for everybody. The version is bumped only
+    when the reloaded snapshot actually differs, and deltas are computed once
+    per (from_version, current_version) pair. Keys are kept while at least
+    one subscriber holds them.
+    """
+
+    def __init__(self, name: str, loader: Loader) -> None:
+        self.name = name
+        self._loader = loader
+        self._entries: Dict[str, _Entry] = {}
+
+    def acquire(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.refs += 1
+
+    def release(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.refs -= 1
+        if entry.refs <= 0:
+            del self._entries[key]
+
+    def invalidate(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.dirty = True
+
+    async def current(self, key: str) -> Tuple[int, Snapshot]:
+        entry = self._entries[key]
+        # A locked entry is being reloaded: wait for that load to finish.
+        if entry.dirty or entry.lock.locked():
+            async with entry.lock:
+                if entry.dirty:
+                    # Clear first: an invalidate() during the load must
+                    # trigger another one.
+                    entry.dirty = False
+                    try:
+                        snapshot = await self._loader(key)
+                    except BaseException:
+                        entry.dirty = True
+                        raise
+                    metrics.counter("snapshot_loads_total", snapshot=self.name).inc()
+                    if snapshot != entry.snapshot:
+                        entry.snapshot = snapshot
+                        entry.version += 1
+                        entry.deltas.clear()
+        assert entry.snapshot is not None
+        return entry.version, entry.snapshot
+
+    def delta(self, key: str, from_version: int, old: Optional[Snapshot]) -> Snapshot:
+        """Changes from `old` (the snapshot at `from_version`) to the current one."""
+        entry = self._entries[key]
+        assert entry.snapshot is not None
+        cached = entry.deltas.get(from_version)
+        if cached is None:
+            cached = entry.deltas[from_version] = diff_snapshots(old, entry.snapshot)
+        return cached
+
+    def collect(self) -> Iterable[Sample]:
+        yield "snapshot_keys", {"snapshot": self.name}, len(self._entries)
+        yield "snapshot_subscribers", {"snapshot": self.name}, sum(
+            e.refs for e in self._entries.values()
+        )
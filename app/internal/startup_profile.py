@@ -0,0 +1,74 @@
+# app/internal/startup_profile.py
+import time
+from typing import Any, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Captured when this module is first imported. app/main.py imports it before
+# anything else, so this is as close to "process started importing the app"
+# as we can get without platform-specific process start times.
+_T0 = time.perf_counter()
+
+
+class StartupProfile:
+    """
+    Wall-clock milestones of a cold start, in milliseconds since `_T0`.
+
+    Milestones are recorded once; the first value wins. The per-module import
+    breakdown is produced out of process by app/debug/startup_report.py.
+    """
+
+    def __init__(self, t0: float) -> None:
+        self._t0 = t0
+        self._marks: Dict[str, float] = {}
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    def mark(self, name: str) -> float:
+        if name not in self._marks:
+            self._marks[name] = self.elapsed_ms()
+        return self._marks[name]
+
+    def get(self, name: str) -> Optional[float]:
+        return self._marks.get(name)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "marks_ms": {k: round(v, 2) for k, v in self._marks.items()},
+            "uptime_ms": round(self.elapsed_ms(), 2),
+        }
+
+
+startup_profile = StartupProfile(_T0)
+
+FIRST_GRAPHQL_RESPONSE = "first_graphql_response"
+
+
+class FirstGraphQLResponseMiddleware:
+    """
+    Pure ASGI middleware that records the first successful /graphql response.
+
+    Once the mark exists it is a single dict lookup per request, and unlike
+    BaseHTTPMiddleware it does not buffer streaming responses.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/graphql") -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or startup_profile.get(FIRST_GRAPHQL_RESPONSE) is not None
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                startup_profile.mark(FIRST_GRAPHQL_RESPONSE)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
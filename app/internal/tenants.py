@@ -0,0 +1,344 @@
+# app/internal/tenants.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from graphql import GraphQLError
+
+from app.core.config import get_service_settings
+from app.internal.metrics import Sample, metrics
+
+# Events whose organization is not known (e.g. no subscriber asked yet).
+UNKNOWN_TENANT = "unknown"
+
+
+def tenant_key(user: Any) -> str:
+    """Organization of `user`; users without one are their own tenant."""
+    if user is None:
+        return UNKNOWN_TENANT
+    org_id = getattr(user, "organization_id", None)
+    if org_id:
+        return f"org:{org_id}"
+    return f"user:{user.id}"
+
+
+class TenantBusyError(GraphQLError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Too many concurrent requests for this organization; retry shortly",
+            extensions={"code": "TENANT_BUSY"},
+        )
+
+
+class _Waiter:
+    __slots__ = ("future", "start", "finish")
+
+    def __init__(self, future: "asyncio.Future[None]", start: float, finish: float):
+        self.future = future
+        self.start = start
+        self.finish = finish
+
+
+class _TenantState:
+    __slots__ = ("running", "waiters", "last_finish")
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.waiters: Deque[_Waiter] = deque()
+        # Virtual finish time of this tenant's last queued request.
+        self.last_finish = 0.0
+
+
+class FairLimiter:
+    """
+    `capacity` slots shared by all tenants, at most `per_tenant` of them per
+    tenant. While slots are free nobody waits; once they are all taken,
+    waiters are admitted by weighted fair queuing, smallest virtual finish
+    time first: a tenant with weight 2 gets twice the admissions of a tenant
+    with weight 1 while both have work queued, and a tenant that sends a
+    burst only queues behind itself.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        per_tenant: int,
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.name = name
+        self.capacity = capacity
+        self.per_tenant = max(1, min(per_tenant, capacity)) if capacity else 0
+        self._weights = dict(weights or {})
+        self._tenants: Dict[str, _TenantState] = {}
+        self._running = 0
+        self._vtime = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _state(self, tenant: str) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _TenantState()
+        return state
+
+    def _eligible(self, state: _TenantState) -> bool:
+        return state.running < self.per_tenant
+
+    def _grant(self, tenant: str, state: _TenantState) -> None:
+        state.running += 1
+        self._running += 1
+        metrics.counter(
+            "tenant_slots_granted_total", pool=self.name, tenant=tenant
+        ).inc()
+
+    def _dispatch(self) -> None:
+        while self._running < self.capacity:
+            best: Optional[str] = None
+            for tenant, state in self._tenants.items():
+                if not state.waiters or not self._eligible(state):
+                    continue
+                if best is None or (
+                    state.waiters[0].finish < self._tenants[best].waiters[0].finish
+                ):
+                    best = tenant
+            if best is None:
+                return
+            state = self._tenants[best]
+            waiter = state.waiters.popleft()
+            self._vtime = max(self._vtime, waiter.start)
+            self._grant(best, state)
+            waiter.future.set_result(None)
+
+    async def acquire(self, tenant: str, timeout: Optional[float] = None) -> None:
+        state = self._state(tenant)
+        if (
+            self._running < self.capacity
+            and self._eligible(state)
+            and not any(s.waiters and self._eligible(s) for s in self._tenants.values())
+        ):
+            self._grant(tenant, state)
+            return
+
+        weight = self._weights.get(tenant, 1.0)
+        start = max(self._vtime, state.last_finish)
+        state.last_finish = start + 1.0 / weight
+        waiter = _Waiter(
+            asyncio.get_running_loop().create_future(), start, state.last_finish
+        )
+        state.waiters.append(waiter)
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we gave up: hand the slot on.
+                self.release(tenant, 0.0)
+            else:
+                waiter.future.cancel()
+                state.waiters.remove(waiter)
+                self._forget_if_idle(tenant, state)
+            raise
+        finally:
+            metrics.counter(
+                "tenant_wait_seconds_total", pool=self.name, tenant=tenant
+            ).inc(time.monotonic() - queued_at)
+
+    def _forget_if_idle(self, tenant: str, state: _TenantState) -> None:
+        if not state.running and not state.waiters:
+            self._tenants.pop(tenant, None)
+
+    def release(self, tenant: str, held_s: float) -> None:
+        state = self._tenants[tenant]
+        state.running -= 1
+        self._running -= 1
+        metrics.counter("tenant_busy_seconds_total", pool=self.name, tenant=tenant).inc(
+            held_s
+        )
+        self._dispatch()
+        self._forget_if_idle(tenant, state)
+
+    async def enter(self, tenant: str, timeout: Optional[float] = None) -> float:
+        """acquire() for request handling: TenantBusyError on timeout, and a
+        no-op when the limiter is disabled. Pass the result to exit()."""
+        if self.enabled:
+            try:
+                await self.acquire(tenant, timeout)
+            except asyncio.TimeoutError:
+                metrics.counter(
+                    "tenant_slots_rejected_total", pool=self.name, tenant=tenant
+                ).inc()
+                raise TenantBusyError() from None
+        return time.monotonic()
+
+    def exit(self, tenant: str, entered: float) -> None:
+        if self.enabled:
+            self.release(tenant, time.monotonic() - entered)
+
+    @asynccontextmanager
+    async def slot(
+        self, tenant: str, timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        entered = await self.enter(tenant, timeout)
+        try:
+            yield
+        finally:
+            self.exit(tenant, entered)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            tenant: {
+                "running": s.running,
+                "queued": len(s.waiters),
+                "weight": self._weights.get(tenant, 1.0),
+            }
+            for tenant, s in self._tenants.items()
+        }
+
+    def collect(self) -> Iterable[Sample]:
+        yield "tenant_slots_in_use", {"pool": self.name}, self._running
+        yield "tenant_slots_capacity", {"pool": self.name}, self.capacity
+        for tenant, state in self._tenants.items():
+            labels = {"pool": self.name, "tenant": tenant}
+            yield "tenant_slots_running", labels, state.running
+            yield "tenant_slots_queued", labels, len(state.waiters)
+
+
+Job = Callable[[], Awaitable[None]]
+# Called instead of the job when a full queue drops it.
+OnDrop = Callable[[], None]
+
+
+class TenantFanout:
+    """
+    Per-tenant work queues drained round robin by `workers` tasks, with at
+    most `per_tenant` jobs of one tenant running at a time. A tenant with a
+    burst of events only delays its own events; others keep their turn.
+    A full tenant queue drops its oldest job and calls its `on_drop`; the
+    jobs of that tenant queued before it have all started by then.
+    """
+
+    def __init__(
+        self, name: str, workers: int, per_tenant: int, queue_size: int
+    ) -> None:
+        self.name = name
+        self.workers = max(1, workers)
+        self.per_tenant = max(1, per_tenant)
+        self.queue_size = queue_size
+        self._queues: Dict[str, Deque[Tuple[Job, Optional[OnDrop]]]] = {}
+        self._running: Dict[str, int] = {}
+        # Tenants with queued jobs and a free per-tenant slot, in turn order.
+        self._ready: Deque[str] = deque()
+        self._wakeup = asyncio.Event()
+
+    def _maybe_ready(self, tenant: str) -> None:
+        if (
+            self._queues.get(tenant)
+            and self._running.get(tenant, 0) < self.per_tenant
+            and tenant not in self._ready
+        ):
+            self._ready.append(tenant)
+            self._wakeup.set()
+
+    def submit(self, tenant: str, job: Job, on_drop: Optional[OnDrop] = None) -> None:
+        queue = self._queues.setdefault(tenant, deque())
+        if len(queue) >= self.queue_size:
+            _, dropped = queue.popleft()
+            metrics.counter(
+                "tenant_fanout_dropped_total", fanout=self.name, tenant=tenant
+            ).inc()
+            if dropped is not None:
+                dropped()
+        queue.append((job, on_drop))
+        metrics.counter(
+            "tenant_fanout_submitted_total", fanout=self.name, tenant=tenant
+        ).inc()
+        self._maybe_ready(tenant)
+
+    def _next(self) -> Optional[str]:
+        while self._ready:
+            tenant = self._ready.popleft()
+            if self._queues.get(tenant):
+                return tenant
+        return None
+
+    async def _run_one(self, tenant: str) -> None:
+        job, _ = self._queues[tenant].popleft()
+        self._running[tenant] = self._running.get(tenant, 0) + 1
+        # Its next job waits for the other ready tenants.
+        self._maybe_ready(tenant)
+        started = time.monotonic()
+        try:
+            await job()
+        except Exception:  # jobs log their own errors; keep the worker alive
+            metrics.counter(
+                "tenant_fanout_failed_total", fanout=self.name, tenant=tenant
+            ).inc()
+        finally:
+            metrics.counter(
+                "tenant_fanout_busy_seconds_total", fanout=self.name, tenant=tenant
+            ).inc(time.monotonic() - started)
+            self._running[tenant] -= 1
+            if not self._running[tenant]:
+                del self._running[tenant]
+            if not self._queues[tenant] and tenant not in self._running:
+                del self._queues[tenant]
+            else:
+                self._maybe_ready(tenant)
+
+    async def _worker(self) -> None:
+        while True:
+            tenant = self._next()
+            if tenant is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._run_one(tenant)
+
+    async def run(self) -> None:
+        """Background task started by lifespan."""
+        await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+
+    def depths(self) -> Dict[str, int]:
+        return {tenant: len(q) for tenant, q in self._queues.items()}
+
+    def collect(self) -> Iterable[Sample]:
+        for tenant, depth in self.depths().items():
+            labels = {"fanout": self.name, "tenant": tenant}
+            yield "tenant_fanout_queued", labels, depth
+            yield "tenant_fanout_running", labels, self._running.get(tenant, 0)
+
+
+_settings = get_service_settings()
+
+# GraphQL queries and mutations; see TenantIsolationExtension.
+db_limiter = FairLimiter(
+    "db",
+    _settings.tenant_db_slots,
+    _settings.tenant_max_db_slots,
+    _settings.tenant_weights,
+)
+# file:status events, fanned out to the subscribers of each organization.
+file_status_fanout = TenantFanout(
+    "file_status",
+    _settings.tenant_fanout_workers,
+    _settings.tenant_fanout_concurrency,
+    _settings.tenant_fanout_queue_size,
+)
+metrics.register_collector(db_limiter.collect)
+metrics.register_collector(file_status_fanout.collect)
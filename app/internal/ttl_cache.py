@@ -0,0 +1,57 @@
+# app/internal/ttl_cache.py
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+from app.internal.metrics import Sample, metrics
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """
+    Bounded LRU whose entries expire `ttl` seconds after they were stored.
+
+    Per process: `invalidate` only drops this pod's entry, so the TTL is
+    what bounds how stale another pod's copy can be. Only cache reads that
+    may already be that stale (e.g. replica reads).
+    """
+
+    def __init__(self, name: str, max_entries: int = 10_000) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        outcome = "miss" if entry is None else "hit"
+        metrics.counter(
+            "ttl_cache_requests_total", cache=self.name, outcome=outcome
+        ).inc()
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, value: T, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def collect(self) -> Iterable[Sample]:
+        yield "ttl_cache_entries", {"cache": self.name}, len(self._entries)
+
+
+metrics_cache: TTLCache = TTLCache("datastore_metrics")
+
+metrics.register_collector(metrics_cache.collect)
@@ -0,0 +1,249 @@
+# app/internal/user_changes.py
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from graphql import GraphQLError
+
+from app.internal.metrics import Sample, metrics
+from app.internal.reaper import subscription_reaper
+from app.internal.ws_connections import SubscriptionQueue
+
+USER_CHANGE_KEYS = ("user_created", "user_updated", "user_deleted")
+
+# Always kept when a payload is trimmed to the requested columns.
+_KEY_COLUMNS = frozenset({"id"})
+
+
+class UnknownUserChangeOpError(GraphQLError):
+    def __init__(self, ops: Iterable[str]) -> None:
+        super().__init__(
+            f"Unknown user change ops: {sorted(ops)}; expected {USER_CHANGE_KEYS}",
+            extensions={"code": "UNKNOWN_USER_CHANGE_OP"},
+        )
+
+
+def _row(payload: Dict[str, Any], key: str) -> Dict[str, Any]:
+    row = payload.get(key)
+    return row if isinstance(row, dict) else {}
+
+
+def changed_columns(payload: Dict[str, Any]) -> FrozenSet[str]:
+    data, old = _row(payload, "data"), _row(payload, "old_data")
+    if data and old:
+        return frozenset(
+            k for k in data.keys() | old.keys() if data.get(k) != old.get(k)
+        )
+    return frozenset(data or old)
+
+
+def trim_payload(payload: Dict[str, Any], columns: FrozenSet[str]) -> Dict[str, Any]:
+    """Copy of a trigger payload with `data`/`old_data` cut to `columns`."""
+    keep = columns | _KEY_COLUMNS
+    out = dict(payload)
+    for key in ("data", "old_data"):
+        row = payload.get(key)
+        if isinstance(row, dict):
+            out[key] = {k: v for k, v in row.items() if k in keep}
+    return out
+
+
+class UserChangeFilter:
+    """
+    What one subscriber wants. Empty/None criteria match everything;
+    `columns` trims the delivered payload, `changed_columns` only passes
+    events that changed at least one of them.
+    """
+
+    __slots__ = ("ops", "user_ids", "organization_ids", "changed_columns", "columns")
+
+    def __init__(
+        self,
+        ops: Optional[Iterable[str]] = None,
+        user_ids: Optional[Iterable[str]] = None,
+        organization_ids: Optional[Iterable[str]] = None,
+        changed_columns: Optional[Iterable[str]] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.ops = frozenset(o.lower() for o in ops) if ops else None
+        self.user_ids = frozenset(map(str, user_ids)) if user_ids else None
+        self.organization_ids = (
+            frozenset(map(str, organization_ids)) if organization_ids else None
+        )
+        self.changed_columns = frozenset(changed_columns) if changed_columns else None
+        self.columns = frozenset(columns) if columns else None
+
+    def matches(self, change: "UserChangeEvent") -> bool:
+        if self.ops is not None and change.event_key not in self.ops:
+            return False
+        if self.user_ids is not None and change.user_id not in self.user_ids:
+            return False
+        if (
+            self.organization_ids is not None
+            and change.organization_id not in self.organization_ids
+        ):
+            return False
+        if self.changed_columns is not None and not (
+            self.changed_columns & change.changed_columns
+        ):
+            return False
+        return True
+
+
+class UserChangeEvent:
+    """A user:changes message, with the fields the index routes on."""
+
+    __slots__ = (
+        "event_key",
+        "operation",
+        "payload",
+        "user_id",
+        "organization_id",
+        "changed_columns",
+    )
+
+    def __init__(self, event_key: str, payload: Dict[str, Any]) -> None:
+        row = _row(payload, "data") or _row(payload, "old_data")
+        self.event_key = event_key
+        self.operation = str(payload.get("operation") or "")
+        self.payload = payload
+        self.user_id = str(row["id"]) if row.get("id") is not None else None
+        org = row.get("organization_id")
+        self.organization_id = str(org) if org is not None else None
+        self.changed_columns = changed_columns(payload)
+
+
+class _Subscriber:
+    __slots__ = ("filter", "queue")
+
+    def __init__(self, flt: UserChangeFilter, queue: SubscriptionQueue) -> None:
+        self.filter = flt
+        self.queue = queue
+
+
+class UserChangeIndex:
+    """
+    Routes user:changes events to interested subscribers only.
+
+    Subscribers filtering on user ids are indexed by user id, those
+    filtering on organizations (and not users) by organization; only the
+    rest are checked for every event. The payload is trimmed once per
+    distinct `columns` set per event, before it reaches any queue, so
+    serialization only sees the requested columns. Subscribers get
+    (operation, payload) tuples on their SubscriptionQueue.
+    """
+
+    def __init__(self) -> None:
+        self._by_user: Dict[str, Set[_Subscriber]] = {}
+        self._by_org: Dict[str, Set[_Subscriber]] = {}
+        self._unindexed: Set[_Subscriber] = set()
+
+    def _index_of(
+        self, flt: UserChangeFilter
+    ) -> Tuple[Optional[Dict[str, Set[_Subscriber]]], FrozenSet[str]]:
+        """Index holding a filter's subscribers and its keys there; None for
+        the unindexed set."""
+        if flt.user_ids is not None:
+            return self._by_user, flt.user_ids
+        if flt.organization_ids is not None:
+            return self._by_org, flt.organization_ids
+        return None, frozenset()
+
+    def add(self, flt: UserChangeFilter, queue: SubscriptionQueue) -> _Subscriber:
+        sub = _Subscriber(flt, queue)
+        index, keys = self._index_of(flt)
+        if index is None:
+            self._unindexed.add(sub)
+            return sub
+        for key in keys:
+            index.setdefault(key, set()).add(sub)
+        return sub
+
+    def remove(self, sub: _Subscriber) -> None:
+        """Only touches the buckets `sub`'s filter put it in."""
+        index, keys = self._index_of(sub.filter)
+        if index is None:
+            self._unindexed.discard(sub)
+            return
+        for key in keys:
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.discard(sub)
+            if not bucket:
+                del index[key]
+
+    def publish(self, event_key: str, payload: Dict[str, Any]) -> int:
+        change = UserChangeEvent(event_key, payload)
+        metrics.counter("user_changes_published_total", op=event_key).inc()
+
+        candidates: Set[_Subscriber] = set(self._unindexed)
+        if change.user_id is not None:
+            candidates |= self._by_user.get(change.user_id, set())
+        if change.organization_id is not None:
+            candidates |= self._by_org.get(change.organization_id, set())
+
+        trimmed: Dict[Optional[FrozenSet[str]], Dict[str, Any]] = {None: payload}
+        delivered = 0
+        for sub in candidates:
+            if not sub.filter.matches(change):
+                continue
+            columns = sub.filter.columns
+            body = trimmed.get(columns)
+            if body is None:
+                body = trimmed[columns] = trim_payload(payload, columns)
+            if sub.queue.offer((change.operation, body)):
+                delivered += 1
+
+        metrics.counter("user_changes_delivered_total").inc(delivered)
+        return delivered
+
+    def sweep(self) -> int:
+        """Remove subscribers whose queue nobody reads any more."""
+        orphaned = {
+            sub
+            for bucket in (
+                *self._by_user.values(),
+                *self._by_org.values(),
+                self._unindexed,
+            )
+            for sub in bucket
+            if sub.queue.orphaned
+        }
+        for sub in orphaned:
+            self.remove(sub)
+            sub.queue.discard()
+        return len(orphaned)
+
+    def depths(self) -> Dict[str, int]:
+        out = {f"user:{k}": len(v) for k, v in self._by_user.items()}
+        out.update((f"organization:{k}", len(v)) for k, v in self._by_org.items())
+        if self._unindexed:
+            out["*"] = len(self._unindexed)
+        return out
+
+    def sizes(self) -> Tuple[int, int, int]:
+        return (
+            sum(len(s) for s in self._by_user.values()),
+            sum(len(s) for s in self._by_org.values()),
+            len(self._unindexed),
+        )
+
+    def collect(self) -> Iterable[Sample]:
+        by_user, by_org, unindexed = self.sizes()
+        yield "user_changes_subscribers", {"index": "user"}, by_user
+        yield "user_changes_subscribers", {"index": "organization"}, by_org
+        yield "user_changes_subscribers", {"index": "none"}, unindexed
+
+
+user_change_index = UserChangeIndex()
+metrics.register_collector(user_change_index.collect)
+subscription_reaper.register(
+    "user_changes", user_change_index.sweep, user_change_index.depths
+)
@@ -0,0 +1,552 @@
+# app/internal/ws_connections.py
+import asyncio
+import itertools
+import math
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+
+from graphql import GraphQLError
+
+from app.core.config import get_service_settings
+from app.internal.metrics import Sample, metrics
+
+# Time constant of the per-connection event rate (exponentially decayed).
+_RATE_TAU_SECONDS = 10.0
+
+_ids = itertools.count(1)
+
+# Closes the underlying websocket: (close code, reason).
+Closer = Callable[[int, str], Awaitable[None]]
+
+# Websocket close code for clients evicted for not keeping up.
+SLOW_CONSUMER_CLOSE_CODE = 4008
+# ... and for clients that stopped answering pings (or went idle).
+KEEPALIVE_CLOSE_CODE = 4504
+
+
+def approx_size(item: Any) -> int:
+    """
+    Rough in-memory size of a queued event: the object plus its direct
+    attribute values. Good enough to rank connections, not an exact count.
+    """
+    if item is None:
+        return 0
+    size = sys.getsizeof(item)
+    fields = getattr(item, "__dict__", None)
+    if fields:
+        size += sum(sys.getsizeof(v) for v in fields.values())
+    return size
+
+
+class SubscriptionLimitError(GraphQLError):
+    def __init__(self, message: str) -> None:
+        super().__init__(message, extensions={"code": "SUBSCRIPTION_LIMIT"})
+
+
+class DrainingError(GraphQLError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Server is draining; reconnect to start subscriptions",
+            extensions={"code": "DRAINING"},
+        )
+
+
+class SlowConsumerError(GraphQLError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Subscription evicted: client is not keeping up with events",
+            extensions={"code": "SLOW_CONSUMER"},
+        )
+
+
+class ConnectionStats:
+    """Accounting for one websocket (or one HTTP subscription stream)."""
+
+    __slots__ = (
+        "connection_id",
+        "user_id",
+        "opened_at",
+        "subscriptions",
+        "queued_events",
+        "queued_bytes",
+        "events_total",
+        "bytes_total",
+        "dropped_total",
+        "closer",
+        "queues",
+        "evicted",
+        "closed",
+        "last_seen",
+        "pong_keepalive",
+        "_rate",
+        "_rate_at",
+    )
+
+    def __init__(
+        self,
+        connection_id: str,
+        user_id: Optional[str] = None,
+        closer: Optional[Closer] = None,
+    ) -> None:
+        self.connection_id = connection_id
+        self.user_id = user_id
+        self.closer = closer
+        self.queues: Set["SubscriptionQueue"] = set()
+        self.evicted = False
+        self.closed = False
+        # Monotonic time of the last message from the client (of the open
+        # until one arrives; HTTP streams never get one).
+        self.last_seen = time.monotonic()
+        # Set while a graphql-transport-ws ping/pong keepalive watches this
+        # socket; the others are closed by the reaper once idle too long.
+        self.pong_keepalive = False
+        self.opened_at = time.time()
+        self.subscriptions: Dict[str, int] = defaultdict(int)
+        self.queued_events = 0
+        self.queued_bytes = 0
+        self.events_total = 0
+        self.bytes_total = 0
+        self.dropped_total = 0
+        self._rate = 0.0
+        self._rate_at = time.monotonic()
+
+    @property
+    def active_subscriptions(self) -> int:
+        return sum(self.subscriptions.values())
+
+    @property
+    def rate_per_s(self) -> float:
+        elapsed = time.monotonic() - self._rate_at
+        return self._rate * math.exp(-elapsed / _RATE_TAU_SECONDS)
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_seen
+
+    def delivered(self, nbytes: int) -> None:
+        now = time.monotonic()
+        decay = math.exp(-(now - self._rate_at) / _RATE_TAU_SECONDS)
+        self._rate = self._rate * decay + 1.0 / _RATE_TAU_SECONDS
+        self._rate_at = now
+        self.events_total += 1
+        self.bytes_total += nbytes
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "connection_id": self.connection_id,
+            "user_id": self.user_id,
+            "opened_at": self.opened_at,
+            "active_subscriptions": self.active_subscriptions,
+            "subscriptions": dict(self.subscriptions),
+            "queued_events": self.queued_events,
+            "queued_bytes": self.queued_bytes,
+            "events_total": self.events_total,
+            "bytes_total": self.bytes_total,
+            "dropped_total": self.dropped_total,
+            "rate_per_s": round(self.rate_per_s, 3),
+            "idle_s": round(self.idle_seconds, 3),
+            "degraded_subscriptions": sum(1 for q in self.queues if q.degraded),
+            "oldest_event_age_s": round(
+                max((q.oldest_age for q in self.queues), default=0.0), 3
+            ),
+        }
+
+
+# Queue entry standing for events `offer` had to drop.
+_GAP = object()
+
+
+class _Pending:
+    __slots__ = ("key", "item", "nbytes", "enqueued_at")
+
+    def __init__(self, key: Hashable, item: Any, nbytes: int) -> None:
+        self.key = key
+        self.item = item
+        self.nbytes = nbytes
+        self.enqueued_at = time.monotonic()
+
+
+class SubscriptionQueue:
+    """
+    Bounded queue behind one subscription, charging its backlog to the
+    connection that owns it.
+
+    Publishers never block: `offer` drops the event (and counts it) when the
+    subscription's queue or its connection's byte budget is full, so a client
+    that stops reading cannot hold events for everyone else. With `resync`,
+    the subscriber then gets `resync()` where the dropped events would have
+    been (one per run of drops, after what was queued before them), so it
+    knows to refetch instead of missing them silently.
+
+    Slow consumers are handled in two steps, judged by queue depth and the
+    age of the oldest queued event. Past GRAPHQL_WS_SLOW_CONSUMER_* the
+    subscription is degraded: with a `coalesce_key`, queued events for the
+    same key (e.g. file id) collapse into the newest one. Past
+    GRAPHQL_WS_EVICT_CONSUMER_* the subscription is evicted: `get` raises
+    SlowConsumerError and the websocket is closed with 4008. A degraded
+    subscription that catches up goes back to normal.
+    """
+
+    __slots__ = (
+        "stats",
+        "maxsize",
+        "coalesce_key",
+        "resync",
+        "degraded",
+        "evicted",
+        "_items",
+        "_index",
+        "_ready",
+    )
+
+    def __init__(
+        self,
+        stats: ConnectionStats,
+        maxsize: Optional[int] = None,
+        coalesce_key: Optional[Callable[[Any], Hashable]] = None,
+        resync: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.stats = stats
+        if maxsize is None:
+            maxsize = get_service_settings().ws_subscription_queue_size
+        self.maxsize = maxsize
+        self.coalesce_key = coalesce_key
+        self.resync = resync
+        self.degraded = False
+        self.evicted = False
+        self._items: Deque[_Pending] = deque()
+        self._index: Dict[Hashable, _Pending] = {}
+        self._ready = asyncio.Event()
+        stats.queues.add(self)
+
+    @property
+    def pending(self) -> int:
+        return len(self._items)
+
+    @property
+    def orphaned(self) -> bool:
+        """Nobody will read this queue again: evicted, or its socket is gone."""
+        return self.evicted or self.stats.closed
+
+    @property
+    def oldest_age(self) -> float:
+        if not self._items:
+            return 0.0
+        return time.monotonic() - self._items[0].enqueued_at
+
+    def offer(self, item: Any) -> bool:
+        if self.evicted:
+            return False
+        nbytes = approx_size(item)
+        key = self.coalesce_key(item) if self.coalesce_key is not None else None
+
+        if self.degraded and key is not None:
+            entry = self._index.get(key)
+            if entry is not None:
+                self.stats.queued_bytes += nbytes - entry.nbytes
+                entry.item, entry.nbytes = item, nbytes
+                metrics.counter("ws_events_coalesced_total").inc()
+                return True
+
+        max_bytes = get_service_settings().ws_max_queued_bytes_per_connection
+        if self.stats.queued_bytes + nbytes > max_bytes or (
+            self.maxsize and len(self._items) >= self.maxsize
+        ):
+            self.stats.dropped_total += 1
+            metrics.counter("ws_events_dropped_total").inc()
+            self._mark_gap()
+            self._check_slow()
+            return False
+
+        entry = _Pending(key, item, nbytes)
+        self._items.append(entry)
+        if self.degraded and key is not None:
+            self._index[key] = entry
+        self.stats.queued_events += 1
+        self.stats.queued_bytes += nbytes
+        self._ready.set()
+        self._check_slow()
+        return True
+
+    def _mark_gap(self) -> None:
+        if self.resync is None or (self._items and self._items[-1].item is _GAP):
+            return
+        self._items.append(_Pending(_GAP, _GAP, 0))
+        self._ready.set()
+
+    def _check_slow(self) -> None:
+        s = get_service_settings()
+        depth, age = len(self._items), self.oldest_age
+        if not self.degraded:
+            if (
+                depth >= s.ws_slow_consumer_depth
+                or age >= s.ws_slow_consumer_age_seconds
+            ):
+                self._degrade()
+        elif (
+            depth >= s.ws_evict_consumer_depth or age >= s.ws_evict_consumer_age_seconds
+        ):
+            self._evict()
+
+    def _degrade(self) -> None:
+        self.degraded = True
+        metrics.counter("ws_slow_consumers_degraded_total").inc()
+        if self.coalesce_key is None:
+            return
+        # Keep one entry per key, at the position of its oldest event but
+        # carrying the newest one.
+        kept: Deque[_Pending] = deque()
+        for entry in self._items:
+            if entry.item is _GAP:
+                kept.append(entry)
+                continue
+            first = self._index.get(entry.key)
+            if first is None:
+                self._index[entry.key] = entry
+                kept.append(entry)
+                continue
+            self.stats.queued_events -= 1
+            self.stats.queued_bytes -= first.nbytes
+            first.item, first.nbytes = entry.item, entry.nbytes
+        self._items = kept
+
+    def _evict(self) -> None:
+        self.evicted = True
+        metrics.counter("ws_slow_consumers_evicted_total").inc()
+        self._ready.set()
+        if self.stats.closer is not None and not self.stats.evicted:
+            self.stats.evicted = True
+            run_in_background(
+                self.stats.closer(SLOW_CONSUMER_CLOSE_CODE, "slow consumer")
+            )
+
+    async def get(self) -> Any:
+        while not self._items and not self.evicted:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.evicted:
+            raise SlowConsumerError()
+
+        entry = self._items.popleft()
+        if entry.item is not _GAP:
+            if self._index.get(entry.key) is entry:
+                del self._index[entry.key]
+            self.stats.queued_events -= 1
+            self.stats.queued_bytes -= entry.nbytes
+            self.stats.delivered(entry.nbytes)
+
+        if self.degraded and not self._items:
+            # Caught up: back to one message per event.
+            self.degraded = False
+            self._index.clear()
+        if entry.item is _GAP:
+            assert self.resync is not None
+            return self.resync()
+        return entry.item
+
+    def discard(self) -> None:
+        """Give back whatever is still queued when the subscription ends."""
+        for entry in self._items:
+            if entry.item is not _GAP:
+                self.stats.queued_events -= 1
+                self.stats.queued_bytes -= entry.nbytes
+        self._items.clear()
+        self._index.clear()
+        self.stats.queues.discard(self)
+
+
+def sweep_registry(registry: Dict[str, List[SubscriptionQueue]]) -> int:
+    """
+    Drop orphaned queues from a `key -> [queue]` subscriber registry (and
+    keys left without queues). Returns the number of queues removed.
+    """
+    removed = 0
+    for key in list(registry):
+        queues = registry[key]
+        live = [q for q in queues if not q.orphaned]
+        if len(live) == len(queues):
+            continue
+        for q in queues:
+            if q.orphaned:
+                q.discard()
+        removed += len(queues) - len(live)
+        if live:
+            queues[:] = live
+        else:
+            del registry[key]
+    return removed
+
+
+def registry_depths(registry: Dict[str, List[SubscriptionQueue]]) -> Dict[str, int]:
+    return {key: len(queues) for key, queues in registry.items()}
+
+
+_background: Set["asyncio.Future[Any]"] = set()
+
+
+def background_tasks() -> int:
+    return len(_background)
+
+
+def run_in_background(close: Awaitable[None]) -> None:
+    async def run() -> None:
+        try:
+            await close
+        except Exception:
+            pass  # already closed
+
+    task = asyncio.ensure_future(run())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+class ConnectionRegistry:
+    """
+    Live websocket connections of this process and their subscriptions.
+
+    Enforces GRAPHQL_WS_MAX_SUBSCRIPTIONS_PER_CONNECTION / _PER_USER when a
+    subscription starts, and backs /debug/connections.
+    """
+
+    def __init__(self) -> None:
+        self._connections: Dict[str, ConnectionStats] = {}
+        # Cleared by drain mode: no new subscriptions on this process.
+        self.accepting = True
+
+    def open(
+        self, user_id: Optional[str] = None, closer: Optional[Closer] = None
+    ) -> ConnectionStats:
+        stats = ConnectionStats(f"ws-{next(_ids)}", user_id, closer)
+        self._connections[stats.connection_id] = stats
+        return stats
+
+    def close(self, stats: ConnectionStats) -> None:
+        stats.closed = True
+        self._connections.pop(stats.connection_id, None)
+
+    def connections(self) -> List[ConnectionStats]:
+        return list(self._connections.values())
+
+    def user_subscriptions(self, user_id: str) -> int:
+        return sum(
+            c.active_subscriptions
+            for c in self._connections.values()
+            if c.user_id == user_id
+        )
+
+    def acquire(self, stats: ConnectionStats, name: str) -> None:
+        if not self.accepting:
+            metrics.counter("ws_subscriptions_rejected_total", scope="draining").inc()
+            raise DrainingError()
+        settings = get_service_settings()
+        if stats.active_subscriptions >= settings.ws_max_subscriptions_per_connection:
+            metrics.counter("ws_subscriptions_rejected_total", scope="connection").inc()
+            raise SubscriptionLimitError(
+                "Too many active subscriptions on this connection"
+            )
+        if (
+            stats.user_id is not None
+            and self.user_subscriptions(stats.user_id)
+            >= settings.ws_max_subscriptions_per_user
+        ):
+            metrics.counter("ws_subscriptions_rejected_total", scope="user").inc()
+            raise SubscriptionLimitError("Too many active subscriptions for this user")
+        stats.subscriptions[name] += 1
+
+    def release(self, stats: ConnectionStats, name: str) -> None:
+        stats.subscriptions[name] -= 1
+        if stats.subscriptions[name] <= 0:
+            del stats.subscriptions[name]
+
+    @contextmanager
+    def subscription(self, context: Any, name: str) -> Iterator[ConnectionStats]:
+        """
+        Hold one subscription slot for the lifetime of a subscription
+        generator. HTTP (multipart) subscriptions have no connection in their
+        context and are accounted as a connection of their own.
+        """
+        stats: Optional[ConnectionStats] = context.get("ws_connection")
+        ephemeral = stats is None
+        if stats is None:
+            user = context.get("current_user")
+            stats = self.open(str(user.id) if user is not None else None)
+        try:
+            self.acquire(stats, name)
+        except (SubscriptionLimitError, DrainingError):
+            if ephemeral:
+                self.close(stats)
+            raise
+        try:
+            yield stats
+        finally:
+            self.release(stats, name)
+            if ephemeral:
+                self.close(stats)
+
+    def heaviest(
+        self, limit: int = 20, order_by: str = "queued_bytes"
+    ) -> List[Dict[str, Any]]:
+        rows = [c.as_dict() for c in self._connections.values()]
+        rows.sort(key=lambda r: r[order_by], reverse=True)
+        return rows[:limit]
+
+    def by_user(self, limit: int = 20) -> List[Dict[str, Any]]:
+        users: Dict[Optional[str], Dict[str, Any]] = {}
+        for c in self._connections.values():
+            row = users.setdefault(
+                c.user_id,
+                {
+                    "user_id": c.user_id,
+                    "connections": 0,
+                    "active_subscriptions": 0,
+                    "queued_bytes": 0,
+                    "rate_per_s": 0.0,
+                },
+            )
+            row["connections"] += 1
+            row["active_subscriptions"] += c.active_subscriptions
+            row["queued_bytes"] += c.queued_bytes
+            row["rate_per_s"] = round(row["rate_per_s"] + c.rate_per_s, 3)
+        ranked = sorted(users.values(), key=lambda r: r["queued_bytes"], reverse=True)
+        return ranked[:limit]
+
+    def collect(self) -> Iterable[Sample]:
+        conns = self._connections.values()
+        yield "ws_connections", {}, len(self._connections)
+        yield "ws_active_subscriptions", {}, sum(c.active_subscriptions for c in conns)
+        yield "ws_queued_events", {}, sum(c.queued_events for c in conns)
+        yield "ws_queued_bytes", {}, sum(c.queued_bytes for c in conns)
+
+        queues = [q for c in conns for q in c.queues]
+        yield "ws_subscription_queues", {}, len(queues)
+        yield "ws_subscription_queues_degraded", {}, sum(
+            1 for q in queues if q.degraded
+        )
+        yield "ws_subscription_queue_depth_max", {}, max(
+            (q.pending for q in queues), default=0
+        )
+        yield "ws_subscription_queue_age_max_seconds", {}, max(
+            (q.oldest_age for q in queues), default=0.0
+        )
+
+
+ws_connections = ConnectionRegistry()
+metrics.register_collector(ws_connections.collect)
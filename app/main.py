@@ -1,46 +1,180 @@
-from app.debug.start_raw_tap import start_raw_tap
+from app.internal.startup_profile import (
+    FirstGraphQLResponseMiddleware,
+    startup_profile,
+)
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 import asyncio
-from app.pubsub.user_changes_subscriber import start_user_changes_subscriber
+from typing import Dict, List
+from app import debug, pubsub, resolvers
+from app.core.config import get_service_settings
+from app.db.routing import REPLICA, engine_router, route_reads
+from app.internal.drain import drain_controller
+from app.internal.reaper import subscription_reaper
+from app.internal.memory import allocation_tracker
+from app.internal.tenants import file_status_fanout
+from app.internal.prewarm import (
+    DASHBOARD_OPERATIONS,
+    Phase,
+    prewarmer,
+    warm_operations,
+    warm_pool,
+)
 from app.api.controller.health_check import router as health_router
+from app.api.controller.debug import router as debug_router
+from app.api.controller.export import router as export_router
+from app.api.controller.schema import router as schema_router
 from app.graphql.context import get_context
 from fastapi.middleware.cors import CORSMiddleware
 from platform_common.logging.logging import get_logger
 from platform_common.middleware.request_id_middleware import RequestIDMiddleware
 from platform_common.exception_handling.handlers import add_exception_handlers
 from app.graphql.schema.root_schema import schema
-from strawberry.fastapi import GraphQLRouter
+from app.graphql.router import AppGraphQLRouter
+from app.graphql.schema_cache import schema_cache
 from strawberry.subscriptions import GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL
-from app.pubsub.upload_session_status_subscriber import (
-    start_upload_session_status_subscriber,
-)
-from app.pubsub.file_subscriber import start_file_status_subscriber
 
 logger = get_logger("lifespan")
 
 
+def _prewarm_phases() -> List[Phase]:
+    settings = get_service_settings()
+
+    async def db_pool() -> Dict[str, int]:
+        return {
+            name: await warm_pool(engine, settings.prewarm_pool_connections)
+            for name, engine in engine_router.engines()
+        }
+
+    async def operations() -> int:
+        return await warm_operations(schema, DASHBOARD_OPERATIONS)
+
+    async def datastore_metrics() -> int:
+        # Dashboards read metrics in query operations, i.e. as replica reads
+        # served from the metrics cache; fill it the same way.
+        with route_reads(REPLICA):
+            ids = await resolvers.get_most_active_datastore_ids(
+                settings.prewarm_top_datastores
+            )
+            for datastore_id in ids:
+                await resolvers.get_datastore_metrics(None, datastore_id=datastore_id)
+        return len(ids)
+
+    phases: List[Phase] = [("db_pool", db_pool), ("operations", operations)]
+    if (
+        settings.prewarm_top_datastores > 0
+        and settings.datastore_metrics_cache_seconds > 0
+    ):
+        phases.append(("datastore_metrics", datastore_metrics))
+    return phases
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("GraphQL service starting lifespan…")
+    logger.info(
+        "GraphQL service starting lifespan… (app imported in %.1f ms)",
+        startup_profile.mark("app_imported"),
+    )
+
+    # SDL and introspection result, served from memory from now on
+    schema_cache.build(schema)
+    logger.info(
+        "Schema %s cached (%.1f ms after start)",
+        schema_cache.schema_hash[:12],
+        startup_profile.mark("schema_cached"),
+    )
+
+    # Primary + replica engines; lag monitor only when replicas are configured
+    await engine_router.start()
+    lag_task = None
+    if engine_router.replicas:
+        lag_task = asyncio.create_task(engine_router.run_lag_monitor())
 
     # Start user changes subscriber
-    user_task = asyncio.create_task(start_user_changes_subscriber())
+    user_task = asyncio.create_task(pubsub.start_user_changes_subscriber())
     app.state.user_changes_task = user_task
 
     # Start upload_session status subscriber
-    upload_session_task = asyncio.create_task(start_upload_session_status_subscriber())
+    upload_session_task = asyncio.create_task(
+        pubsub.start_upload_session_status_subscriber()
+    )
     app.state.upload_session_status_task = upload_session_task
 
-    file_task = asyncio.create_task(start_file_status_subscriber())
+    file_task = asyncio.create_task(pubsub.start_file_status_subscriber())
     app.state.file_status_task = file_task
 
-    # tap_task = asyncio.create_task(start_raw_tap())
+    # Raw redis tap is debug-only; the module is not imported unless enabled
+    tap_task = None
+    if get_service_settings().enable_raw_tap:
+        tap_task = asyncio.create_task(debug.start_raw_tap())
+
+    # Warm pools, schema and hot reads before uvicorn starts accepting
+    # connections (it does so only once lifespan startup has completed).
+    if get_service_settings().prewarm_enabled:
+        await prewarmer.run(
+            _prewarm_phases(), get_service_settings().prewarm_timeout_seconds
+        )
+        for name, row in prewarmer.phases.items():
+            logger.info(
+                "Prewarm %s: %s in %.1f ms%s",
+                name,
+                "ok" if row["ok"] else "failed",
+                row["ms"],
+                f" ({row['error']})" if "error" in row else "",
+            )
+
+    if get_service_settings().debug_tracemalloc:
+        allocation_tracker.start(get_service_settings().debug_tracemalloc_frames)
+
+    # Sweeps subscriber registries for queues whose client is gone
+    reaper_task = asyncio.create_task(subscription_reaper.run())
+
+    # Per-tenant fan-out of file:status events
+    fanout_task = asyncio.create_task(file_status_fanout.run())
+
+    # SIGTERM drains websockets before uvicorn starts its shutdown
+    restore_sigterm = drain_controller.install_signal_handler()
+
+    logger.info(
+        "GraphQL service ready in %.1f ms", startup_profile.mark("lifespan_ready")
+    )
 
     try:
         yield
     finally:
         logger.info("GraphQL service shutting down lifespan…")
+        restore_sigterm()
+
+        # A drain started from /debug/drain may still be running
+        if drain_controller.draining and not drain_controller.done:
+            await drain_controller.drain("shutdown")
+
+        reaper_task.cancel()
+        try:
+            await reaper_task
+        except asyncio.CancelledError:
+            logger.info("Subscription reaper cancelled cleanly.")
+
+        fanout_task.cancel()
+        try:
+            await fanout_task
+        except asyncio.CancelledError:
+            logger.info("File status fan-out cancelled cleanly.")
+
+        if lag_task is not None:
+            lag_task.cancel()
+            try:
+                await lag_task
+            except asyncio.CancelledError:
+                logger.info("Replica lag monitor cancelled cleanly.")
+        await engine_router.dispose()
+
+        if tap_task is not None:
+            tap_task.cancel()
+            try:
+                await tap_task
+            except asyncio.CancelledError:
+                logger.info("Raw tap task cancelled cleanly.")
 
         # Stop user changes subscriber
         user_task.cancel()
@@ -66,6 +200,7 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="GraphQL Service", lifespan=lifespan)
 app.add_middleware(RequestIDMiddleware)
+app.add_middleware(FirstGraphQLResponseMiddleware)
 add_exception_handlers(app)
 
 # Allowed origins for your frontend(s)
@@ -84,14 +219,21 @@ app.add_middleware(
 )
 
 
-graphql_app = GraphQLRouter(
+graphql_app = AppGraphQLRouter(
     schema=schema,
     graphiql=True,
     subscription_protocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL],
+    # graphql-ws `ka` messages; graphql-transport-ws pings are sent by
+    # GraphQLTransportWSHandler.
+    keep_alive=get_service_settings().ws_ping_interval_seconds > 0,
+    keep_alive_interval=get_service_settings().ws_ping_interval_seconds,
     context_getter=get_context,
 )
 
 
 # REST endpoints
 app.include_router(health_router, prefix="/health", tags=["Health"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
+app.include_router(export_router, prefix="/export", tags=["Export"])
+app.include_router(schema_router, prefix="/graphql", tags=["GraphQL"])
 app.include_router(graphql_app, prefix="/graphql")
@@ -0,0 +1,22 @@
+# app/pubsub/__init__.py
+#
+# Subscriber entrypoints are resolved lazily so importing app.main does not
+# pull in every pubsub module (and its redis/platform_common imports) up front.
+from app.internal.lazy import lazy_exports
+
+__getattr__ = lazy_exports(
+    globals(),
+    {
+        "start_user_changes_subscriber": "app.pubsub.user_changes_subscriber",
+        "start_upload_session_status_subscriber": (
+            "app.pubsub.upload_session_status_subscriber"
+        ),
+        "start_file_status_subscriber": "app.pubsub.file_subscriber",
+    },
+)
+
+__all__ = [
+    "start_user_changes_subscriber",
+    "start_upload_session_status_subscriber",
+    "start_file_status_subscriber",
+]
@@ -1,62 +1,71 @@
 # app/pubsub/file_status_subscriber.py
 
-from typing import Any, Dict
-
 from platform_common.config.settings import get_settings
 from platform_common.logging.logging import get_logger
-from platform_common.pubsub.factory import get_subscriber
 from platform_common.pubsub.event import PubSubEvent
-from platform_common.utils.time_helpers import parse_occurred_at_string
 
 from app.graphql.dashboard.subscription import (
     FileStatusEvent,
+    datastore_tenant,
+    file_status_events_dropped,
+    log_file_status_event,
     push_file_status_event_to_clients,
 )
+from app.internal.tenants import file_status_fanout
+from app.pubsub.transport import get_event_subscriber
+from app.pubsub.payloads import FileStatusPayload
 
 logger = get_logger("graphql.file_status_subscriber")
 settings = get_settings()
 
 # Must match the pubsub_topic in ed-database-management's listen_to_file_status_changes()
-FILE_STATUS_TOPIC = "file:status"
+FILE_STATUS_TOPIC = FileStatusPayload.TOPIC
 
 
 async def _handle_file_status_event(event: PubSubEvent) -> None:
-    payload: Dict[str, Any] = event.payload or {}
-
-    file_id = payload.get("file_id")
-    datastore_id = payload.get("datastore_id")
-    upload_session_id = payload.get("upload_session_id")
-    old_status = payload.get("old_status")
-    new_status = payload.get("new_status")
-    raw_occurred_at = payload.get("occurred_at")
-
-    if not file_id or not datastore_id:
-        logger.warning(
-            "file status event missing file_id or datastore_id: %r",
-            payload,
-        )
+    msg = FileStatusPayload.decode(event.payload)
+    if msg is None:
         return
 
-    occurred_at = parse_occurred_at_string(raw_occurred_at)
-
-    logger.info(
+    logger.debug(
         "Received file status change %s -> %s for file=%s datastore=%s",
-        old_status,
-        new_status,
-        file_id,
-        datastore_id,
+        msg.old_status,
+        msg.new_status,
+        msg.file_id,
+        msg.datastore_id,
     )
 
     event_obj = FileStatusEvent(
-        file_id=file_id,
-        datastore_id=datastore_id,
-        upload_session_id=upload_session_id,
-        old_status=old_status,
-        new_status=new_status,
-        occurred_at=occurred_at,  # 👈 now a real datetime
+        file_id=msg.file_id,
+        datastore_id=msg.datastore_id,
+        upload_session_id=msg.upload_session_id,
+        old_status=msg.old_status,
+        new_status=msg.new_status,
+        occurred_at=msg.occurred_at,
     )
 
-    await push_file_status_event_to_clients(event_obj)
+    # Sequenced here, in arrival order; only the delivery is queued per
+    # tenant, so a burst from one organization's upload does not hold up the
+    # events of the others.
+    log_file_status_event(event_obj)
+    file_status_fanout.submit(
+        datastore_tenant(str(msg.datastore_id)),
+        lambda: _fan_out(event_obj),
+        lambda: file_status_events_dropped(event_obj),
+    )
+
+
+async def _fan_out(event: FileStatusEvent) -> None:
+    try:
+        await push_file_status_event_to_clients(event)
+    except Exception as e:
+        logger.error(
+            "Fan-out of file status event failed for datastore=%s: %r",
+            event.datastore_id,
+            e,
+            exc_info=True,
+        )
+        raise
 
 
 async def start_file_status_subscriber() -> None:
@@ -64,7 +73,7 @@ async def start_file_status_subscriber() -> None:
     Entrypoint used by FastAPI lifespan: subscribe to Redis topic
     `file:status` and dispatch all events to _handle_file_status_event.
     """
-    subscriber = get_subscriber()
+    subscriber = get_event_subscriber()
 
     topic_handlers = {
         FILE_STATUS_TOPIC: {
@@ -0,0 +1,171 @@
+# app/pubsub/payloads.py
+#
+# Typed views of the pubsub payloads the bridge consumes. Each message is
+# checked and converted once, in `decode`, into a small slotted object;
+# handlers then use plain attribute access. Malformed messages are counted
+# (pubsub_malformed_total{topic}) and only the first one per topic is logged.
+from datetime import datetime
+from typing import Any, Optional, Set
+
+from platform_common.logging.logging import get_logger
+from platform_common.utils.time_helpers import parse_occurred_at_string
+
+from app.internal.metrics import metrics
+
+logger = get_logger("pubsub_payloads")
+
+_logged_topics: Set[str] = set()
+
+
+def malformed(topic: str, reason: str, payload: Any) -> None:
+    metrics.counter("pubsub_malformed_total", topic=topic).inc()
+    if topic not in _logged_topics:
+        _logged_topics.add(topic)
+        logger.warning(
+            "Malformed %s payload (%s); further ones are only counted: %r",
+            topic,
+            reason,
+            payload,
+        )
+
+
+def _opt_str(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    `occurred_at` as an aware datetime. ISO 8601 / Postgres timestamptz text
+    with an offset (what the producers send) is parsed here directly;
+    anything else, including a missing value, goes to platform_common's
+    parse_occurred_at_string as it did before. None if that fails.
+    """
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = None
+        if parsed is not None and parsed.tzinfo is not None:
+            return parsed
+    try:
+        return parse_occurred_at_string(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+class FileStatusPayload:
+    """`file:status` – one file changed upload/processing status."""
+
+    TOPIC = "file:status"
+
+    __slots__ = (
+        "file_id",
+        "datastore_id",
+        "upload_session_id",
+        "old_status",
+        "new_status",
+        "occurred_at",
+    )
+
+    def __init__(
+        self,
+        file_id: str,
+        datastore_id: str,
+        upload_session_id: Optional[str],
+        old_status: str,
+        new_status: str,
+        occurred_at: datetime,
+    ) -> None:
+        self.file_id = file_id
+        self.datastore_id = datastore_id
+        self.upload_session_id = upload_session_id
+        self.old_status = old_status
+        self.new_status = new_status
+        self.occurred_at = occurred_at
+
+    @classmethod
+    def decode(cls, payload: Any) -> Optional["FileStatusPayload"]:
+        if not isinstance(payload, dict):
+            malformed(cls.TOPIC, "not an object", payload)
+            return None
+        file_id = _opt_str(payload.get("file_id"))
+        datastore_id = _opt_str(payload.get("datastore_id"))
+        if file_id is None or datastore_id is None:
+            malformed(cls.TOPIC, "missing file_id or datastore_id", payload)
+            return None
+        occurred_at = parse_timestamp(payload.get("occurred_at"))
+        if occurred_at is None:
+            malformed(cls.TOPIC, "bad occurred_at", payload)
+            return None
+        return cls(
+            file_id,
+            datastore_id,
+            _opt_str(payload.get("upload_session_id")),
+            _opt_str(payload.get("old_status")) or "",
+            _opt_str(payload.get("new_status")) or "",
+            occurred_at,
+        )
+
+
+class UploadSessionStatusPayload:
+    """`upload_session:status` – an upload session changed status."""
+
+    TOPIC = "upload_session:status"
+
+    __slots__ = ("datastore_id", "status")
+
+    def __init__(self, datastore_id: str, status: Optional[str]) -> None:
+        self.datastore_id = datastore_id
+        self.status = status
+
+    @classmethod
+    def decode(cls, payload: Any) -> Optional["UploadSessionStatusPayload"]:
+        if not isinstance(payload, dict):
+            malformed(cls.TOPIC, "not an object", payload)
+            return None
+        datastore_id = _opt_str(payload.get("datastore_id"))
+        if datastore_id is None:
+            malformed(cls.TOPIC, "missing datastore_id", payload)
+            return None
+        return cls(datastore_id, _opt_str(payload.get("status")))
+
+
+class DatasetUpdatedPayload:
+    """`dataset:updated` – files were linked to or unlinked from a dataset."""
+
+    TOPIC = "dataset:updated"
+
+    __slots__ = ("dataset_id", "reason", "operation", "file_id", "role")
+
+    def __init__(
+        self,
+        dataset_id: str,
+        reason: str,
+        operation: str,
+        file_id: Optional[str],
+        role: Optional[str],
+    ) -> None:
+        self.dataset_id = dataset_id
+        self.reason = reason
+        self.operation = operation
+        self.file_id = file_id
+        self.role = role
+
+    @classmethod
+    def decode(cls, payload: Any) -> Optional["DatasetUpdatedPayload"]:
+        if not isinstance(payload, dict):
+            malformed(cls.TOPIC, "not an object", payload)
+            return None
+        dataset_id = _opt_str(payload.get("dataset_id"))
+        if dataset_id is None:
+            malformed(cls.TOPIC, "missing dataset_id", payload)
+            return None
+        return cls(
+            dataset_id,
+            (_opt_str(payload.get("event_name")) or "DATASET_FILES_CHANGED").lower(),
+            _opt_str(payload.get("operation")) or "",
+            _opt_str(payload.get("file_id")),
+            _opt_str(payload.get("role")),
+        )
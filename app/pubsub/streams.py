@@ -0,0 +1,270 @@
+# app/pubsub/streams.py
+#
+# Redis Streams transport for the bridge, used instead of plain pub/sub when
+# GRAPHQL_PUBSUB_TRANSPORT=streams (see app/pubsub/transport.py).
+#
+# Producers XADD one entry per event with two fields:
+#     event_type  normalized event name ("file_status_changed", ...)
+#     payload     the JSON payload that would otherwise be PUBLISHed
+# and cap the stream with MAXLEN ~ n (`add_stream_event` does both).
+import json
+import re
+import socket
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from platform_common.logging.logging import get_logger
+
+from app.internal.metrics import metrics
+
+logger = get_logger("pubsub_streams")
+
+Handler = Callable[[Any], Awaitable[None]]
+TopicHandlers = Dict[str, Dict[str, Handler]]
+
+
+class StreamEvent:
+    """What handlers receive; same shape as platform_common's PubSubEvent."""
+
+    __slots__ = ("topic", "event_type", "payload", "message_id")
+
+    def __init__(
+        self, topic: str, event_type: str, payload: Any, message_id: str
+    ) -> None:
+        self.topic = topic
+        self.event_type = event_type
+        self.payload = payload
+        self.message_id = message_id
+
+
+GROUP_PREFIX = "graphql-bridge-"
+
+# StatefulSet pods are named <set>-<ordinal> and keep that name across
+# restarts. Deployment pods end in a 5-character random suffix instead, so
+# a group derived from their hostname would be new after every restart.
+_STATEFUL_POD = re.compile(r"^[a-z0-9][-a-z0-9]*-(0|[1-9][0-9]{0,3})$")
+
+
+def default_group_name(hostname: Optional[str] = None) -> str:
+    """
+    Consumer group of this pod when GRAPHQL_STREAMS_GROUP is unset: derived
+    from the hostname, which must be a StatefulSet pod name.
+    """
+    hostname = hostname or socket.gethostname()
+    if not _STATEFUL_POD.match(hostname):
+        raise RuntimeError(
+            f"Hostname {hostname!r} is not stable across restarts; run the "
+            "streams transport in a StatefulSet or set GRAPHQL_STREAMS_GROUP"
+        )
+    return GROUP_PREFIX + hostname
+
+
+def _id_ms(message_id: str) -> int:
+    return int(message_id.split("-", 1)[0])
+
+
+async def add_stream_event(
+    client: Any,
+    topic: str,
+    event_type: str,
+    payload: Any,
+    maxlen: int,
+) -> str:
+    """XADD one event in the format RedisStreamSubscriber reads."""
+    return await client.xadd(
+        topic,
+        {"event_type": event_type, "payload": json.dumps(payload, default=str)},
+        maxlen=maxlen,
+        approximate=True,
+    )
+
+
+class RedisStreamSubscriber:
+    """
+    Consumer-group reader with the `subscribe(topic_handlers)` interface of
+    platform_common's subscribers.
+
+    Every pod needs every event (it fans out to its own websockets), so each
+    pod reads through its own consumer group; a group shared by the pods
+    would split the events between them. The group name must be stable
+    across restarts (GRAPHQL_STREAMS_GROUP, default derived from the
+    StatefulSet pod name) for catch-up to work.
+
+    On start we take over entries left pending by other consumers of our
+    group (XAUTOCLAIM; e.g. a renamed consumer) and remove those consumers,
+    drop other bridge groups that have fallen more than
+    `stale_group_seconds` behind the stream (pods that are gone for good),
+    re-read our pending entries (delivered but not acked before a crash),
+    then read new ones with `XREADGROUP COUNT n BLOCK ms`. A batch is acked
+    after its handlers have run, so an event is lost only if it fell out of
+    the capped stream while the pod was down.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        group: str,
+        consumer: str = "bridge",
+        count: int = 100,
+        block_ms: int = 5000,
+        maxlen: int = 100_000,
+        trim_every: int = 100,
+        start_id: str = "$",
+        stale_group_seconds: float = 0.0,
+    ) -> None:
+        self.client = client
+        self.group = group
+        self.consumer = consumer
+        self.count = count
+        self.block_ms = block_ms
+        self.maxlen = maxlen
+        self.trim_every = trim_every
+        self.start_id = start_id
+        self.stale_group_seconds = stale_group_seconds
+        self._batches = 0
+
+    async def _ensure_group(self, topic: str) -> None:
+        try:
+            await self.client.xgroup_create(
+                topic, self.group, id=self.start_id, mkstream=True
+            )
+            logger.info("Created consumer group %s on %s", self.group, topic)
+        except Exception as e:
+            # BUSYGROUP: the group survives restarts, which is the point.
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _claim_pending(self, topic: str) -> None:
+        """Move every pending entry of our group to our consumer, then drop
+        the other consumers (one pod reads each group)."""
+        start = "0-0"
+        while True:
+            resp = await self.client.xautoclaim(
+                topic, self.group, self.consumer, 0, start_id=start, justid=True
+            )
+            start = resp[0]
+            if start == "0-0":
+                break
+        for consumer in await self.client.xinfo_consumers(topic, self.group):
+            if consumer["name"] != self.consumer:
+                await self.client.xgroup_delconsumer(
+                    topic, self.group, consumer["name"]
+                )
+                logger.info(
+                    "Removed stale consumer %s from %s on %s",
+                    consumer["name"],
+                    self.group,
+                    topic,
+                )
+
+    async def _drop_stale_groups(self, topic: str) -> None:
+        if self.stale_group_seconds <= 0:
+            return
+        newest = await self.client.xrevrange(topic, count=1)
+        if not newest:
+            return
+        head_ms = _id_ms(newest[0][0])
+        for group in await self.client.xinfo_groups(topic):
+            name = group["name"]
+            if name == self.group or not name.startswith(GROUP_PREFIX):
+                continue
+            behind_s = (head_ms - _id_ms(group["last-delivered-id"])) / 1000.0
+            if behind_s > self.stale_group_seconds:
+                await self.client.xgroup_destroy(topic, name)
+                metrics.counter("pubsub_stream_stale_groups_total", topic=topic).inc()
+                logger.info(
+                    "Dropped consumer group %s on %s (%.0fs behind)",
+                    name,
+                    topic,
+                    behind_s,
+                )
+
+    async def _read(self, streams: Dict[str, str]) -> List[Tuple[str, List[Any]]]:
+        resp = await self.client.xreadgroup(
+            self.group,
+            self.consumer,
+            streams,
+            count=self.count,
+            block=self.block_ms,
+        )
+        return resp or []
+
+    async def _dispatch(
+        self, topic: str, handlers: Dict[str, Handler], entries: List[Any]
+    ) -> List[str]:
+        ids: List[str] = []
+        for message_id, fields in entries:
+            ids.append(message_id)
+            if not fields:
+                continue  # pending entry already trimmed from the stream
+            event_type = fields.get("event_type") or ""
+            try:
+                payload = json.loads(fields.get("payload") or "null")
+            except ValueError:
+                metrics.counter("pubsub_malformed_total", topic=topic).inc()
+                continue
+
+            handler = handlers.get(event_type) or handlers.get("*")
+            if handler is None:
+                continue
+            try:
+                await handler(StreamEvent(topic, event_type, payload, message_id))
+            except Exception as e:
+                # Retrying would hit the same bug; count it and move on.
+                metrics.counter("pubsub_stream_handler_errors_total", topic=topic).inc()
+                logger.error(
+                    "Stream handler failed topic=%s id=%s: %r", topic, message_id, e
+                )
+        return ids
+
+    async def _process(
+        self, topic_handlers: TopicHandlers, resp: List[Tuple[str, List[Any]]]
+    ) -> int:
+        handled = 0
+        for topic, entries in resp:
+            ids = await self._dispatch(topic, topic_handlers[topic], entries)
+            if ids:
+                await self.client.xack(topic, self.group, *ids)
+                metrics.counter("pubsub_stream_messages_total", topic=topic).inc(
+                    len(ids)
+                )
+                handled += len(ids)
+
+        self._batches += 1
+        metrics.counter("pubsub_stream_batches_total").inc()
+        if self.maxlen and self._batches % self.trim_every == 0:
+            for topic in topic_handlers:
+                await self.client.xtrim(topic, maxlen=self.maxlen, approximate=True)
+        return handled
+
+    async def subscribe(self, topic_handlers: TopicHandlers) -> None:
+        try:
+            for topic in topic_handlers:
+                await self._ensure_group(topic)
+                await self._claim_pending(topic)
+                await self._drop_stale_groups(topic)
+
+            # Catch up on our own unacked entries first ("0" = pending list).
+            pending = {t: "0" for t in topic_handlers}
+            while pending:
+                got = {t: entries for t, entries in await self._read(pending)}
+                for topic in list(pending):
+                    if not got.get(topic):
+                        del pending[topic]
+                batch = [(t, entries) for t, entries in got.items() if entries]
+                if batch:
+                    await self._process(topic_handlers, batch)
+
+            live = {t: ">" for t in topic_handlers}
+            while True:
+                resp = await self._read(live)
+                if resp:
+                    await self._process(topic_handlers, resp)
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        close = getattr(self.client, "aclose", None) or getattr(
+            self.client, "close", None
+        )
+        if callable(close):
+            await close()
@@ -0,0 +1,29 @@
+# app/pubsub/transport.py
+from typing import Any
+
+from platform_common.pubsub.factory import get_subscriber
+from redis.asyncio import Redis
+
+from app.core.config import get_service_settings, resolve_redis_url
+from app.pubsub.streams import RedisStreamSubscriber, default_group_name
+
+
+def get_event_subscriber() -> Any:
+    """
+    Subscriber for the bridge's event topics: platform_common's pub/sub
+    subscriber, or a Redis Streams consumer when
+    GRAPHQL_PUBSUB_TRANSPORT=streams. Both take the same topic_handlers.
+    """
+    s = get_service_settings()
+    if s.pubsub_transport != "streams":
+        return get_subscriber()
+
+    return RedisStreamSubscriber(
+        Redis.from_url(resolve_redis_url(s.streams_redis_url), decode_responses=True),
+        group=s.streams_group or default_group_name(),
+        count=s.streams_batch_size,
+        block_ms=s.streams_block_ms,
+        maxlen=s.streams_maxlen,
+        start_id=s.streams_start_id,
+        stale_group_seconds=s.streams_stale_group_seconds,
+    )
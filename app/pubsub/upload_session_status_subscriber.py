@@ -1,19 +1,18 @@
-from typing import Any, Dict
-
 from platform_common.config.settings import get_settings
 from platform_common.logging.logging import get_logger
-from platform_common.pubsub.factory import get_subscriber
 from platform_common.pubsub.event import PubSubEvent
 
 from app.graphql.dashboard.subscription import (
     push_datastore_update_to_clients,
 )
+from app.pubsub.transport import get_event_subscriber
+from app.pubsub.payloads import UploadSessionStatusPayload
 
 logger = get_logger("graphql.upload_session_status_subscriber")
 settings = get_settings()
 
 # Must match the pubsub_topic in ed-database-management's listen_to_upload_session_changes()
-UPLOAD_SESSION_TOPIC = "upload_session:status"
+UPLOAD_SESSION_TOPIC = UploadSessionStatusPayload.TOPIC
 
 
 async def _handle_upload_session_status_event(event: PubSubEvent) -> None:
@@ -23,34 +22,26 @@ async def _handle_upload_session_status_event(event: PubSubEvent) -> None:
     event.payload is whatever the Postgres trigger sent via pg_notify,
     then wrapped by ed-database-management's listen_to_pg_channel.
     """
-    payload: Dict[str, Any] = event.payload or {}
-
-    status = payload.get("status")
-    datastore_id = payload.get("datastore_id")
-
-    if not datastore_id:
-        logger.warning(
-            "upload_session status event missing datastore_id: %r",
-            payload,
-        )
+    msg = UploadSessionStatusPayload.decode(event.payload)
+    if msg is None:
         return
 
     # Only act on terminal states per our design
-    if status not in ("ready", "failed"):
+    if msg.status not in ("ready", "failed"):
         logger.debug(
             "Ignoring upload_session status=%s for datastore=%s",
-            status,
-            datastore_id,
+            msg.status,
+            msg.datastore_id,
         )
         return
 
     logger.info(
         "Received upload_session status=%s for datastore=%s; pushing update to clients",
-        status,
-        datastore_id,
+        msg.status,
+        msg.datastore_id,
     )
 
-    await push_datastore_update_to_clients(datastore_id)
+    await push_datastore_update_to_clients(msg.datastore_id)
 
 
 async def start_upload_session_status_subscriber() -> None:
@@ -59,7 +50,7 @@ async def start_upload_session_status_subscriber() -> None:
     `upload_session:status` and dispatch all events to
     _handle_upload_session_status_event.
     """
-    subscriber = get_subscriber()
+    subscriber = get_event_subscriber()
 
     # topic_handlers structure:
     # {
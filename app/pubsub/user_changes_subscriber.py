@@ -4,7 +4,8 @@ from platform_common.config.settings import get_settings
 from platform_common.logging.logging import get_logger
 from platform_common.pubsub.factory import get_subscriber
 from platform_common.errors.base import ServiceUnavailableError
-from app.internal.event_bus import bus
+from app.auth.ws_auth import invalidate_user
+from app.internal.user_changes import user_change_index
 
 logger = get_logger("user_changes_subscriber")
 settings = get_settings()
@@ -16,8 +17,16 @@ async def _forward_to_bus(event):
     # event.event_type is Enum-like; platform-common normalization gives "user_created" etc.
     event_key = getattr(event.event_type, "value", str(event.event_type)).lower()
     payload = event.payload  # already a dict from your trigger
-    await bus.publish(event_key, payload)
-    logger.info("[graphql-bridge] forwarded event=%s", event_key)
+    if event_key in ("user_updated", "user_deleted"):
+        # Websocket identities cache the user row; make them reload it.
+        row = (payload or {}).get("data") or (payload or {}).get("old_data") or {}
+        if row.get("id"):
+            invalidate_user(str(row["id"]))
+    # Only subscribers whose filter matches get it (see UserChangeIndex).
+    delivered = user_change_index.publish(event_key, payload or {})
+    logger.info(
+        "[graphql-bridge] forwarded event=%s to %d subscriber(s)", event_key, delivered
+    )
 
 
 async def start_user_changes_subscriber():
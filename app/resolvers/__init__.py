@@ -0,0 +1,23 @@
+# app/resolvers/__init__.py
+#
+# GraphQL types call into resolvers through this package. Resolver modules
+# import the types they build, so they are loaded lazily on first use instead
+# of with a function-local import on every field resolution.
+from app.internal.lazy import lazy_exports
+
+__getattr__ = lazy_exports(
+    globals(),
+    {
+        "get_datastore_for_user": "app.resolvers.datastore_resolvers",
+        "get_datastore_metrics": "app.resolvers.datastore_resolvers",
+        "get_datastore_files_page": "app.resolvers.datastore_resolvers",
+        "get_most_active_datastore_ids": "app.resolvers.datastore_resolvers",
+    },
+)
+
+__all__ = [
+    "get_datastore_for_user",
+    "get_datastore_metrics",
+    "get_datastore_files_page",
+    "get_most_active_datastore_ids",
+]
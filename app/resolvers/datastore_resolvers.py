@@ -1,13 +1,27 @@
 # app/resolvers/datastore_resolvers.py
 
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+from sqlalchemy import func, select
 from strawberry.types import Info
 
-from platform_common.db.session import get_session
 from platform_common.db.dal.file_dal import FileDAL
+from platform_common.db.dal.dataset_dal import DatasetDAL
 from platform_common.db.dal.datastore_dal import DatastoreDAL
+from platform_common.errors.base import ForbiddenError, NotFoundError
+from platform_common.models.dataset_file_link import DatasetFileLink
+from platform_common.models.file import File
 from platform_common.utils.time_helpers import to_datetime_utc
 
+from app.core.config import get_service_settings
+from app.db.routing import REPLICA, get_session, read_role
+from app.db.cursors import stream_scalars
+from app.graphql.incremental import is_streamed
+from app.internal.single_flight import (
+    datastore_flight,
+    files_page_flight,
+    metrics_flight,
+)
+from app.internal.ttl_cache import metrics_cache
 from app.graphql.dashboard.types.datastore_type import (
     DatastoreType,
     DatastoreMetricsType,
@@ -17,6 +31,54 @@ from app.graphql.dashboard.types.datastore_type import (
 )
 
 
+async def _load_datastore(datastore_id: str) -> Any:
+    async for session in get_session():
+        datastore_dal = DatastoreDAL(session)
+        ds_row = await datastore_dal.get_by_id(datastore_id)
+        break
+    return ds_row
+
+
+async def get_datastore_for_user(datastore_id: str, current_user: Any) -> Any:
+    """
+    Load a datastore and check the current user may see it.
+    Raises NotFoundError / ForbiddenError like the GraphQL resolvers do.
+
+    Concurrent loads of the same datastore share one query; the access
+    check below still runs for every caller.
+    """
+    ds_row = await datastore_flight.do(
+        (read_role(), datastore_id), lambda: _load_datastore(datastore_id)
+    )
+
+    if ds_row is None:
+        raise NotFoundError("Datastore not found")
+
+    mapping = getattr(ds_row, "_mapping", None)
+    if mapping is not None and "Datastore" in mapping:
+        ds = mapping["Datastore"]
+    else:
+        ds = ds_row
+
+    if getattr(ds, "user_id", None) and ds.user_id != current_user.id:
+        raise ForbiddenError("You do not have access to this datastore")
+
+    return ds
+
+
+async def get_dataset_for_user(dataset_id: str, current_user: Any) -> Any:
+    """Load a dataset and check the current user owns it (or nobody does)."""
+    async for session in get_session():
+        dataset = await DatasetDAL(session).get_by_id(dataset_id)
+        break
+
+    if dataset is None:
+        raise NotFoundError("Dataset not found")
+    if dataset.owner_id and dataset.owner_id != current_user.id:
+        raise ForbiddenError("You do not have access to this dataset")
+    return dataset
+
+
 def classify_category_from_content_type(content_type: str) -> str:
     """
     Map MIME types into dashboard categories that match your FE:
@@ -58,8 +120,32 @@ def classify_category_from_content_type(content_type: str) -> str:
 
 async def get_datastore_metrics(info: Info, datastore_id: str) -> DatastoreMetricsType:
     """
-    Compute metrics for a datastore.
+    Compute metrics for a datastore. Only reached through a DatastoreType,
+    i.e. after get_datastore_for_user, so concurrent callers can share one
+    computation.
+
+    Replica reads are also served from `metrics_cache` for
+    datastore_metrics_cache_seconds: they may already lag the primary.
+    Primary reads (read-your-writes, subscriptions) always recompute.
     """
+    role = read_role()
+    ttl = get_service_settings().datastore_metrics_cache_seconds
+    cached = role == REPLICA and ttl > 0
+    if cached:
+        hit = metrics_cache.get(datastore_id)
+        if hit is not None:
+            return hit
+
+    async def compute() -> DatastoreMetricsType:
+        result = await _compute_datastore_metrics(datastore_id)
+        if cached:
+            metrics_cache.put(datastore_id, result, ttl)
+        return result
+
+    return await metrics_flight.do((role, datastore_id), compute)
+
+
+async def _compute_datastore_metrics(datastore_id: str) -> DatastoreMetricsType:
     async for session in get_session():
         file_dal = FileDAL(session)
         datastore_dal = DatastoreDAL(session)
@@ -132,47 +218,143 @@ async def get_datastore_metrics(info: Info, datastore_id: str) -> DatastoreMetri
     )
 
 
+async def get_most_active_datastore_ids(limit: int) -> List[str]:
+    """Datastores with the most recent uploads, newest first (startup prewarm)."""
+    stmt = (
+        select(File.datastore_id)
+        .group_by(File.datastore_id)
+        .order_by(func.max(File.created_at).desc())
+        .limit(limit)
+    )
+    async for session in get_session():
+        rows = (await session.execute(stmt)).scalars().all()
+        break
+    return [str(r) for r in rows]
+
+
+def extract_file_meta(f: Any) -> Tuple[List[str], Optional[str]]:
+    """
+    Pull (tags, client_token) out of a file's free-form `meta` JSON.
+    """
+    meta: Dict[str, Any] = getattr(f, "meta", {}) or {}
+    raw_tags: Any = meta.get("tags", [])
+    tags = raw_tags if isinstance(raw_tags, list) else []
+    client_token: Optional[str] = None
+    if isinstance(meta, dict):
+        client_token = meta.get("clientToken") or meta.get("client_token")
+    return tags, client_token
+
+
+def to_datastore_file_type(f: Any) -> DatastoreFileType:
+    tags, client_token = extract_file_meta(f)
+    return DatastoreFileType(
+        id=f.id,
+        filename=f.filename,
+        content_type=f.content_type,
+        size=f.size,
+        created_at=to_datetime_utc(f.created_at),  # ← convert here
+        tags=tags,
+        client_token=client_token,
+    )
+
+
+def datastore_files_stmt(datastore_id: str):
+    return (
+        select(File)
+        .where(File.datastore_id == datastore_id)
+        .order_by(File.created_at.desc(), File.id)
+    )
+
+
+def datastore_files_count_stmt(datastore_id: str):
+    return select(func.count()).select_from(
+        datastore_files_stmt(datastore_id).order_by(None).subquery()
+    )
+
+
+# Just what the exports write, as plain rows (no ORM objects).
+_FILE_EXPORT_COLUMNS = (
+    File.id,
+    File.filename,
+    File.content_type,
+    File.size,
+    File.created_at,
+    File.meta,
+)
+
+
+def datastore_file_rows_stmt(datastore_id: str):
+    return (
+        select(*_FILE_EXPORT_COLUMNS)
+        .where(File.datastore_id == datastore_id)
+        .order_by(File.created_at.desc(), File.id)
+    )
+
+
+def dataset_file_rows_stmt(dataset_id: str):
+    return (
+        select(*_FILE_EXPORT_COLUMNS)
+        .join(DatasetFileLink, DatasetFileLink.file_id == File.id)
+        .where(DatasetFileLink.dataset_id == dataset_id)
+        .order_by(File.created_at.desc(), File.id)
+    )
+
+
+async def _stream_datastore_files(
+    datastore_id: str,
+    limit: int,
+    offset: int,
+    role: str,
+) -> AsyncIterator[DatastoreFileType]:
+    stmt = datastore_files_stmt(datastore_id).offset(offset).limit(limit)
+    async for f in stream_scalars(stmt, role=role):
+        yield to_datastore_file_type(f)
+
+
 async def get_datastore_files_page(
     info: Info,
     datastore_id: str,
     limit: int,
     offset: int,
 ) -> DatastoreFilesPageType:
-    async for session in get_session():
-        file_dal = FileDAL(session)
-        page = await file_dal.get_datastore_files_page(
-            datastore_id=datastore_id,
-            limit=limit,
-            offset=offset,
-        )
-        break
+    # `files { items @stream }`: only count here and feed items from a
+    # server-side cursor, so the first rows go out before the page is read.
+    # Both forms page the same statement, so they return the same rows in
+    # the same order.
+    streamed = is_streamed(info, "items")
+    page_limit = 0 if streamed else limit
+
+    async def load_page() -> Dict[str, Any]:
+        async for session in get_session():
+            total_count = (
+                await session.execute(datastore_files_count_stmt(datastore_id))
+            ).scalar_one()
+            items: List[Any] = []
+            if page_limit:
+                stmt = datastore_files_stmt(datastore_id).offset(offset)
+                items = list(
+                    (await session.execute(stmt.limit(page_limit))).scalars().all()
+                )
+            break
+        return {"total_count": total_count, "items": items}
+
+    # Same page requested concurrently (e.g. dashboards refreshing together)
+    # is read once.
+    page = await files_page_flight.do(
+        (read_role(), datastore_id, page_limit, offset), load_page
+    )
 
-    items = page["items"]
     total_count = page["total_count"]
 
-    gql_items: List[DatastoreFileType] = []
-    for f in items:
-        meta: Dict[str, Any] = getattr(f, "meta", {}) or {}
-        raw_tags: Any = meta.get("tags", [])
-        tags = raw_tags if isinstance(raw_tags, list) else []
-        client_token: Optional[str] = None
-        if isinstance(meta, dict):
-            client_token = meta.get("clientToken") or meta.get("client_token")
-
-        gql_items.append(
-            DatastoreFileType(
-                id=f.id,
-                filename=f.filename,
-                content_type=f.content_type,
-                size=f.size,
-                created_at=to_datetime_utc(f.created_at),  # ← convert here
-                tags=tags,
-                client_token=client_token,
-            )
-        )
+    if streamed:
+        # Streamed items are read after the operation's routing scope has
+        # ended, so pin them to the role it resolved with.
+        items: Any = _stream_datastore_files(datastore_id, limit, offset, read_role())
+    else:
+        items = [to_datastore_file_type(f) for f in page["items"]]
 
     return DatastoreFilesPageType(
-        items=gql_items,
+        items=items,
         total_count=total_count,
         limit=limit,
         offset=offset,
@@ -2,9 +2,10 @@
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from platform_common.db.session import get_session  # FastAPI-style async generator
 from platform_common.db.dal.datastore_dal import DatastoreDAL
 
+from app.db.routing import get_session  # FastAPI-style async generator
+
 
 @asynccontextmanager
 async def get_datastore_dal() -> AsyncGenerator[DatastoreDAL, None]:
@@ -0,0 +1,140 @@
+# app/utils/file_export.py
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Sequence
+
+from platform_common.utils.time_helpers import to_datetime_utc
+
+from app.resolvers.datastore_resolvers import extract_file_meta
+
+try:  # optional: only the Arrow export needs it
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None  # type: ignore[assignment]
+
+EXPORT_COLUMNS = (
+    "id",
+    "filename",
+    "content_type",
+    "size",
+    "created_at",
+    "tags",
+    "client_token",
+)
+
+# Flush to the socket roughly every 64 KiB rather than once per row.
+CHUNK_BYTES = 64 * 1024
+
+
+def file_export_row(f: Any) -> Dict[str, Any]:
+    tags, client_token = extract_file_meta(f)
+    return {
+        "id": f.id,
+        "filename": f.filename,
+        "content_type": f.content_type,
+        "size": f.size,
+        "created_at": to_datetime_utc(f.created_at).isoformat(),
+        "tags": tags,
+        "client_token": client_token,
+    }
+
+
+async def iter_ndjson(rows: AsyncIterator[Any]) -> AsyncIterator[str]:
+    buf: List[str] = []
+    size = 0
+    async for f in rows:
+        line = json.dumps(file_export_row(f), separators=(",", ":")) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def _csv_values(row: Dict[str, Any], columns: Iterable[str]) -> List[Any]:
+    values = []
+    for col in columns:
+        value = row.get(col)
+        if col == "tags":
+            value = json.dumps(value)
+        values.append("" if value is None else value)
+    return values
+
+
+async def iter_csv(rows: AsyncIterator[Any]) -> AsyncIterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    async for f in rows:
+        writer.writerow(_csv_values(file_export_row(f), EXPORT_COLUMNS))
+        if out.tell() >= CHUNK_BYTES:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate(0)
+    if out.tell():
+        yield out.getvalue()
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def arrow_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("filename", pa.string()),
+            ("content_type", pa.string()),
+            ("size", pa.int64()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("tags", pa.list_(pa.string())),
+            ("client_token", pa.string()),
+        ]
+    )
+
+
+def file_record_batch(rows: Sequence[Any], schema: "pa.Schema") -> "pa.RecordBatch":
+    """One record batch from file rows, column by column (EXPORT_COLUMNS)."""
+    metas = [extract_file_meta(r) for r in rows]
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([str(r.id) for r in rows], pa.string()),
+            pa.array([r.filename for r in rows], pa.string()),
+            pa.array([r.content_type for r in rows], pa.string()),
+            pa.array([r.size for r in rows], pa.int64()),
+            pa.array(
+                [to_datetime_utc(r.created_at) for r in rows],
+                pa.timestamp("us", tz="UTC"),
+            ),
+            pa.array(
+                [[str(t) for t in tags] for tags, _ in metas], pa.list_(pa.string())
+            ),
+            pa.array([token for _, token in metas], pa.string()),
+        ],
+        schema=schema,
+    )
+
+
+async def iter_arrow(batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """
+    Arrow IPC stream: the schema, then one record batch per chunk of rows
+    (sent as soon as it is built), then the end-of-stream marker. Clients
+    read it with pyarrow.ipc.open_stream(...).read_all() / .read_pandas().
+    """
+    schema = arrow_schema()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for rows in batches:
+            writer.write_batch(file_record_batch(rows, schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate(0)
+    # Schema only (no rows) and/or the end-of-stream marker.
+    if sink.tell():
+        yield sink.getvalue()
@@ -0,0 +1,140 @@
+# benchmarks/json_encoding.py
+"""
+Encoding cost of GraphQL responses and websocket frames.
+
+    python -m benchmarks.json_encoding
+
+Compares strawberry's default (`json.dumps`) with app.internal.json_codec
+(stdlib and orjson paths) on payloads shaped like our responses: a files
+page, datastore metrics with BigInt values, a user change frame with the
+trigger's JSON payload, and a big-integer frame that forces the fallback.
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.internal import json_codec
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "2000"))
+
+_T0 = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _files_page(n: int) -> Dict[str, Any]:
+    items = [
+        {
+            "id": f"file-{i:08d}",
+            "filename": f"recordings/session-{i // 100}/clip-{i}.wav",
+            "contentType": "audio/wav",
+            "size": 1_048_576 + i,
+            "createdAt": (_T0 + timedelta(seconds=i)).isoformat(),
+            "tags": ["train", "speaker-a", f"batch-{i % 7}"],
+            "clientToken": f"tok-{i:06d}",
+        }
+        for i in range(n)
+    ]
+    return {
+        "data": {
+            "datastore": {
+                "files": {"items": items, "totalCount": 1_250_000, "limit": n}
+            }
+        }
+    }
+
+
+def _metrics() -> Dict[str, Any]:
+    return {
+        "data": {
+            "datastore": {
+                "metrics": {
+                    "capacityBytes": 10 * 1024**4,
+                    "usedBytes": 7 * 1024**4 + 123,
+                    "freeBytes": 3 * 1024**4 - 123,
+                    "usedPercent": 70.0,
+                    "fileCount": 1_250_000,
+                    "lastUploadAt": _T0.isoformat(),
+                    "byCategory": [
+                        {
+                            "category": c,
+                            "contentTypes": [f"{c}/x-{j}" for j in range(3)],
+                            "fileCount": 10_000 * (k + 1),
+                            "totalBytes": 1024**3 * (k + 1),
+                        }
+                        for k, c in enumerate(["audio", "video", "csv", "json"])
+                    ],
+                }
+            }
+        }
+    }
+
+
+def _user_change_frame() -> Dict[str, Any]:
+    row = {
+        "id": "user-1",
+        "email": "someone@example.com",
+        "display_name": "Someone",
+        "created_at": _T0,  # raw datetimes can reach JSON scalar payloads
+        "updated_at": _T0 + timedelta(days=3),
+        "settings": {"theme": "dark", "beta": True, "limits": [1, 2, 3]},
+    }
+    return {
+        "id": "1",
+        "type": "next",
+        "payload": {
+            "data": {
+                "userUpdated": {
+                    "operation": "UPDATE",
+                    "payload": {"table": "user", "data": row, "old_data": row},
+                }
+            }
+        },
+    }
+
+
+def _bigint_frame() -> Dict[str, Any]:
+    return {"id": "2", "type": "next", "payload": {"data": {"usedBytes": 2**70}}}
+
+
+def _stdlib_default(data: Any) -> str:
+    # What strawberry does today; raw datetimes would fail here.
+    return json.dumps(data, default=str)
+
+
+def _bench(fn: Callable[[Any], Any], data: Any) -> float:
+    fn(data)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(data)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main() -> None:
+    payloads: List[Tuple[str, Any]] = [
+        ("files_page_25", _files_page(25)),
+        ("files_page_500", _files_page(500)),
+        ("metrics", _metrics()),
+        ("user_change_frame", _user_change_frame()),
+        ("bigint_frame", _bigint_frame()),
+    ]
+    encoders: List[Tuple[str, Callable[[Any], Any]]] = [
+        ("json.dumps", _stdlib_default),
+        ("codec/stdlib", json_codec._stdlib_dumps),
+    ]
+    if json_codec.orjson is not None:
+        encoders.append(("codec/orjson", json_codec._orjson_dumps))
+    else:
+        print("orjson not installed; only stdlib paths measured.\n")
+
+    print(f"Encode time per payload ({ITERATIONS} iterations, microseconds)")
+    header = "".join(f"{name:>15}" for name, _ in encoders)
+    print(f"  {'payload':<20}{'bytes':>9}{header}")
+    for pname, data in payloads:
+        size = len(json_codec._stdlib_dumps(data))
+        cells = "".join(f"{_bench(fn, data):>15.1f}" for _, fn in encoders)
+        print(f"  {pname:<20}{size:>9}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/pubsub_decoding.py
+"""
+Decode throughput of pubsub payloads (events per second).
+
+    python -m benchmarks.pubsub_decoding
+
+Feeds `file:status` payloads shaped like a bulk upload (Postgres timestamptz
+text, a few malformed ones) through the handler's previous decode path
+(untyped `payload.get(...)` plus platform_common's parse_occurred_at_string)
+and through app.pubsub.payloads.FileStatusPayload.decode.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from platform_common.utils.time_helpers import parse_occurred_at_string
+
+from app.pubsub.payloads import FileStatusPayload, UploadSessionStatusPayload
+
+EVENTS = int(os.getenv("BENCH_EVENTS", "100000"))
+
+_T0 = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _payloads(n: int) -> List[Dict[str, Any]]:
+    out = []
+    for i in range(n):
+        ts = (_T0 + timedelta(milliseconds=i)).strftime("%Y-%m-%d %H:%M:%S.%f+00")
+        p: Dict[str, Any] = {
+            "file_id": f"file-{i:08d}",
+            "datastore_id": "ds-1",
+            "upload_session_id": "us-1",
+            "old_status": "uploading",
+            "new_status": "ready",
+            "occurred_at": ts,
+        }
+        if i % 1000 == 0:
+            del p["file_id"]  # malformed
+        out.append(p)
+    return out
+
+
+def _legacy(payload: Dict[str, Any]) -> Any:
+    # _handle_file_status_event before the typed decoder, minus its logging.
+    file_id = payload.get("file_id")
+    datastore_id = payload.get("datastore_id")
+    upload_session_id = payload.get("upload_session_id")
+    old_status = payload.get("old_status")
+    new_status = payload.get("new_status")
+    raw_occurred_at = payload.get("occurred_at")
+    if not file_id or not datastore_id:
+        return None
+    occurred_at = parse_occurred_at_string(raw_occurred_at)
+    return (
+        file_id,
+        datastore_id,
+        upload_session_id,
+        old_status,
+        new_status,
+        occurred_at,
+    )
+
+
+def _rate(fn: Callable[[Any], Any], payloads: List[Dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    for p in payloads:
+        fn(p)
+    return len(payloads) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    files = _payloads(EVENTS)
+    sessions = [{"datastore_id": "ds-1", "status": "ready"}] * EVENTS
+
+    print(f"Decode throughput ({EVENTS} events, events/s)")
+    print(f"  {'file:status legacy':<32}{_rate(_legacy, files):>14,.0f}")
+    print(
+        f"  {'file:status typed':<32}{_rate(FileStatusPayload.decode, files):>14,.0f}"
+    )
+    print(
+        f"  {'upload_session:status typed':<32}"
+        f"{_rate(UploadSessionStatusPayload.decode, sessions):>14,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
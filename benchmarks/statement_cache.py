@@ -0,0 +1,157 @@
+# benchmarks/statement_cache.py
+"""
+Client CPU and round-trip cost of compiled-SQL caching and prepared
+statement reuse.
+
+    python -m benchmarks.statement_cache            # compile-only, no DB
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.statement_cache
+
+The compile-only part shows the CPU SQLAlchemy spends building SQL for
+statements shaped like our hot paths (files page, aggregates) with and
+without the compiled cache. With DATABASE_URL set it also runs a
+parameterized catalog query against Postgres with both caches off vs on,
+reporting wall time and client CPU per call.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Callable, List, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    func,
+    select,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "2000"))
+
+_meta = MetaData()
+_file = Table(
+    "file",
+    _meta,
+    Column("id", String, primary_key=True),
+    Column("datastore_id", String),
+    Column("filename", String),
+    Column("content_type", String),
+    Column("size", BigInteger),
+    Column("created_at", DateTime),
+)
+_pg_class = Table(
+    "pg_class",
+    MetaData(),
+    Column("relname", String),
+    Column("relnamespace", Integer),
+)
+
+
+def _files_page() -> Any:
+    return (
+        select(_file)
+        .where(_file.c.datastore_id == bindparam("datastore_id"))
+        .order_by(_file.c.created_at.desc(), _file.c.id)
+        .limit(25)
+        .offset(0)
+    )
+
+
+def _aggregate() -> Any:
+    return select(
+        func.count(_file.c.id),
+        func.coalesce(func.sum(_file.c.size), 0),
+        func.max(_file.c.created_at),
+    ).where(_file.c.datastore_id == bindparam("datastore_id"))
+
+
+def _breakdown() -> Any:
+    return (
+        select(
+            _file.c.content_type,
+            func.count(_file.c.id),
+            func.coalesce(func.sum(_file.c.size), 0),
+        )
+        .where(_file.c.datastore_id == bindparam("datastore_id"))
+        .group_by(_file.c.content_type)
+    )
+
+
+def _bench_compile(build: Callable[[], Any]) -> Tuple[float, float]:
+    """(uncached, cached) microseconds of client CPU per statement."""
+    dialect = postgresql.asyncpg.dialect()  # type: ignore[attr-defined]
+
+    # SQLAlchemy's own execute-time path, with and without a compiled cache.
+    def run(cache: Any) -> float:
+        start = time.process_time()
+        for _ in range(ITERATIONS):
+            build()._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])
+        return (time.process_time() - start) / ITERATIONS * 1e6
+
+    uncached = run(None)
+    cached = run({})
+    return uncached, cached
+
+
+async def _bench_roundtrip(url: str, cached: bool) -> Tuple[float, float]:
+    """(wall ms, client CPU ms) per call for one engine configuration."""
+    engine = create_async_engine(
+        url,
+        query_cache_size=1200 if cached else 0,
+        connect_args={"prepared_statement_cache_size": 256 if cached else 0},
+    )
+    stmt = (
+        select(_pg_class.c.relname)
+        .where(_pg_class.c.relnamespace == bindparam("ns"))
+        .limit(25)
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(stmt, {"ns": 11})  # connect + warm up
+            wall0, cpu0 = time.perf_counter(), time.process_time()
+            for _ in range(ITERATIONS):
+                await conn.execute(stmt, {"ns": 11})
+            wall = (time.perf_counter() - wall0) / ITERATIONS * 1000.0
+            cpu = (time.process_time() - cpu0) / ITERATIONS * 1000.0
+    finally:
+        await engine.dispose()
+    return wall, cpu
+
+
+def main() -> None:
+    rows: List[Tuple[str, float, float]] = []
+    for name, build in (
+        ("files_page", _files_page),
+        ("aggregate", _aggregate),
+        ("content_type_breakdown", _breakdown),
+    ):
+        uncached, cached = _bench_compile(build)
+        rows.append((name, uncached, cached))
+
+    print(f"Compile CPU per statement ({ITERATIONS} iterations, microseconds)")
+    print(f"  {'statement':<24}{'uncached':>10}{'cached':>10}{'saved':>8}")
+    for name, uncached, cached in rows:
+        saved = (1 - cached / uncached) * 100 if uncached else 0.0
+        print(f"  {name:<24}{uncached:>10.1f}{cached:>10.1f}{saved:>7.0f}%")
+
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        print("\nDATABASE_URL not set; skipping round-trip benchmark.")
+        return
+
+    off = asyncio.run(_bench_roundtrip(url, cached=False))
+    on = asyncio.run(_bench_roundtrip(url, cached=True))
+    print(f"\nRound trip per call ({ITERATIONS} iterations, ms)")
+    print(f"  {'config':<24}{'wall':>10}{'cpu':>10}")
+    print(f"  {'no caches':<24}{off[0]:>10.3f}{off[1]:>10.3f}")
+    print(f"  {'compiled + prepared':<24}{on[0]:>10.3f}{on[1]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+
+class FakeWebSocket:
+    """Just enough of starlette's WebSocket for get_context()."""
+
+    def __init__(self) -> None:
+        self.cookies = {}
+        self.closed = []
+
+    async def close(self, code: int = 1000, reason=None) -> None:
+        self.closed.append((code, reason))
+
+
+class _NoSession:
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def context_socket(monkeypatch):
+    """
+    A websocket context opened by app.graphql.context.get_context, without
+    a database: `async with context_socket() as (ctx, websocket): ...`.
+    """
+    pytest.importorskip("platform_common")
+    from app.graphql import context as graphql_context
+
+    async def no_session():
+        return _NoSession()
+
+    monkeypatch.setattr(graphql_context, "create_db_session", no_session)
+
+    @asynccontextmanager
+    async def open_socket():
+        websocket = FakeWebSocket()
+        gen = graphql_context.get_context(websocket=websocket)
+        ctx = await gen.__anext__()
+        try:
+            yield ctx, websocket
+        finally:
+            await gen.aclose()
+
+    return open_socket
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.internal.bulk import (
+    FORBIDDEN,
+    INVALID,
+    NOT_FOUND,
+    SKIPPED,
+    BulkLimitError,
+    apply_atomic,
+    check_limit,
+    new_pairs,
+    plan_attach,
+    plan_create,
+)
+
+MINE = SimpleNamespace(owner_id="u1")
+THEIRS = SimpleNamespace(owner_id="u2")
+SHARED = SimpleNamespace(owner_id=None)
+
+
+def codes(errors):
+    return [e.code if e else None for e in errors]
+
+
+def test_plan_create_keeps_input_order():
+    datastores = {"ds": SimpleNamespace(user_id="u1")}
+    projects = {"p1": MINE, "p2": THEIRS, "p3": SHARED}
+    errors = plan_create(
+        ["ds"] * 6,
+        ["p1", "p2", None, "missing", "p3", "p1"],
+        ["a", "b", "c", "d", "e", " "],
+        datastores,
+        projects,
+        "u1",
+    )
+    assert codes(errors) == [None, FORBIDDEN, None, NOT_FOUND, None, INVALID]
+    assert "missing" in errors[3].message
+
+
+def test_plan_create_checks_datastore_then_project():
+    datastores = {
+        "mine": SimpleNamespace(user_id="u1"),
+        "theirs": SimpleNamespace(user_id="u2"),
+    }
+    errors = plan_create(
+        ["mine", "theirs", "gone", "mine"],
+        ["p2", "p1", "p1", "p2"],
+        ["a", "b", "c", "d"],
+        datastores,
+        {"p1": MINE, "p2": THEIRS},
+        "u1",
+    )
+    assert codes(errors) == [FORBIDDEN, FORBIDDEN, NOT_FOUND, FORBIDDEN]
+    assert "datastore theirs" in errors[1].message
+    assert "Datastore gone" in errors[2].message
+    assert "project p2" in errors[3].message
+
+
+def test_plan_attach_checks_dataset_then_project():
+    datasets = {"d1": MINE, "d2": THEIRS}
+    projects = {"p1": MINE, "p2": THEIRS}
+    errors = plan_attach(
+        [("d1", "p1"), ("d2", "p1"), ("d1", "p2"), ("dx", "px")],
+        datasets,
+        projects,
+        "u1",
+    )
+    assert codes(errors) == [None, FORBIDDEN, FORBIDDEN, NOT_FOUND]
+    assert "Dataset dx" in errors[3].message
+
+
+def test_atomic_skips_valid_items_only_when_something_failed():
+    ok = [None, None]
+    assert apply_atomic(ok) is ok
+    failed = plan_create(
+        ["ds", "ds"], [None, "missing"], ["a", "b"], {"ds": SHARED}, {}, "u1"
+    )
+    assert codes(apply_atomic(failed)) == [SKIPPED, NOT_FOUND]
+
+
+def test_new_pairs_drops_existing_and_repeated_links():
+    pairs = [("d1", "p1"), ("d2", "p1"), ("d1", "p1"), ("d3", "p2")]
+    assert new_pairs(pairs, {("d2", "p1")}) == [("d1", "p1"), ("d3", "p2")]
+
+
+def test_limit():
+    check_limit([1, 2], 2)
+    with pytest.raises(BulkLimitError) as exc:
+        check_limit([1, 2, 3], 2)
+    assert exc.value.extensions == {"code": "BULK_LIMIT"}
@@ -0,0 +1,133 @@
+# createDatasets against a real database: results come back in input order,
+# with a per-item error for datastores that are missing or belong to someone
+# else, and only the valid items are written.
+#
+# Needs platform_common and a throwaway Postgres database:
+#     GRAPHQL_TEST_DATABASE_URL=postgresql+asyncpg://... \
+#         pytest tests/test_bulk_mutations.py
+# Tables are created and the data is seeded by the test; do not point it at
+# a database you care about.
+import asyncio
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+DATABASE_URL = os.getenv("GRAPHQL_TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="GRAPHQL_TEST_DATABASE_URL is not set"
+)
+
+CREATE_DATASETS = """
+mutation Create($input: [CreateDatasetInput!]!, $atomic: Boolean!) {
+  createDatasets(input: $input, atomic: $atomic) {
+    index
+    dataset { name datastoreId }
+    error { code message }
+  }
+}
+"""
+
+
+async def _seed(session):
+    """A user with a datastore and a project, and another user's datastore."""
+    from platform_common.models.datastore import Datastore
+    from platform_common.models.project import Project
+    from platform_common.models.user import User
+
+    tag = uuid.uuid4().hex[:8]
+    user = User(email=f"bulk-{tag}@example.com", display_name="Bulk")
+    other = User(email=f"bulk-other-{tag}@example.com", display_name="Other")
+    session.add_all([user, other])
+    await session.flush()
+
+    mine = Datastore(name=f"mine-{tag}", user_id=user.id)
+    theirs = Datastore(name=f"theirs-{tag}", user_id=other.id)
+    project = Project(name=f"p-{tag}", status="active", owner_id=user.id)
+    session.add_all([mine, theirs, project])
+    await session.commit()
+    return user, str(mine.id), str(theirs.id), str(project.id)
+
+
+async def _create_datasets(atomic: bool):
+    from sqlalchemy import func, select
+    from sqlmodel import SQLModel
+
+    from platform_common.models.dataset import Dataset
+
+    from app.db.routing import create_session, engine_router
+    from app.graphql.context import GraphQLContext
+    from app.graphql.schema.root_schema import schema
+
+    await engine_router.start()
+    async with engine_router.primary.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session = await create_session()
+    try:
+        user, mine, theirs, project = await _seed(session)
+        missing = str(uuid.uuid4())
+        items = [
+            {"datastoreId": mine, "name": "a"},
+            {"datastoreId": missing, "name": "b"},
+            {"datastoreId": theirs, "name": "c"},
+            {"datastoreId": mine, "projectId": project, "name": "d"},
+        ]
+        result = await schema.execute(
+            CREATE_DATASETS,
+            variable_values={"input": items, "atomic": atomic},
+            context_value=GraphQLContext(request=None, current_user=user),
+        )
+        assert result.errors is None, result.errors
+        written = (
+            await session.execute(
+                select(func.count())
+                .select_from(Dataset)
+                .where(Dataset.datastore_id.in_([mine, theirs]))
+            )
+        ).scalar_one()
+        return result.data["createDatasets"], written, mine, missing, theirs
+    finally:
+        await session.close()
+        await engine_router.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _test_database(monkeypatch):
+    from app.core.config import get_service_settings
+    from app.db.routing import EngineRouter
+
+    monkeypatch.setenv("GRAPHQL_PRIMARY_DATABASE_URL", DATABASE_URL)
+    monkeypatch.setattr("app.db.routing.engine_router", EngineRouter())
+    get_service_settings.cache_clear()
+    yield
+    get_service_settings.cache_clear()
+
+
+def _codes(results):
+    return [r["error"]["code"] if r["error"] else None for r in results]
+
+
+def test_create_datasets_reports_each_datastore_in_input_order():
+    results, written, mine, missing, theirs = asyncio.run(_create_datasets(False))
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert _codes(results) == [None, "NOT_FOUND", "FORBIDDEN", None]
+    assert missing in results[1]["error"]["message"]
+    assert theirs in results[2]["error"]["message"]
+    assert [r["dataset"] for r in results] == [
+        {"name": "a", "datastoreId": mine},
+        None,
+        None,
+        {"name": "d", "datastoreId": mine},
+    ]
+    assert written == 2
+
+
+def test_atomic_create_datasets_writes_nothing_for_a_foreign_datastore():
+    results, written, *_ = asyncio.run(_create_datasets(True))
+
+    assert _codes(results) == ["SKIPPED", "NOT_FOUND", "FORBIDDEN", "SKIPPED"]
+    assert written == 0
@@ -0,0 +1,124 @@
+# A datastore's files page must hold the same rows in the same order whether
+# `items` is streamed (`files { items @stream }`) or not.
+#
+# Needs platform_common and a throwaway Postgres database:
+#     GRAPHQL_TEST_DATABASE_URL=postgresql+asyncpg://... \
+#         pytest tests/test_datastore_files_page.py
+# Tables are created and the data is seeded by the test; do not point it at
+# a database you care about.
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+DATABASE_URL = os.getenv("GRAPHQL_TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="GRAPHQL_TEST_DATABASE_URL is not set"
+)
+
+PAGES = [(4, 0), (4, 4), (5, 2), (20, 0)]
+
+
+async def _seed(session) -> str:
+    """One datastore with ten files; several share a created_at, so the
+    page order depends on the tie-breaker too."""
+    from platform_common.models.datastore import Datastore
+    from platform_common.models.file import File
+    from platform_common.models.user import User
+
+    tag = uuid.uuid4().hex[:8]
+    user = User(email=f"files-page-{tag}@example.com", display_name="Files")
+    session.add(user)
+    await session.flush()
+
+    datastore = Datastore(name=f"ds-{tag}", user_id=user.id)
+    session.add(datastore)
+    await session.flush()
+
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    session.add_all(
+        File(
+            datastore_id=datastore.id,
+            filename=f"f{i}.csv",
+            content_type="text/csv",
+            size=100,
+            created_at=t0 + timedelta(minutes=i // 3),
+        )
+        for i in range(10)
+    )
+    await session.commit()
+    return str(datastore.id)
+
+
+async def _page(datastore_id, limit, offset, streamed, monkeypatch):
+    from app.resolvers import datastore_resolvers
+
+    monkeypatch.setattr(
+        datastore_resolvers, "is_streamed", lambda info, child: streamed
+    )
+    page = await datastore_resolvers.get_datastore_files_page(
+        None, datastore_id, limit, offset
+    )
+    if streamed:
+        items = [f async for f in page.items]
+    else:
+        items = page.items
+    return page.total_count, [f.id for f in items]
+
+
+async def _pages(monkeypatch):
+    from sqlmodel import SQLModel
+
+    from app.db.routing import REPLICA, create_session, engine_router, route_reads
+
+    await engine_router.start()
+    async with engine_router.primary.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session = await create_session()
+    try:
+        datastore_id = await _seed(session)
+    finally:
+        await session.close()
+
+    try:
+        pages = []
+        with route_reads(REPLICA):
+            for limit, offset in PAGES:
+                pages.append(
+                    [
+                        await _page(datastore_id, limit, offset, streamed, monkeypatch)
+                        for streamed in (False, True)
+                    ]
+                )
+        return pages
+    finally:
+        await engine_router.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _test_database(monkeypatch):
+    from app.core.config import get_service_settings
+    from app.db.routing import EngineRouter
+
+    monkeypatch.setenv("GRAPHQL_PRIMARY_DATABASE_URL", DATABASE_URL)
+    monkeypatch.setattr("app.db.routing.engine_router", EngineRouter())
+    get_service_settings.cache_clear()
+    yield
+    get_service_settings.cache_clear()
+
+
+def test_streamed_and_regular_pages_match(monkeypatch):
+    pages = asyncio.run(_pages(monkeypatch))
+
+    for (limit, offset), (regular, streamed) in zip(PAGES, pages):
+        assert streamed == regular, (limit, offset)
+        total_count, ids = regular
+        assert total_count == 10
+        assert len(ids) == max(0, min(limit, 10 - offset))
+    # Pages tile the listing without gaps or repeats.
+    assert pages[0][0][1] + pages[1][0][1] == pages[3][0][1][:8]
@@ -0,0 +1,146 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import column, insert, select, table, text
+
+pytest.importorskip("platform_common")
+
+from app.db import routing  # noqa: E402
+from app.db.routing import PRIMARY, REPLICA, RoutingSession, route_reads  # noqa: E402
+
+T = table("t", column("x"))
+
+
+class _Router:
+    def __init__(self):
+        self.primary = SimpleNamespace(sync_engine="primary-engine")
+        self.replicas = iter(["replica-0", "replica-1"])
+
+    def pick_read_engine(self):
+        name = next(self.replicas)
+        return name, SimpleNamespace(sync_engine=f"{name}-engine")
+
+
+@pytest.fixture(autouse=True)
+def router(monkeypatch):
+    router = _Router()
+    monkeypatch.setattr(routing, "engine_router", router)
+    return router
+
+
+def _binds(session, clauses):
+    return [session.get_bind(clause=c) for c in clauses]
+
+
+def test_one_replica_per_session():
+    with route_reads(REPLICA):
+        first, second = RoutingSession(), RoutingSession()
+        assert _binds(first, [select(T), select(T)]) == ["replica-0-engine"] * 2
+        assert _binds(second, [select(T)]) == ["replica-1-engine"]
+        assert first.info["read_engine"][0] == "replica-0"
+
+
+def test_statements_that_may_write_go_to_the_primary():
+    with route_reads(REPLICA):
+        binds = _binds(
+            RoutingSession(),
+            [
+                text("UPDATE t SET x = 1"),
+                insert(T),
+                select(T).with_for_update(),
+                None,
+            ],
+        )
+    assert binds == ["primary-engine"] * 4
+
+
+def test_reads_after_a_write_stay_on_the_primary():
+    with route_reads(REPLICA):
+        session = RoutingSession()
+        binds = _binds(session, [select(T), text("DELETE FROM t"), select(T)])
+    assert binds == ["replica-0-engine", "primary-engine", "primary-engine"]
+
+
+def test_sessions_outside_query_operations_use_the_primary():
+    assert _binds(RoutingSession(), [select(T)]) == ["primary-engine"]
+    pinned = RoutingSession(info={"db_role": REPLICA})
+    assert _binds(pinned, [select(T)]) == ["replica-0-engine"]
+    with route_reads(REPLICA):
+        pinned = RoutingSession(info={"db_role": PRIMARY})
+        assert _binds(pinned, [select(T)]) == ["primary-engine"]
+
+
+class _FakeRedis:
+    """SET with PX and EXISTS, on a clock the test moves."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.keys = {}
+
+    async def set(self, name, value, px=None):
+        self.keys[name] = (value, self.now + px / 1000)
+
+    async def exists(self, name):
+        entry = self.keys.get(name)
+        return int(entry is not None and entry[1] > self.now)
+
+
+def test_a_write_on_one_pod_is_seen_by_another():
+    async def run():
+        redis = _FakeRedis()
+        pod_a, pod_b = routing.RedisWriteMarks(redis), routing.RedisWriteMarks(redis)
+
+        assert not await pod_b.wrote_recently("u1", 10)
+        await pod_a.note_write("u1", 10)
+        assert await pod_b.wrote_recently("u1", 10)
+        assert not await pod_b.wrote_recently("u2", 10)
+        redis.now = 11
+        assert not await pod_b.wrote_recently("u1", 10)
+
+    asyncio.run(run())
+
+
+def test_unknown_recent_writes_read_the_primary(monkeypatch):
+    class _Down:
+        async def note_write(self, user_id, window):
+            raise ConnectionError("redis down")
+
+        wrote_recently = note_write
+
+    monkeypatch.setattr(routing, "get_write_marks", lambda: _Down())
+
+    async def run():
+        await routing.note_write("u1")  # logged, not raised
+        return await routing.wrote_recently("u1")
+
+    assert asyncio.run(run()) is True
+
+
+def test_platform_primary_gets_our_engine_options(monkeypatch):
+    from app.core.config import get_service_settings
+
+    created = []
+
+    async def platform_engine():
+        return SimpleNamespace(url="postgresql+asyncpg://u@db/platform")
+
+    def create_async_engine(url, **options):
+        created.append((url, options))
+        return SimpleNamespace(sync_engine=None)
+
+    monkeypatch.delenv("GRAPHQL_PRIMARY_DATABASE_URL", raising=False)
+    monkeypatch.setenv("GRAPHQL_DB_PGBOUNCER_MODE", "transaction")
+    monkeypatch.setenv("GRAPHQL_DB_STATEMENT_STATS", "false")
+    monkeypatch.setattr(routing, "get_engine", platform_engine)
+    monkeypatch.setattr(routing, "create_async_engine", create_async_engine)
+    monkeypatch.setattr(routing.query_counter, "attach", lambda engine: None)
+    get_service_settings.cache_clear()
+    try:
+        asyncio.run(routing.EngineRouter().start())
+        ((url, options),) = created
+        assert url == "postgresql+asyncpg://u@db/platform"
+        assert options == routing.engine_options()
+        assert options["connect_args"]["statement_cache_size"] == 0
+    finally:
+        get_service_settings.cache_clear()
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+from app.internal.drain import DRAIN_CLOSE_CODE, DrainController  # noqa: E402
+from app.internal.ws_connections import DrainingError, ws_connections  # noqa: E402
+
+
+def test_drain_closes_connections_spread_over_window():
+    async def run():
+        closed = []
+        loop = asyncio.get_running_loop()
+
+        def closer_for(name):
+            async def close(code, reason):
+                closed.append((name, code, json.loads(reason), loop.time()))
+
+            return close
+
+        conns = [ws_connections.open(f"u{i}", closer_for(i)) for i in range(20)]
+        controller = DrainController()
+        try:
+            started = loop.time()
+            await controller.drain("test", window_seconds=0.2)
+
+            assert len(closed) == 20
+            assert {code for _, code, _, _ in closed} == {DRAIN_CLOSE_CODE}
+            assert all(r["reason"] == "draining" for _, _, r, _ in closed)
+            assert len({r["reconnectAfterMs"] for _, _, r, _ in closed}) > 1
+            assert max(t for *_, t in closed) - started <= 0.3
+
+            with pytest.raises(DrainingError):
+                ws_connections.acquire(conns[0], "file_status_updated")
+            assert controller.status()["done"]
+        finally:
+            ws_connections.accepting = True
+            for c in conns:
+                ws_connections.close(c)
+
+    asyncio.run(run())
+
+
+def test_drain_closes_sockets_opened_by_get_context(context_socket):
+    async def run():
+        async with context_socket() as (ctx, websocket):
+            try:
+                await DrainController().drain("test", window_seconds=0)
+            finally:
+                ws_connections.accepting = True
+        assert [code for code, _ in websocket.closed] == [DRAIN_CLOSE_CODE]
+        assert json.loads(websocket.closed[0][1])["reason"] == "draining"
+
+    asyncio.run(run())
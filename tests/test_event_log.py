@@ -0,0 +1,47 @@
+from app.core.config import get_service_settings
+from app.internal.event_log import EventLog
+
+
+def _log(monkeypatch, size="3", streams="2"):
+    monkeypatch.setenv("GRAPHQL_EVENT_LOG_SIZE", size)
+    monkeypatch.setenv("GRAPHQL_EVENT_LOG_MAX_STREAMS", streams)
+    get_service_settings.cache_clear()
+    return EventLog()
+
+
+def test_replay_after_position(monkeypatch):
+    log = _log(monkeypatch)
+    try:
+        a1 = log.append("ds-a", "a1")
+        log.append("ds-b", "b1")
+        a2 = log.append("ds-a", "a2")
+
+        assert log.since("ds-a", a1) == [(a2, "a2")]
+        assert log.since("ds-a", a2) == []
+        assert log.since("ds-c", a2) == []
+        # Position from another process or pod.
+        assert log.since("ds-a", a1 - 1_000_000) is None
+        assert log.since("ds-a", a1, epoch="elsewhere") is None
+        assert log.since("ds-a", log.head + 1) is None
+    finally:
+        get_service_settings.cache_clear()
+
+
+def test_resync_when_position_fell_off(monkeypatch):
+    log = _log(monkeypatch)
+    try:
+        seqs = [log.append("ds-a", i) for i in range(5)]
+
+        assert log.since("ds-a", seqs[0]) is None
+        assert [item for _, item in log.since("ds-a", seqs[1])] == [2, 3, 4]
+
+        # ds-a is evicted once two other datastores are more recent.
+        log.append("ds-b", "b")
+        log.append("ds-c", "c")
+        assert log.since("ds-a", seqs[3]) is None
+        assert log.since("ds-a", seqs[4]) == []
+        again = log.append("ds-a", "again")
+        assert log.since("ds-a", seqs[3]) is None
+        assert log.since("ds-a", seqs[4]) == [(again, "again")]
+    finally:
+        get_service_settings.cache_clear()
@@ -0,0 +1,144 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+from platform_common.errors.base import AuthError, ForbiddenError  # noqa: E402
+
+from app.api.controller import export  # noqa: E402
+from app.resolvers import datastore_resolvers  # noqa: E402
+from app.utils import file_export  # noqa: E402
+from app.utils.file_export import CHUNK_BYTES, iter_csv, iter_ndjson  # noqa: E402
+
+
+def _file(i, meta=None, filename=None):
+    return SimpleNamespace(
+        id=f"f{i}",
+        filename=filename or f"file-{i}.csv",
+        content_type="text/csv",
+        size=i,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        meta=meta,
+    )
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_csv_quotes_commas_and_encodes_tags_as_json():
+    f = _file(0, {"tags": ["a,b", 'say "hi"'], "clientToken": "t"}, "x, y.csv")
+    chunks = asyncio.run(_collect(iter_csv(_aiter([f]))))
+
+    header, row = list(csv.reader(io.StringIO("".join(chunks))))
+    assert header == list(file_export.EXPORT_COLUMNS)
+    record = dict(zip(header, row))
+    assert record["filename"] == "x, y.csv"
+    assert json.loads(record["tags"]) == ["a,b", 'say "hi"']
+    assert record["client_token"] == "t"
+
+
+def test_ndjson_flushes_at_chunk_bytes():
+    files = [_file(i, filename="n" * 1000) for i in range(200)]
+    chunks = asyncio.run(_collect(iter_ndjson(_aiter(files))))
+
+    assert len(chunks) > 1
+    # Every chunk but the last is flushed as soon as it passes CHUNK_BYTES.
+    line = len(chunks[0].splitlines(keepends=True)[-1])
+    for chunk in chunks[:-1]:
+        assert CHUNK_BYTES <= len(chunk) < CHUNK_BYTES + line
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [r["id"] for r in rows] == [f.id for f in files]
+
+
+def _request(cookies=None):
+    return SimpleNamespace(cookies=cookies or {})
+
+
+def _signed_in(monkeypatch, user_id="u1"):
+    async def current_user(request):
+        return {"user": SimpleNamespace(id=user_id)}
+
+    monkeypatch.setattr(export, "get_current_user_from_request", current_user)
+
+
+def _datastore(monkeypatch, owner):
+    async def load(datastore_id):
+        return SimpleNamespace(id=datastore_id, user_id=owner)
+
+    monkeypatch.setattr(datastore_resolvers, "_load_datastore", load)
+
+
+def _row_batches(monkeypatch, batches):
+    """Serve `batches` to the export; returns the roles it read with."""
+    roles = []
+
+    async def stream_row_batches(stmt, batch_size, role=None):
+        roles.append(role)
+        for batch in batches:
+            yield batch
+
+    monkeypatch.setattr(export, "stream_row_batches", stream_row_batches)
+    return roles
+
+
+async def _export(datastore_id, format):
+    response = await export.export_datastore_files(
+        _request(), datastore_id, format=format
+    )
+    return response, "".join(await _collect(response.body_iterator))
+
+
+def test_export_requires_a_signed_in_user():
+    with pytest.raises(AuthError):
+        asyncio.run(export.export_datastore_files(_request(), "ds-auth"))
+
+
+def test_export_of_another_users_datastore_is_forbidden(monkeypatch):
+    _signed_in(monkeypatch, "u1")
+    _datastore(monkeypatch, owner="u2")
+
+    with pytest.raises(ForbiddenError):
+        asyncio.run(export.export_datastore_files(_request(), "ds-forbidden"))
+
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+def test_export_of_an_empty_datastore(monkeypatch, format):
+    _signed_in(monkeypatch, "u1")
+    _datastore(monkeypatch, owner="u1")
+    _row_batches(monkeypatch, [])
+
+    response, body = asyncio.run(_export(f"ds-empty-{format}", format))
+    assert response.headers["content-disposition"] == (
+        f'attachment; filename="datastore-ds-empty-{format}-files.{format}"'
+    )
+    if format == "csv":
+        assert list(csv.reader(io.StringIO(body))) == [list(file_export.EXPORT_COLUMNS)]
+    else:
+        assert body == ""
+
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+def test_text_exports_read_row_batches_from_a_replica(monkeypatch, format):
+    _signed_in(monkeypatch, "u1")
+    _datastore(monkeypatch, owner="u1")
+    roles = _row_batches(monkeypatch, [[_file(0), _file(1)], [_file(2)]])
+
+    _, body = asyncio.run(_export(f"ds-rows-{format}", format))
+    if format == "csv":
+        ids = [r["id"] for r in csv.DictReader(io.StringIO(body))]
+    else:
+        ids = [json.loads(line)["id"] for line in body.splitlines()]
+    assert ids == ["f0", "f1", "f2"]
+    assert roles == [export.REPLICA]
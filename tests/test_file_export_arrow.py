@@ -0,0 +1,62 @@
+# tests/test_file_export_arrow.py
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("platform_common")
+
+from app.utils.file_export import iter_arrow  # noqa: E402
+
+
+def _row(i, meta=None):
+    return SimpleNamespace(
+        id=f"f{i}",
+        filename=f"file-{i}.csv",
+        content_type="text/csv",
+        size=i * 10,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        meta=meta,
+    )
+
+
+async def _batches(batches):
+    for batch in batches:
+        yield batch
+
+
+def _export(batches):
+    async def run():
+        return [chunk async for chunk in iter_arrow(_batches(batches))]
+
+    return asyncio.run(run())
+
+
+def test_one_record_batch_per_chunk_of_rows():
+    chunks = _export(
+        [
+            [_row(0, {"tags": ["a", 1], "clientToken": "t0"}), _row(1)],
+            [_row(2, {"client_token": "t2"})],
+        ]
+    )
+    # Schema + first batch, second batch, end of stream.
+    assert len(chunks) == 3
+
+    reader = pa.ipc.open_stream(b"".join(chunks))
+    batches = list(reader)
+    assert [b.num_rows for b in batches] == [2, 1]
+
+    table = pa.Table.from_batches(batches).to_pydict()
+    assert table["id"] == ["f0", "f1", "f2"]
+    assert table["size"] == [0, 10, 20]
+    assert table["tags"] == [["a", "1"], [], []]
+    assert table["client_token"] == ["t0", None, "t2"]
+    assert table["created_at"][0] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_empty_export_is_a_valid_stream():
+    table = pa.ipc.open_stream(b"".join(_export([]))).read_all()
+    assert table.num_rows == 0
+    assert "client_token" in table.schema.names
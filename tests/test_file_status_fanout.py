@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+from app.graphql.dashboard import subscription  # noqa: E402
+from app.internal.event_log import file_status_log  # noqa: E402
+from app.internal.tenants import TenantFanout  # noqa: E402
+from app.internal.ws_connections import ws_connections  # noqa: E402
+from app.pubsub import file_subscriber  # noqa: E402
+
+
+class _Event:
+    def __init__(self, datastore_id, file_id, status):
+        self.payload = {
+            "file_id": file_id,
+            "datastore_id": datastore_id,
+            "old_status": "uploading",
+            "new_status": status,
+            "occurred_at": "2024-05-01T12:00:00Z",
+        }
+
+
+class _Ctx(dict):
+    pass
+
+
+def _fanout(monkeypatch, queue_size):
+    fanout = TenantFanout("test", workers=1, per_tenant=1, queue_size=queue_size)
+    monkeypatch.setattr(file_subscriber, "file_status_fanout", fanout)
+    return fanout
+
+
+async def _drain(fanout):
+    worker = asyncio.ensure_future(fanout.run())
+    while fanout.depths():
+        await asyncio.sleep(0)
+    worker.cancel()
+
+
+def _subscribe(ctx, datastore_id):
+    info = SimpleNamespace(context=ctx)
+    return subscription.Subscription.file_status_updated(None, datastore_id, None, info)
+
+
+def test_events_are_logged_on_arrival_and_drops_send_a_marker(monkeypatch):
+    fanout = _fanout(monkeypatch, queue_size=1)
+
+    async def no_check(info, datastore_id):
+        pass
+
+    monkeypatch.setattr(subscription, "_authorize_datastore", no_check)
+
+    async def run():
+        conn = ws_connections.open("u1")
+        ctx = _Ctx(current_user=None, ws_connection=conn)
+        events = _subscribe(ctx, "ds-fanout")
+        try:
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0)  # subscribed
+
+            before = file_status_log.head
+            for n in range(3):
+                await file_subscriber._handle_file_status_event(
+                    _Event("ds-fanout", f"f{n}", "ready")
+                )
+            # Sequenced in arrival order before any delivery ran.
+            logged = file_status_log.since("ds-fanout", before)
+            assert [e.file_id for _, e in logged] == ["f0", "f1", "f2"]
+
+            await _drain(fanout)
+            received = [await asyncio.wait_for(pending, 1)]
+            received += [await events.__anext__() for _ in range(2)]
+        finally:
+            await events.aclose()
+            ws_connections.close(conn)
+
+        # The queue held one job: f0 and f1 were dropped, and each left a
+        # resync marker at its own position.
+        assert [(e.resync_required, e.seq) for e in received] == [
+            (True, logged[0][0]),
+            (True, logged[1][0]),
+            (False, logged[2][0]),
+        ]
+
+    asyncio.run(run())
+
+
+def test_events_logged_before_subscribing_are_not_delivered(monkeypatch):
+    fanout = _fanout(monkeypatch, queue_size=10)
+
+    async def no_check(info, datastore_id):
+        pass
+
+    monkeypatch.setattr(subscription, "_authorize_datastore", no_check)
+
+    async def run():
+        await file_subscriber._handle_file_status_event(
+            _Event("ds-late", "old", "ready")
+        )
+        conn = ws_connections.open("u1")
+        events = _subscribe(_Ctx(current_user=None, ws_connection=conn), "ds-late")
+        try:
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0)
+            await file_subscriber._handle_file_status_event(
+                _Event("ds-late", "new", "ready")
+            )
+            await _drain(fanout)
+            first = await asyncio.wait_for(pending, 1)
+        finally:
+            await events.aclose()
+            ws_connections.close(conn)
+        assert first.file_id == "new"
+
+    asyncio.run(run())
@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+import pytest
+
+from app.internal import idempotency
+from app.internal.idempotency import (
+    IdempotencyInProgressError,
+    IdempotencyKeyReusedError,
+    LocalIdempotencyStore,
+    RedisIdempotencyStore,
+    request_fingerprint,
+)
+
+FP = request_fingerprint("mutation { a }", None, {"x": 1})
+
+
+def test_fingerprint_ignores_variable_order():
+    assert request_fingerprint("q", "Op", {"a": 1, "b": 2}) == request_fingerprint(
+        "q", "Op", {"b": 2, "a": 1}
+    )
+    assert request_fingerprint("q", "Op", {"a": 1}) != request_fingerprint(
+        "q", "Op", {"a": 2}
+    )
+
+
+def test_replays_completed_response_and_rejects_other_requests():
+    async def scenario():
+        store = LocalIdempotencyStore()
+        assert await store.acquire("k", "o1", FP, wait=1) is None
+        assert await store.complete(
+            "k", "o1", FP, {"createDataset": {"id": "d1"}}, ttl=60
+        )
+        assert await store.acquire("k", "o2", FP, wait=1) == {
+            "createDataset": {"id": "d1"}
+        }
+        with pytest.raises(IdempotencyKeyReusedError):
+            await store.acquire("k", "o3", "other", wait=1)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_duplicates_wait_for_the_first():
+    async def scenario():
+        store = LocalIdempotencyStore()
+        runs = []
+
+        async def request(owner):
+            stored = await store.acquire("k", owner, FP, wait=1)
+            if stored is not None:
+                return stored
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            await store.complete("k", owner, FP, {"n": len(runs)}, ttl=60)
+            return {"n": len(runs)}
+
+        return runs, await asyncio.gather(*(request(f"o{i}") for i in range(5)))
+
+    runs, responses = asyncio.run(scenario())
+    assert runs == [1]
+    assert responses == [{"n": 1}] * 5
+
+
+def test_release_lets_a_waiter_run_and_waiting_is_bounded():
+    async def scenario():
+        store = LocalIdempotencyStore()
+        assert await store.acquire("k", "o1", FP, wait=1) is None
+        waiter = asyncio.ensure_future(store.acquire("k", "o2", FP, wait=1))
+        await asyncio.sleep(0)
+        assert await store.release("k", "o1")
+        assert await waiter is None  # the waiter now owns the key
+        assert not await store.release("k", "o1")  # no longer ours
+
+        with pytest.raises(IdempotencyInProgressError):
+            await store.acquire("k", "o3", FP, wait=0.01)
+
+    asyncio.run(scenario())
+
+
+def test_expired_and_overflowing_entries_are_evicted():
+    async def scenario():
+        store = LocalIdempotencyStore(max_keys=2)
+        for key in ("a", "b", "c"):
+            await store.acquire(key, "o1", FP, wait=1)
+            await store.complete(key, "o1", FP, {"key": key}, ttl=60)
+        await store.acquire("pending", "o1", FP, wait=1)
+        assert len(store) == 2
+        assert await store.acquire("c", "o2", FP, wait=1) == {"key": "c"}
+        await store.acquire("d", "o1", FP, wait=1)
+        await store.complete("d", "o1", FP, {"key": "d"}, ttl=0)
+        assert await store.acquire("d", "o2", FP, wait=1) is None
+
+    asyncio.run(scenario())
+
+
+class FakeRedis:
+    """SET NX/PX, GET and the two claim scripts, on a clock the test moves."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.keys = {}
+
+    def _live(self, name):
+        entry = self.keys.get(name)
+        if entry is not None and entry[1] <= self.now:
+            del self.keys[name]
+            return None
+        return entry
+
+    async def set(self, name, value, nx=False, px=None):
+        if nx and self._live(name) is not None:
+            return None
+        self.keys[name] = (value, self.now + px / 1000)
+        return True
+
+    async def get(self, name):
+        entry = self._live(name)
+        return entry[0] if entry else None
+
+    async def eval(self, script, numkeys, name, owner, *args):
+        raw = await self.get(name)
+        if raw is None or json.loads(raw).get("owner") != owner:
+            return None if script is idempotency._SET_IF_CLAIMED else 0
+        if script is idempotency._SET_IF_CLAIMED:
+            value, px = args
+            return await self.set(name, value, px=int(px))
+        del self.keys[name]
+        return 1
+
+
+def test_expired_claim_cannot_touch_the_retry_that_took_over():
+    async def scenario():
+        redis = FakeRedis()
+        store = RedisIdempotencyStore(redis, lock_seconds=120)
+
+        assert await store.acquire("k", "slow", FP, wait=0) is None
+        redis.now += 121  # the slow request's claim expires
+        assert await store.acquire("k", "retry", FP, wait=0) is None
+
+        # The slow request finishing or failing leaves the retry's claim be.
+        assert not await store.complete("k", "slow", FP, {"n": 1}, ttl=60)
+        assert not await store.release("k", "slow")
+        with pytest.raises(IdempotencyInProgressError):
+            await store.acquire("k", "third", FP, wait=0)
+
+        assert await store.complete("k", "retry", FP, {"n": 2}, ttl=60)
+        assert await store.acquire("k", "third", FP, wait=0) == {"n": 2}
+        assert not await store.release("k", "retry")  # stored responses stay
+        assert await store.acquire("k", "fourth", FP, wait=0) == {"n": 2}
+
+    asyncio.run(scenario())
+
+
+def test_extension_replays_mutations():
+    pytest.importorskip("platform_common")
+    import strawberry
+
+    from app.graphql.extensions import IdempotencyExtension
+
+    calls = []
+
+    @strawberry.type
+    class Query:
+        ok: bool = True
+
+    @strawberry.type
+    class Mutation:
+        @strawberry.mutation
+        def create(self) -> int:
+            calls.append(1)
+            return len(calls)
+
+    class User:
+        id = "u1"
+
+    schema = strawberry.Schema(Query, Mutation, extensions=[IdempotencyExtension])
+    idempotency.get_idempotency_store.cache_clear()
+
+    async def run(document, key="k1"):
+        return await schema.execute(
+            document,
+            context_value={"current_user": User(), "request": None},
+            operation_extensions={"idempotencyKey": key},
+        )
+
+    first = asyncio.run(run("mutation { create }"))
+    again = asyncio.run(run("mutation { create }"))
+    other = asyncio.run(run("mutation { create }", key="k2"))
+    reused = asyncio.run(run("mutation M { create }"))
+
+    assert first.data == again.data == {"create": 1}
+    assert again.extensions == {"idempotency": {"replayed": True}}
+    assert other.data == {"create": 2}
+    assert reused.errors[0].extensions == {"code": "IDEMPOTENCY_KEY_REUSED"}
+    assert len(calls) == 2
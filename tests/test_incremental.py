@@ -0,0 +1,260 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import AsyncGenerator, List, Optional
+
+import pytest
+import strawberry
+from fastapi import FastAPI
+from strawberry.schema.config import StrawberryConfig
+
+pytest.importorskip("platform_common")
+
+from app.db.routing import REPLICA, route_reads  # noqa: E402
+from app.graphql.context import GraphQLContext  # noqa: E402
+from app.graphql.router import AppGraphQLRouter  # noqa: E402
+from app.resolvers import datastore_resolvers  # noqa: E402
+
+DEFER_QUERY = '{ greeting ... @defer(label: "later") { slow } }'
+STREAM_QUERY = "{ numbers @stream(initialCount: 1) }"
+
+
+async def _numbers() -> AsyncGenerator[int, None]:
+    for i in range(3):
+        await asyncio.sleep(0)
+        yield i
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    def greeting(self) -> str:
+        return "hi"
+
+    @strawberry.field
+    async def slow(self) -> str:
+        await asyncio.sleep(0)
+        return "done"
+
+    @strawberry.field
+    async def broken(self) -> Optional[str]:
+        raise ValueError("boom")
+
+    @strawberry.field
+    async def numbers(self) -> List[int]:
+        return _numbers()  # type: ignore[return-value]
+
+
+SCHEMA = strawberry.Schema(
+    query=Query,
+    config=StrawberryConfig(enable_experimental_incremental_execution=True),
+)
+
+
+class _Identity:
+    session_id = None
+
+    async def current_user(self):
+        return None
+
+
+async def _context() -> GraphQLContext:
+    return GraphQLContext(ws_identity=_Identity(), ws_connection=None)
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(
+        AppGraphQLRouter(SCHEMA, context_getter=_context), prefix="/graphql"
+    )
+    return app
+
+
+async def _post(app, query):
+    body = json.dumps({"query": query}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/graphql",
+        "raw_path": b"/graphql",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"accept", b"multipart/mixed"),
+        ],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    received = False
+    sent = []
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return b"".join(
+        m.get("body", b"") for m in sent if m["type"] == "http.response.body"
+    )
+
+
+def _multipart_parts(body: bytes):
+    parts = []
+    for chunk in body.decode().split("\r\n---"):
+        _, _, payload = chunk.partition("\r\n\r\n")
+        if payload.strip():
+            parts.append(json.loads(payload))
+    return parts
+
+
+async def _ws_session(app, query):
+    """Run `query` over graphql-transport-ws; return the frames the server
+    sent up to the operation's `complete` (or `error`)."""
+    scope = {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "scheme": "ws",
+        "path": "/graphql",
+        "raw_path": b"/graphql",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"sec-websocket-protocol", b"graphql-transport-ws")],
+        "subprotocols": ["graphql-transport-ws"],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    inbox: asyncio.Queue = asyncio.Queue()
+    outbox: asyncio.Queue = asyncio.Queue()
+    inbox.put_nowait({"type": "websocket.connect"})
+    for message in [
+        {"type": "connection_init"},
+        {"id": "1", "type": "subscribe", "payload": {"query": query}},
+    ]:
+        inbox.put_nowait({"type": "websocket.receive", "text": json.dumps(message)})
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            outbox.put_nowait(json.loads(message["text"]))
+
+    server = asyncio.ensure_future(app(scope, inbox.get, send))
+    frames = []
+    try:
+        while not frames or frames[-1]["type"] not in ("complete", "error"):
+            frames.append(await asyncio.wait_for(outbox.get(), 5))
+    finally:
+        inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(server, 5)
+    assert frames[0]["type"] == "connection_ack"
+    return frames[1:]
+
+
+def _incremental(frames, key):
+    return [
+        value
+        for frame in frames
+        for part in frame["payload"].get("incremental", [])
+        for value in [part[key]]
+    ]
+
+
+def test_defer_over_multipart_http():
+    parts = _multipart_parts(asyncio.run(_post(_app(), DEFER_QUERY)))
+
+    assert parts[0]["data"] == {"greeting": "hi"}
+    assert parts[0]["hasNext"] is True
+    assert parts[-1]["hasNext"] is False
+    deferred = [i for p in parts[1:] for i in p.get("incremental", [])]
+    assert deferred == [
+        {"id": "0", "data": {"slow": "done"}, "path": [], "label": "later"}
+    ]
+
+
+def test_defer_over_graphql_transport_ws():
+    initial, patch, complete = asyncio.run(_ws_session(_app(), DEFER_QUERY))
+
+    assert initial == {
+        "id": "1",
+        "type": "next",
+        "payload": {
+            "data": {"greeting": "hi"},
+            "hasNext": True,
+            "pending": [{"id": "0", "path": [], "label": "later"}],
+            "extensions": None,
+        },
+    }
+    # Same shape as the multipart HTTP parts.
+    assert patch["payload"]["hasNext"] is False
+    assert patch["payload"]["incremental"] == [
+        {"id": "0", "data": {"slow": "done"}, "path": [], "label": "later"}
+    ]
+    assert complete == {"id": "1", "type": "complete"}
+
+
+def test_stream_over_graphql_transport_ws():
+    frames = asyncio.run(_ws_session(_app(), STREAM_QUERY))
+
+    assert frames[0]["payload"]["data"] == {"numbers": [0]}
+    assert _incremental(frames[1:-1], "items") == [[1], [2]]
+    assert frames[-2]["payload"]["hasNext"] is False
+    assert frames[-1] == {"id": "1", "type": "complete"}
+
+
+def test_errors_in_incremental_and_plain_results_are_processed(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        SCHEMA, "process_errors", lambda errors, ctx=None: logged.extend(errors)
+    )
+
+    frames = asyncio.run(_ws_session(_app(), "{ greeting ... @defer { broken } }"))
+    deferred = _incremental(frames[:-1], "data")
+    assert deferred == [{"broken": None}]
+    assert [e.message for e in logged] == ["boom"]
+
+    # Without @defer the result goes through strawberry's send_next.
+    logged.clear()
+    result, complete = asyncio.run(_ws_session(_app(), "{ broken }"))
+    assert result["payload"]["data"] == {"broken": None}
+    assert result["payload"]["errors"][0]["message"] == "boom"
+    assert [e.message for e in logged] == ["boom"]
+    assert complete["type"] == "complete"
+
+
+def test_streamed_files_keep_the_role_of_the_operation(monkeypatch):
+    roles = []
+
+    class _Session:
+        async def execute(self, stmt):
+            return SimpleNamespace(scalar_one=lambda: 0)
+
+    async def session():
+        yield _Session()
+
+    async def stream_scalars(stmt, role=None):
+        roles.append(role)
+        return
+        yield
+
+    monkeypatch.setattr(datastore_resolvers, "is_streamed", lambda info, child: True)
+    monkeypatch.setattr(datastore_resolvers, "get_session", session)
+    monkeypatch.setattr(datastore_resolvers, "stream_scalars", stream_scalars)
+
+    async def run():
+        with route_reads(REPLICA):
+            page = await datastore_resolvers.get_datastore_files_page(
+                None, "ds-stream-role", 10, 0
+            )
+        # graphql-core reads the items after the operation's scope has ended.
+        return [f async for f in page.items]
+
+    assert asyncio.run(run()) == []
+    assert roles == [REPLICA]
@@ -0,0 +1,32 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.internal import json_codec
+
+
+@pytest.mark.parametrize(
+    "encode", [json_codec._stdlib_dumps, getattr(json_codec, "_orjson_dumps", None)]
+)
+def test_encoders_agree(encode):
+    if encode is None:
+        pytest.skip("orjson not installed")
+    when = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    data = {
+        "createdAt": when,
+        "naive": datetime(2024, 5, 1),
+        "usedBytes": 7 * 1024**4,
+        "huge": 2**70,
+        "tags": ("a", "b"),
+        1: "int key",
+    }
+
+    decoded = json.loads(encode(data))
+
+    assert decoded["createdAt"] == when.isoformat()
+    assert decoded["naive"] == "2024-05-01T00:00:00"
+    assert decoded["usedBytes"] == 7 * 1024**4
+    assert decoded["huge"] == 2**70
+    assert decoded["tags"] == ["a", "b"]
+    assert decoded["1"] == "int key"
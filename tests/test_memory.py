@@ -0,0 +1,68 @@
+import asyncio
+
+from app.internal.event_bus import EventBus
+from app.internal.memory import (
+    AllocationTracker,
+    memory_report,
+    task_counts,
+    top_keys,
+)
+from app.internal.reaper import SubscriptionReaper
+
+
+def test_top_keys_orders_by_depth():
+    report = top_keys({"a": 1, "b": 5, "c": 3}, limit=2)
+    assert report["total"] == 9 and report["keys"] == 3
+    assert [row["key"] for row in report["top"]] == ["b", "c"]
+
+
+def test_event_bus_depths():
+    bus = EventBus(maxsize=4)
+
+    async def fill():
+        for i in range(6):
+            await bus.publish("x", i)
+        await bus.publish("y", 0)
+
+    asyncio.run(fill())
+    assert bus.depths() == {"x": 4, "y": 1}
+    assert ("event_bus_queue_depth", {"key": "x"}, 4) in list(bus.collect())
+
+
+def test_report_includes_registered_registries(monkeypatch):
+    reaper = SubscriptionReaper()
+    monkeypatch.setattr("app.internal.memory.subscription_reaper", reaper)
+    registry = {"k1": [object(), object()], "k2": [object()]}
+    reaper.register(
+        "test_memory", lambda: 0, lambda: {k: len(v) for k, v in registry.items()}
+    )
+    report = memory_report(limit=1)
+    assert report["registries"]["test_memory"] == {
+        "total": 3,
+        "keys": 2,
+        "top": [{"key": "k1", "depth": 2}],
+    }
+    assert task_counts() == {}
+
+    async def probe():
+        return task_counts()
+
+    assert sum(asyncio.run(probe()).values()) >= 1
+
+
+def test_allocation_diff_reports_growth():
+    tracker = AllocationTracker()
+    assert tracker.diff() == {"tracing": False}
+    tracker.start()
+    try:
+        tracker.diff()
+        hoard = [bytearray(1024) for _ in range(2000)]
+        diff = tracker.diff(limit=5)
+        assert diff["tracing"]
+        assert any(
+            __file__ in row["site"] and row["size_diff_bytes"] >= 1024 * 2000
+            for row in diff["top"]
+        )
+        del hoard
+    finally:
+        tracker.stop()
@@ -0,0 +1,21 @@
+# tests/test_metrics.py
+from app.internal.metrics import MetricsRegistry
+
+
+def test_counters_gauges_and_collectors():
+    registry = MetricsRegistry()
+    registry.counter("db_statements_routed_total", pool="primary").inc()
+    registry.counter("db_statements_routed_total", pool="primary").inc(2)
+    registry.counter("db_statements_routed_total", pool="replica-0").inc()
+    registry.gauge("subscriptions_active").set(5)
+    registry.register_collector(lambda: [("queue_depth", {"key": "a"}, 3)])
+
+    snapshot = registry.snapshot()
+
+    assert snapshot['db_statements_routed_total{pool="primary"}'] == 3
+    assert snapshot['db_statements_routed_total{pool="replica-0"}'] == 1
+    assert snapshot["subscriptions_active"] == 5
+    assert snapshot['queue_depth{key="a"}'] == 3
+
+    text = registry.render_prometheus()
+    assert 'db_statements_routed_total{pool="primary"} 3.0' in text.splitlines()
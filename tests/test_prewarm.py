@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+import strawberry
+
+from app.internal.prewarm import DASHBOARD_OPERATIONS, Prewarmer, warm_operations
+
+
+def test_phases_are_timed_and_failures_isolated():
+    prewarmer = Prewarmer()
+
+    async def ok():
+        return 3
+
+    async def broken():
+        raise ConnectionError("db down")
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    asyncio.run(
+        prewarmer.run(
+            [("a", ok), ("b", broken), ("c", ok), ("d", slow), ("e", ok)],
+            timeout=0.05,
+        )
+    )
+    report = prewarmer.report()
+    assert report["done"]
+    phases = report["phases"]
+    assert phases["a"] == {"ok": True, "result": 3, "ms": phases["a"]["ms"]}
+    assert not phases["b"]["ok"] and "db down" in phases["b"]["error"]
+    assert phases["c"]["ok"]
+    assert phases["d"]["error"] == "timed out"
+    assert "e" not in phases
+
+
+def test_warm_operations_rejects_invalid_documents():
+    @strawberry.type
+    class Query:
+        hello: str = "hi"
+
+    schema = strawberry.Schema(query=Query)
+    assert asyncio.run(warm_operations(schema, ["{ hello }"])) == 2
+    with pytest.raises(RuntimeError):
+        asyncio.run(warm_operations(schema, ["{ nope }"]))
+
+
+def test_dashboard_operations_match_schema():
+    pytest.importorskip("platform_common")
+    from app.graphql.schema.root_schema import schema
+
+    assert asyncio.run(warm_operations(schema, DASHBOARD_OPERATIONS)) == 3
+
+
+def test_prewarmed_metrics_are_served_to_replica_reads(monkeypatch):
+    pytest.importorskip("platform_common")
+    from app import main
+    from app.core.config import get_service_settings
+    from app.db.routing import REPLICA, route_reads
+    from app.graphql.dashboard.subscription import push_datastore_update_to_clients
+    from app.internal.ttl_cache import metrics_cache
+    from app.resolvers import datastore_resolvers
+
+    computed = []
+
+    async def compute(datastore_id):
+        computed.append(datastore_id)
+        return len(computed)
+
+    async def most_active(limit):
+        return ["ds-a", "ds-b"][:limit]
+
+    monkeypatch.setenv("GRAPHQL_PREWARM_TOP_DATASTORES", "2")
+    get_service_settings.cache_clear()
+    monkeypatch.setattr(datastore_resolvers, "_compute_datastore_metrics", compute)
+    monkeypatch.setattr(
+        datastore_resolvers, "get_most_active_datastore_ids", most_active
+    )
+    monkeypatch.setattr(metrics_cache, "_entries", type(metrics_cache._entries)())
+
+    async def run():
+        phase = dict(main._prewarm_phases())["datastore_metrics"]
+        assert await phase() == 2
+        with route_reads(REPLICA):
+            served = await datastore_resolvers.get_datastore_metrics(None, "ds-a")
+        # Outside query operations (the primary) nothing is served stale.
+        fresh = await datastore_resolvers.get_datastore_metrics(None, "ds-a")
+        await push_datastore_update_to_clients("ds-b")
+        with route_reads(REPLICA):
+            after_update = await datastore_resolvers.get_datastore_metrics(None, "ds-b")
+        return served, fresh, after_update
+
+    try:
+        assert asyncio.run(run()) == (1, 3, 4)
+    finally:
+        get_service_settings.cache_clear()
+    assert computed == ["ds-a", "ds-b", "ds-a", "ds-b"]
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+from app.internal.metrics import metrics  # noqa: E402
+from app.pubsub.payloads import (  # noqa: E402
+    DatasetUpdatedPayload,
+    FileStatusPayload,
+    parse_timestamp,
+)
+
+
+def test_parse_timestamp_formats(monkeypatch):
+    def not_called(value):
+        raise AssertionError(f"fell back for {value!r}")
+
+    monkeypatch.setattr("app.pubsub.payloads.parse_occurred_at_string", not_called)
+    expected = datetime(2024, 5, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)
+    assert parse_timestamp("2024-05-01 12:00:00.123+00") == expected
+    assert parse_timestamp("2024-05-01T12:00:00.123Z") == expected
+
+
+def test_parse_timestamp_falls_back_to_the_platform_helper(monkeypatch):
+    seen = []
+    fallback = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def helper(value):
+        seen.append(value)
+        if value == "yesterday-ish":
+            raise ValueError(value)
+        return fallback
+
+    monkeypatch.setattr("app.pubsub.payloads.parse_occurred_at_string", helper)
+    # Missing and offset-less values behave exactly as before the typed
+    # decoder: whatever parse_occurred_at_string makes of them.
+    assert parse_timestamp(None) is fallback
+    assert parse_timestamp("2024-05-01T12:00:00") is fallback
+    assert parse_timestamp("yesterday-ish") is None
+    assert seen == [None, "2024-05-01T12:00:00", "yesterday-ish"]
+
+    msg = FileStatusPayload.decode({"file_id": "f1", "datastore_id": "d"})
+    assert msg is not None and msg.occurred_at is fallback
+
+
+def test_file_status_decode_and_malformed_count():
+    msg = FileStatusPayload.decode(
+        {"file_id": "f1", "datastore_id": 7, "occurred_at": "2024-05-01T12:00:00Z"}
+    )
+    assert msg is not None
+    assert msg.datastore_id == "7"
+    assert msg.upload_session_id is None
+
+    counter = metrics.counter("pubsub_malformed_total", topic=FileStatusPayload.TOPIC)
+    before = counter.value
+    assert FileStatusPayload.decode({"datastore_id": "d"}) is None
+    assert FileStatusPayload.decode("nope") is None
+    assert counter.value == before + 2
+
+
+def test_dataset_updated_defaults():
+    msg = DatasetUpdatedPayload.decode({"dataset_id": "ds"})
+    assert msg is not None
+    assert msg.reason == "dataset_files_changed"
+    assert msg.operation == ""
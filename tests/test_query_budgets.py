@@ -0,0 +1,188 @@
+# N+1 regression harness: run the canonical dashboard operations against a
+# seeded database at two sizes and check each one's statement count against
+# its budget, and that it does not grow with the number of rows returned.
+#
+# Needs platform_common and a throwaway Postgres database:
+#     GRAPHQL_TEST_DATABASE_URL=postgresql+asyncpg://... \
+#         pytest tests/test_query_budgets.py
+# Tables are created and the data is seeded by the test; do not point it at
+# a database you care about.
+#
+# A budget is the number of statements one operation may run. Raise one only
+# together with the resolver change that needs it; a known N+1 is marked
+# xfail(strict=True) so fixing it forces the marker (and budget) to be updated.
+import asyncio
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+DATABASE_URL = os.getenv("GRAPHQL_TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="GRAPHQL_TEST_DATABASE_URL is not set"
+)
+
+SMALL, LARGE = 2, 6
+
+DATASTORE_QUERY = """
+query Datastore($id: String!) {
+  datastore(id: $id) {
+    id name
+    metrics { fileCount usedBytes byCategory { category fileCount } }
+    files(limit: 25, offset: 0) { totalCount items { id filename } }
+  }
+}
+"""
+
+# name -> (document, budget)
+CANONICAL = {
+    "Me": ("query Me { me { id email displayName } }", 0),
+    "DashboardLists": (
+        """
+        query DashboardLists {
+          me {
+            organizations { id name }
+            datastores { id name }
+            projects { id name }
+            datasets { id name }
+          }
+        }
+        """,
+        4,
+    ),
+    "Datastore": (DATASTORE_QUERY, 5),
+    "ProjectDatasets": (
+        "query ProjectDatasets { me { projects { id datasets { id name } } } }",
+        2,
+    ),
+    "DatasetItems": (
+        "query DatasetItems { me { datasets { id items { id } } } }",
+        2,
+    ),
+}
+
+KNOWN_N_PLUS_ONE = {
+    "ProjectDatasets": "ProjectType.datasets runs one query per project",
+    "DatasetItems": "DatasetType.items runs one query per dataset",
+}
+
+
+async def _seed(session, size: int):
+    """One user owning `size` projects, datasets (each in a project, with
+    `size` items) and files in one datastore."""
+    from platform_common.models.dataset import Dataset
+    from platform_common.models.dataset_item import DatasetItem
+    from platform_common.models.datastore import Datastore
+    from platform_common.models.file import File
+    from platform_common.models.project import Project
+    from platform_common.models.project_dataset_link import ProjectDatasetLink
+    from platform_common.models.user import User
+
+    tag = uuid.uuid4().hex[:8]
+    user = User(email=f"budget-{tag}@example.com", display_name="Budget")
+    session.add(user)
+    await session.flush()
+
+    datastore = Datastore(name=f"ds-{tag}", user_id=user.id)
+    session.add(datastore)
+    await session.flush()
+
+    files = [
+        File(
+            datastore_id=datastore.id,
+            filename=f"f{i}.csv",
+            content_type="text/csv",
+            size=100,
+        )
+        for i in range(size)
+    ]
+    session.add_all(files)
+    await session.flush()
+
+    for i in range(size):
+        project = Project(name=f"p{i}", status="active", owner_id=user.id)
+        dataset = Dataset(datastore_id=datastore.id, name=f"d{i}", owner_id=user.id)
+        session.add_all([project, dataset])
+        await session.flush()
+        session.add(ProjectDatasetLink(project_id=project.id, dataset_id=dataset.id))
+        session.add_all(DatasetItem(dataset_id=dataset.id, file_id=f.id) for f in files)
+    await session.commit()
+    return user, datastore
+
+
+async def _count(operation: str, size: int) -> int:
+    from sqlmodel import SQLModel
+
+    from platform_common.db.dal.dataset_dal import DatasetDAL
+    from platform_common.db.dal.dataset_item_dal import DatasetItemDAL
+    from platform_common.db.dal.project_dal import ProjectDAL
+
+    from app.db.routing import create_session, engine_router
+    from app.db.statements import count_queries
+    from app.graphql.context import GraphQLContext
+    from app.graphql.schema.root_schema import schema
+
+    await engine_router.start()
+    async with engine_router.primary.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session = await create_session()
+    try:
+        user, datastore = await _seed(session, size)
+        context = GraphQLContext(
+            request=None,
+            current_user=user,
+            db_session=session,
+            dataset_dal=DatasetDAL(session),
+            dataset_item_dal=DatasetItemDAL(session),
+            project_dal=ProjectDAL(session),
+        )
+        document, _ = CANONICAL[operation]
+        with count_queries() as counts:
+            result = await schema.execute(
+                document,
+                variable_values={"id": str(datastore.id)},
+                context_value=context,
+            )
+        assert result.errors is None, result.errors
+        return counts.statements
+    finally:
+        await session.close()
+        await engine_router.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _test_database(monkeypatch):
+    from app.core.config import get_service_settings
+    from app.db.routing import EngineRouter
+
+    monkeypatch.setenv("GRAPHQL_PRIMARY_DATABASE_URL", DATABASE_URL)
+    monkeypatch.setattr("app.db.routing.engine_router", EngineRouter())
+    get_service_settings.cache_clear()
+    yield
+    get_service_settings.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        pytest.param(
+            name,
+            marks=(
+                [pytest.mark.xfail(reason=KNOWN_N_PLUS_ONE[name], strict=True)]
+                if name in KNOWN_N_PLUS_ONE
+                else []
+            ),
+        )
+        for name in CANONICAL
+    ],
+)
+def test_query_budget(operation):
+    small = asyncio.run(_count(operation, SMALL))
+    large = asyncio.run(_count(operation, LARGE))
+    budget = CANONICAL[operation][1]
+
+    assert large <= budget, f"{operation}: {large} statements, budget {budget}"
+    assert large == small, f"{operation}: {small} -> {large} statements with size"
@@ -0,0 +1,105 @@
+import asyncio
+from typing import List
+
+import pytest
+import strawberry
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.statements import OperationQueryCounter, count_queries
+
+pytest.importorskip("aiosqlite")
+
+
+def _engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    OperationQueryCounter().attach(engine)
+    return engine
+
+
+def test_counts_statements_and_round_trips():
+    engine = _engine()
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            with count_queries() as counts:
+                await conn.execute(
+                    text("INSERT INTO t VALUES (:x)"), [{"x": i} for i in range(3)]
+                )
+                await asyncio.gather(
+                    *(conn.execute(text("SELECT x FROM t")) for _ in range(2))
+                )
+            await conn.execute(text("SELECT 1"))  # not counted
+        await engine.dispose()
+        return counts
+
+    counts = asyncio.run(main())
+    assert counts.statements == 5
+    assert counts.round_trips == 3
+    assert counts.as_dict()["top"][0] == {"sql": "SELECT x FROM t", "count": 2}
+
+
+def test_nested_blocks_count_towards_the_enclosing_one():
+    engine = _engine()
+
+    async def main():
+        async with engine.connect() as conn:
+            with count_queries() as outer:
+                await conn.execute(text("SELECT 1"))
+                with count_queries() as inner:
+                    await conn.execute(text("SELECT 2"))
+        await engine.dispose()
+        return outer, inner
+
+    outer, inner = asyncio.run(main())
+    assert inner.statements == 1
+    assert outer.statements == 2
+
+
+def test_extension_reports_debug_counts(monkeypatch):
+    pytest.importorskip("platform_common")
+    from app.graphql.extensions import QueryCountExtension
+
+    monkeypatch.setenv("GRAPHQL_DEBUG_QUERY_COUNTS", "true")
+    from app.core.config import get_service_settings
+
+    get_service_settings.cache_clear()
+    engine = _engine()
+
+    @strawberry.type
+    class Item:
+        id: int
+
+        @strawberry.field
+        async def value(self) -> int:  # one query per item: an N+1
+            async with engine.connect() as conn:
+                return (await conn.execute(text("SELECT :v"), {"v": self.id})).scalar()
+
+    @strawberry.type
+    class Query:
+        @strawberry.field
+        def items(self, n: int) -> List[Item]:
+            return [Item(id=i) for i in range(n)]
+
+    schema = strawberry.Schema(query=Query, extensions=[QueryCountExtension])
+
+    def statements(n):
+        async def run():
+            # The budget harness counts around schema.execute like this.
+            with count_queries() as outer:
+                result = await schema.execute(
+                    f"query Items {{ items(n: {n}) {{ value }} }}"
+                )
+            return result, outer
+
+        result, outer = asyncio.run(run())
+        assert result.errors is None
+        assert outer.statements == result.extensions["dbQueries"]["statements"]
+        return outer.statements
+
+    try:
+        assert statements(2) == 2
+        assert statements(5) == 5  # grows with the result: what the budgets catch
+    finally:
+        get_service_settings.cache_clear()
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.internal.reaper import SubscriptionReaper
+from app.internal.user_changes import UserChangeFilter, UserChangeIndex
+from app.internal.ws_connections import (
+    KEEPALIVE_CLOSE_CODE,
+    ConnectionRegistry,
+    SubscriptionQueue,
+    sweep_registry,
+)
+
+
+def test_sweep_registry_drops_orphaned_queues():
+    registry = ConnectionRegistry()
+    live, gone = registry.open("u1"), registry.open("u2")
+    keep = SubscriptionQueue(live, maxsize=5)
+    orphan = SubscriptionQueue(gone, maxsize=5)
+    orphan.offer("event")
+    subscribers = {"ds1": [keep, orphan], "ds2": [SubscriptionQueue(gone)]}
+
+    registry.close(gone)
+    assert sweep_registry(subscribers) == 2
+    assert subscribers == {"ds1": [keep]}
+    assert gone.queued_events == 0 and not gone.queues
+
+
+def test_user_change_index_sweep():
+    registry = ConnectionRegistry()
+    conn = registry.open("u1")
+    index = UserChangeIndex()
+    index.add(UserChangeFilter(user_ids=["1", "2"]), SubscriptionQueue(conn))
+    index.add(UserChangeFilter(), SubscriptionQueue(registry.open("u2")))
+
+    registry.close(conn)
+    assert index.sweep() == 1
+    assert index.sizes() == (0, 0, 1)
+
+
+def test_reaper_sweeps_registered_registries():
+    registry = ConnectionRegistry()
+    gone = registry.open("u1")
+    subscribers = {"ds1": [SubscriptionQueue(gone)]}
+    reaper = SubscriptionReaper()
+    reaper.register(
+        "datastore", lambda: sweep_registry(subscribers), lambda: {"ds1": 1}
+    )
+
+    registry.close(gone)
+    assert reaper.sweep() == {"idle_connections": 0, "datastore": 1}
+    assert subscribers == {}
+
+
+def test_idle_sockets_without_pong_keepalive_are_closed(monkeypatch):
+    registry = ConnectionRegistry()
+    monkeypatch.setattr("app.internal.reaper.ws_connections", registry)
+    closed = []
+
+    def closer_for(name):
+        async def close(code, reason):
+            closed.append((name, code, reason))
+
+        return close
+
+    legacy = registry.open("u1", closer_for("legacy"))  # graphql-ws, silent
+    pinged = registry.open("u2", closer_for("pinged"))
+    pinged.pong_keepalive = True
+    chatty = registry.open("u3", closer_for("chatty"))
+    http = registry.open("u4")  # HTTP subscription stream: nothing to close
+    for conn in (legacy, pinged, chatty, http):
+        conn.last_seen -= 3600
+    chatty.touch()
+
+    async def main():
+        swept = SubscriptionReaper().sweep()
+        await asyncio.sleep(0)
+        return swept
+
+    assert asyncio.run(main()) == {"idle_connections": 1}
+    assert closed == [("legacy", KEEPALIVE_CLOSE_CODE, "idle")]
+    assert legacy.closed
+    assert not (pinged.closed or chatty.closed or http.closed)
+
+
+def test_graphql_ws_frames_keep_the_socket_alive():
+    pytest.importorskip("platform_common")
+    from app.graphql.transport_ws import GraphQLWSHandler
+
+    class _WebSocket:
+        async def close(self, code, reason):
+            pass
+
+    conn = ConnectionRegistry().open("u1")
+    conn.last_seen -= 3600
+    handler = GraphQLWSHandler(
+        view=None,
+        websocket=_WebSocket(),
+        context={"ws_connection": conn},
+        root_value=None,
+        schema=None,
+        debug=False,
+        keep_alive=True,
+        keep_alive_interval=20.0,
+    )
+
+    asyncio.run(handler.handle_message({"type": "connection_terminate"}))
+    assert conn.idle_seconds < 60
+    assert not conn.pong_keepalive
@@ -0,0 +1,213 @@
+import asyncio
+import itertools
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+from app.pubsub.streams import (  # noqa: E402
+    RedisStreamSubscriber,
+    add_stream_event,
+    default_group_name,
+)
+
+
+class FakeRedisStreams:
+    """In-memory subset of the Redis Streams commands the subscriber uses."""
+
+    def __init__(self) -> None:
+        self.streams: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+        # (stream, group) -> last delivered id index, pending ids per consumer
+        self.groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self.closed = False
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        msg_id = f"{next(self._ids)}-0"
+        self.streams.setdefault(name, []).append((msg_id, dict(fields)))
+        if maxlen is not None:
+            await self.xtrim(name, maxlen=maxlen)
+        return msg_id
+
+    async def xtrim(self, name, maxlen=None, approximate=True):
+        entries = self.streams.get(name, [])
+        if maxlen is not None and len(entries) > maxlen:
+            del entries[: len(entries) - maxlen]
+
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        if (name, groupname) in self.groups:
+            raise Exception("BUSYGROUP Consumer Group name already exists")
+        entries = self.streams.setdefault(name, [])
+        last = entries[-1][0] if (id == "$" and entries) else "0-0"
+        self.groups[(name, groupname)] = {"last": last, "pending": {}}
+
+    async def xreadgroup(
+        self, groupname, consumername, streams, count=None, block=None
+    ):
+        out = []
+        for name, position in streams.items():
+            group = self.groups[(name, groupname)]
+            pending = group["pending"].setdefault(consumername, [])
+            entries = dict(self.streams.get(name, []))
+            if position == "0":
+                batch = [(i, entries.get(i, {})) for i in pending][:count]
+            else:
+                batch = [
+                    (i, f)
+                    for i, f in self.streams.get(name, [])
+                    if _id(i) > _id(group["last"])
+                ][:count]
+                if batch:
+                    group["last"] = batch[-1][0]
+                    pending.extend(i for i, _ in batch)
+            out.append([name, batch])
+        if not any(batch for _, batch in out) and streams and ">" in streams.values():
+            await asyncio.sleep(0.001)
+            return []
+        return out
+
+    async def xautoclaim(
+        self, name, groupname, consumername, min_idle_time, start_id="0-0", **kw
+    ):
+        pending = self.groups[(name, groupname)]["pending"]
+        claimed = [i for c, ids in pending.items() if c != consumername for i in ids]
+        for c in pending:
+            if c != consumername:
+                pending[c] = []
+        pending.setdefault(consumername, []).extend(claimed)
+        return ["0-0", claimed, []]
+
+    async def xinfo_consumers(self, name, groupname):
+        return [{"name": c} for c in self.groups[(name, groupname)]["pending"]]
+
+    async def xgroup_delconsumer(self, name, groupname, consumername):
+        del self.groups[(name, groupname)]["pending"][consumername]
+
+    async def xinfo_groups(self, name):
+        return [
+            {"name": g, "last-delivered-id": group["last"]}
+            for (stream, g), group in self.groups.items()
+            if stream == name
+        ]
+
+    async def xgroup_destroy(self, name, groupname):
+        del self.groups[(name, groupname)]
+
+    async def xrevrange(self, name, count=None):
+        return list(reversed(self.streams.get(name, [])))[:count]
+
+    async def xack(self, name, groupname, *ids):
+        group = self.groups[(name, groupname)]
+        for pending in group["pending"].values():
+            pending[:] = [i for i in pending if i not in ids]
+        return len(ids)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _id(msg_id: str) -> int:
+    return int(msg_id.split("-")[0])
+
+
+async def _run_until(sub, handlers, seen, n):
+    task = asyncio.create_task(sub.subscribe(handlers))
+    for _ in range(500):
+        if len(seen) >= n:
+            break
+        await asyncio.sleep(0.001)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_batches_ack_and_catch_up_after_restart():
+    async def run():
+        redis = FakeRedisStreams()
+        seen: List[Any] = []
+
+        async def handler(event):
+            seen.append(event.payload["n"])
+
+        handlers = {"file:status": {"*": handler}}
+        sub = RedisStreamSubscriber(redis, group="g1", count=2, block_ms=1)
+        await sub._ensure_group("file:status")
+        for n in range(5):
+            await add_stream_event(redis, "file:status", "changed", {"n": n}, 100)
+
+        await _run_until(sub, handlers, seen, 5)
+        assert seen == [0, 1, 2, 3, 4]
+        assert redis.closed
+        assert redis.groups[("file:status", "g1")]["pending"]["bridge"] == []
+
+        # Events published while the pod is down are read on restart, as are
+        # entries delivered but never acked.
+        for n in range(5, 8):
+            await add_stream_event(redis, "file:status", "changed", {"n": n}, 100)
+        redis.groups[("file:status", "g1")]["pending"]["bridge"].append("1-0")
+
+        restarted = RedisStreamSubscriber(redis, group="g1", count=2, block_ms=1)
+        await _run_until(restarted, handlers, seen, 9)
+        assert seen[5:] == [0, 5, 6, 7]
+
+    asyncio.run(run())
+
+
+def test_default_group_needs_a_stable_hostname():
+    assert default_group_name("graphql-0") == "graphql-bridge-graphql-0"
+    assert default_group_name("ed-graphql-12") == "graphql-bridge-ed-graphql-12"
+    # Deployment pods: <deployment>-<replicaset hash>-<random suffix>.
+    for hostname in ("ed-graphql-7d9f8b6c5-x2k4p", "ed-graphql-7d9f8b6c5-24567"):
+        with pytest.raises(RuntimeError):
+            default_group_name(hostname)
+
+
+def test_startup_claims_stale_consumers_and_drops_stale_groups():
+    async def run():
+        redis = FakeRedisStreams()
+        seen: List[Any] = []
+
+        async def handler(event):
+            seen.append(event.payload["n"])
+
+        handlers = {"file:status": {"*": handler}}
+        await add_stream_event(redis, "file:status", "changed", {"n": 0}, 100)
+        await redis.xgroup_create("file:status", "graphql-bridge-gone-1", id="$")
+        await redis.xgroup_create("file:status", "graphql-bridge-me-0", id="0")
+        await redis.xgroup_create("file:status", "other-service", id="$")
+        # Delivered to a consumer under another name, never acked.
+        await redis.xreadgroup(
+            "graphql-bridge-me-0", "old-name", {"file:status": ">"}, count=1
+        )
+        for n in range(1, 4):
+            await add_stream_event(redis, "file:status", "changed", {"n": n}, 100)
+
+        sub = RedisStreamSubscriber(
+            redis,
+            group="graphql-bridge-me-0",
+            block_ms=1,
+            # Fake ids are 1 ms apart: "gone-1" is 3 ms behind.
+            stale_group_seconds=0.002,
+        )
+        await _run_until(sub, handlers, seen, 4)
+        assert seen == [0, 1, 2, 3]
+        assert set(g for _, g in redis.groups) == {
+            "graphql-bridge-me-0",
+            "other-service",
+        }
+        assert list(
+            redis.groups[("file:status", "graphql-bridge-me-0")]["pending"]
+        ) == ["bridge"]
+
+    asyncio.run(run())
+
+
+def test_stream_length_is_capped():
+    async def run():
+        redis = FakeRedisStreams()
+        for n in range(10):
+            await add_stream_event(redis, "file:status", "changed", {"n": n}, 4)
+        assert len(redis.streams["file:status"]) == 4
+
+    asyncio.run(run())
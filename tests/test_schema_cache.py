@@ -0,0 +1,62 @@
+import strawberry
+from graphql import get_introspection_query
+
+from app.graphql.schema_cache import SchemaCache, etag_matches, is_introspection_only
+
+
+@strawberry.type
+class Query:
+    hello: str = "hi"
+
+
+SCHEMA = strawberry.Schema(query=Query)
+TYPE_QUERY = '{ __type(name: "Query") { name fields { name } } }'
+
+
+class Result:
+    def __init__(self, data, errors=None):
+        self.data, self.errors = data, errors
+
+
+def test_build_serves_standard_introspection_and_sdl():
+    cache = SchemaCache()
+    schema_hash = cache.build(SCHEMA)
+    assert "hello: String!" in cache.sdl
+    assert cache.etag == f'"{schema_hash[:32]}"'
+
+    data = cache.lookup(get_introspection_query(), None, None)
+    assert data["__schema"]["queryType"]["name"] == "Query"
+    assert cache.lookup("{ hello }", None, None) is None
+    # Same hash for the same schema: nothing to rebuild.
+    assert cache.build(SCHEMA) == schema_hash
+
+
+def test_remembers_only_introspection_documents():
+    cache = SchemaCache(max_documents=2)
+    cache.build(SCHEMA)
+
+    cache.remember("{ hello __typename }", None, None, Result({"hello": "hi"}))
+    assert cache.lookup("{ hello __typename }", None, None) is None
+
+    cache.remember(TYPE_QUERY, None, None, Result({"__type": {"name": "Query"}}))
+    assert cache.lookup(TYPE_QUERY, None, None) == {"__type": {"name": "Query"}}
+
+    failed = Result(None, errors=["boom"])
+    cache.remember("{ __schema { types { name } } }", None, None, failed)
+    assert cache.lookup("{ __schema { types { name } } }", None, None) is None
+
+
+def test_introspection_only_detection():
+    assert is_introspection_only(get_introspection_query(), None)
+    assert is_introspection_only(TYPE_QUERY, None)
+    assert not is_introspection_only("{ hello __schema { types { name } } }", None)
+    assert not is_introspection_only("mutation { __typename }", None)
+    assert not is_introspection_only("{ __schema ", None)
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"def"', '"abc"')
@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.internal.metrics import metrics
+from app.internal.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test_share")
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def main():
+        results = await asyncio.gather(
+            *(flight.do("a", lambda: load("a")) for _ in range(5)),
+            flight.do("b", lambda: load("b")),
+        )
+        # Finished keys are forgotten: the next call loads again.
+        again = await flight.do("a", lambda: load("a"))
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert calls == ["a", "b", "a"]
+    assert all(r is results[0] for r in results[:5])
+    assert again is not results[0]
+    assert metrics.counter("single_flight_shared_total", flight="test_share").value == 4
+
+
+def test_errors_and_cancellation_are_isolated():
+    flight = SingleFlight("test_errors")
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("db down")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 1
+
+    async def main():
+        results = await asyncio.gather(
+            flight.do("k", boom), flight.do("k", boom), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+        first = asyncio.ensure_future(flight.do("s", slow))
+        second = asyncio.ensure_future(flight.do("s", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 1
+
+
+def test_datastore_loads_are_shared_per_db_role(monkeypatch):
+    pytest.importorskip("platform_common")
+    from app.db.routing import PRIMARY, REPLICA, read_role, route_reads
+    from app.resolvers import datastore_resolvers
+
+    loads = []
+
+    async def load(datastore_id):
+        loads.append(read_role())
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(id=datastore_id, user_id=None)
+
+    monkeypatch.setattr(datastore_resolvers, "_load_datastore", load)
+    user = SimpleNamespace(id="u1")
+
+    async def get(role):
+        with route_reads(role):
+            return await datastore_resolvers.get_datastore_for_user("ds1", user)
+
+    async def main():
+        # A primary reader (e.g. read-your-writes) arriving while a replica
+        # load is in flight must not be handed the replica's result.
+        return await asyncio.gather(get(REPLICA), get(REPLICA), get(PRIMARY))
+
+    asyncio.run(main())
+    assert sorted(loads) == [PRIMARY, REPLICA]
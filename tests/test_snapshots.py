@@ -0,0 +1,46 @@
+import asyncio
+
+from app.internal.snapshots import VersionedSnapshots, diff_snapshots
+
+
+def test_diff_snapshots():
+    assert diff_snapshots(None, {"a": 1}) == {"a": 1}
+    assert diff_snapshots({"a": 1, "b": 2}, {"a": 1, "b": 3}) == {"b": 3}
+
+
+def test_versions_shared_and_bumped_only_on_change():
+    state = {"used_bytes": 10, "name": "ds"}
+    loads = []
+
+    async def loader(key):
+        loads.append(key)
+        await asyncio.sleep(0)
+        return dict(state)
+
+    async def run():
+        snaps = VersionedSnapshots("test", loader)
+        snaps.acquire("ds-1")
+        snaps.acquire("ds-1")
+
+        (v1, s1), (v1b, _) = await asyncio.gather(
+            snaps.current("ds-1"), snaps.current("ds-1")
+        )
+        assert v1 == v1b == 1
+        assert len(loads) == 1
+
+        snaps.invalidate("ds-1")
+        assert (await snaps.current("ds-1"))[0] == 1  # nothing changed
+
+        state["used_bytes"] = 20
+        snaps.invalidate("ds-1")
+        v2, _ = await snaps.current("ds-1")
+        assert v2 == 2
+        delta = snaps.delta("ds-1", v1, s1)
+        assert delta == {"used_bytes": 20}
+        assert snaps.delta("ds-1", v1, s1) is delta
+
+        snaps.release("ds-1")
+        snaps.release("ds-1")
+        assert list(snaps.collect())[0][2] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+# tests/test_startup_profile.py
+import os
+from pathlib import Path
+
+import pytest
+
+from app.debug.startup_report import (
+    collect_import_times,
+    parse_importtime,
+    self_time_by_package,
+    total_import_ms,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Budget for `import app.main` in a fresh interpreter. Raise it deliberately
+# (and say why in the PR) rather than letting cold start creep up unnoticed.
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2500"))
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       250 |        350 | io
+import time:      1200 |       1200 |     strawberry.types
+import time:       300 |       1500 |   strawberry
+import time:       500 |       2350 | app.main
+"""
+
+
+def test_parse_importtime():
+    timings = parse_importtime(SAMPLE)
+
+    assert [t.module for t in timings] == [
+        "_io",
+        "io",
+        "strawberry.types",
+        "strawberry",
+        "app.main",
+    ]
+    assert [t.depth for t in timings] == [1, 0, 2, 1, 0]
+    assert total_import_ms(timings) == pytest.approx(2.35)
+
+    by_package = self_time_by_package(timings)
+    assert list(by_package)[0] == "strawberry"
+    assert by_package["strawberry"] == pytest.approx(1.5)
+
+
+def test_app_main_import_within_budget():
+    pytest.importorskip("platform_common")
+
+    timings = collect_import_times("app.main", cwd=str(REPO_ROOT))
+    total = total_import_ms(timings)
+
+    assert total <= IMPORT_BUDGET_MS, (
+        f"import app.main took {total:.0f} ms, budget is {IMPORT_BUDGET_MS:.0f} ms; "
+        "run `python -m app.debug.startup_report` to see what grew"
+    )
+
+
+def test_debug_exports_are_not_shadowed_by_submodules():
+    pytest.importorskip("platform_common")
+    import importlib
+    import pkgutil
+
+    from app import debug
+
+    # Importing a submodule binds it on the package under its own name.
+    for module in pkgutil.iter_modules(debug.__path__):
+        importlib.import_module(f"app.debug.{module.name}")
+    for name in debug.__all__:
+        assert callable(getattr(debug, name)), name
@@ -0,0 +1,31 @@
+# tests/test_statement_stats.py
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from app.db.statements import OTHER_STATEMENTS, StatementStats, normalize_sql
+
+
+def test_in_lists_fold_into_one_statement():
+    a = normalize_sql("SELECT * FROM file WHERE id IN ($1, $2)")
+    b = normalize_sql("SELECT *\n  FROM file WHERE id IN ($1, $2, $3, $4)")
+    assert a == b
+
+
+def test_record_and_top():
+    stats = StatementStats(max_statements=2)
+    stats.record("SELECT 1", 2.0, CACHE_MISS)
+    stats.record("SELECT 1", 4.0, CACHE_HIT)
+    stats.record("SELECT 2", 1.0)
+    stats.record("SELECT 3", 1.0)  # over the cap -> <other>
+
+    top = stats.top(order_by="calls")
+    assert top[0]["sql"] == "SELECT 1"
+    assert top[0]["calls"] == 2
+    assert top[0]["max_ms"] == 4.0
+    assert top[0]["mean_ms"] == 3.0
+    assert top[0]["compiled_cache_hits"] == 1
+    assert top[0]["compiled_cache_misses"] == 1
+
+    stats.record("SELECT 4", 1.0)
+    by_sql = {row["sql"]: row for row in stats.top()}
+    assert set(by_sql) == {"SELECT 1", "SELECT 2", OTHER_STATEMENTS}
+    assert by_sql[OTHER_STATEMENTS]["calls"] == 2
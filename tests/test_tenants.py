@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.internal.tenants import (
+    UNKNOWN_TENANT,
+    FairLimiter,
+    TenantBusyError,
+    TenantFanout,
+    tenant_key,
+)
+
+
+def test_tenant_key():
+    assert tenant_key(SimpleNamespace(id="u1", organization_id="o1")) == "org:o1"
+    assert tenant_key(SimpleNamespace(id="u1", organization_id=None)) == "user:u1"
+    assert tenant_key(None) == UNKNOWN_TENANT
+
+
+def test_db_limiter_is_off_by_default():
+    from app.core.config import ServiceSettings
+    from app.internal.tenants import db_limiter
+
+    assert ServiceSettings().tenant_db_slots == 0
+    assert not FairLimiter("test", 0, 8).enabled
+
+    async def scenario():
+        # No slot is taken: enter/exit are no-ops.
+        entered = await db_limiter.enter("org:o1", timeout=0)
+        db_limiter.exit("org:o1", entered)
+
+    asyncio.run(scenario())
+
+
+def test_limiter_caps_each_tenant_and_shares_by_weight():
+    limiter = FairLimiter("test", capacity=2, per_tenant=2, weights={"b": 2.0})
+    order = []
+
+    async def work(tenant, hold):
+        async with limiter.slot(tenant):
+            order.append(tenant)
+            await hold.wait()
+
+    async def scenario():
+        hold = asyncio.Event()
+        # "a" takes both slots, then queues a burst; "b" arrives later.
+        tasks = [asyncio.ensure_future(work("a", hold)) for _ in range(8)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.ensure_future(work("b", hold)) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert order == ["a", "a"]
+        assert limiter.snapshot()["a"]["queued"] == 6
+        hold.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    # b is not stuck behind a's burst and, once queued, gets two admissions
+    # for each of a's.
+    assert order[2:8] == ["b", "a", "b", "b", "a", "b"]
+    assert limiter.snapshot() == {}
+
+
+def test_limiter_per_tenant_cap_leaves_room_for_others():
+    limiter = FairLimiter("test", capacity=3, per_tenant=1)
+
+    async def scenario():
+        await limiter.acquire("a")
+        waiting = asyncio.ensure_future(limiter.acquire("a"))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        await asyncio.wait_for(limiter.acquire("b"), 0.1)
+        with pytest.raises(TenantBusyError):
+            await limiter.enter("a", timeout=0.01)
+        limiter.release("a", 0.0)
+        await asyncio.wait_for(waiting, 0.1)
+        return limiter.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["a"] == {"running": 1, "queued": 0, "weight": 1.0}
+
+
+def test_fanout_round_robins_tenants_in_order():
+    fanout = TenantFanout("test", workers=1, per_tenant=1, queue_size=3)
+    seen = []
+
+    dropped = []
+
+    def job(tenant, n):
+        async def run():
+            seen.append((tenant, n))
+
+        return run
+
+    async def scenario():
+        for n in range(5):
+            fanout.submit("big", job("big", n), lambda n=n: dropped.append(n))
+        fanout.submit("small", job("small", 0))
+        fanout.submit("small", job("small", 1))
+        assert fanout.depths() == {"big": 3, "small": 2}
+        worker = asyncio.ensure_future(fanout.run())
+        while fanout.depths():
+            await asyncio.sleep(0)
+        worker.cancel()
+
+    asyncio.run(scenario())
+    # Oldest "big" jobs were dropped; tenants alternate, each in order.
+    assert dropped == [0, 1]
+    assert seen == [
+        ("big", 2),
+        ("small", 0),
+        ("big", 3),
+        ("small", 1),
+        ("big", 4),
+    ]
@@ -0,0 +1,152 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.internal.user_changes import (
+    UserChangeFilter,
+    UserChangeIndex,
+    changed_columns,
+)
+from app.internal.ws_connections import ConnectionRegistry, SubscriptionQueue
+
+
+def _update(user_id, org_id, **changes):
+    old = {"id": user_id, "organization_id": org_id, "email": "a@x", "name": "A"}
+    return {"operation": "UPDATE", "data": {**old, **changes}, "old_data": old}
+
+
+def _queue(registry):
+    return SubscriptionQueue(registry.open("watcher"), maxsize=10)
+
+
+def test_changed_columns():
+    assert changed_columns(_update("1", "o1", name="B")) == {"name"}
+    assert changed_columns({"data": {"id": "1", "email": "x"}}) == {"id", "email"}
+
+
+def test_routes_only_to_matching_subscribers():
+    registry = ConnectionRegistry()
+    index = UserChangeIndex()
+    by_user, by_org, other_org, by_column = (_queue(registry) for _ in range(4))
+    index.add(UserChangeFilter(user_ids=["1"]), by_user)
+    index.add(UserChangeFilter(organization_ids=["o1"]), by_org)
+    index.add(UserChangeFilter(organization_ids=["o2"]), other_org)
+    sub = index.add(UserChangeFilter(changed_columns=["email"]), by_column)
+
+    assert index.publish("user_updated", _update("1", "o1", name="B")) == 2
+    assert by_user.pending == 1 and by_org.pending == 1
+    assert other_org.pending == 0 and by_column.pending == 0
+
+    assert index.publish("user_updated", _update("2", "o2", email="b@x")) == 2
+    assert other_org.pending == 1 and by_column.pending == 1
+
+    index.remove(sub)
+    assert index.sizes() == (1, 2, 0)
+
+
+class _NoScan(dict):
+    """Index dict that fails if anything walks all of its keys."""
+
+    def __iter__(self):
+        raise AssertionError("walked the whole index")
+
+    items = keys = values = __iter__
+
+
+def test_remove_touches_only_the_subscribers_buckets():
+    registry = ConnectionRegistry()
+    index = UserChangeIndex()
+    index._by_user, index._by_org = _NoScan(), _NoScan()
+    mine, other, org, everyone = (_queue(registry) for _ in range(4))
+    sub = index.add(UserChangeFilter(user_ids=["1", "2"]), mine)
+    index.add(UserChangeFilter(user_ids=["2"]), other)
+    by_org = index.add(UserChangeFilter(organization_ids=["o1"]), org)
+    anyone = index.add(UserChangeFilter(), everyone)
+
+    index.remove(sub)
+    assert "1" not in index._by_user
+    assert len(index._by_user["2"]) == 1
+    index.remove(by_org)
+    assert "o1" not in index._by_org
+    index.remove(anyone)
+    assert not index._unindexed
+    # Removing twice is harmless.
+    index.remove(sub)
+
+
+def test_unknown_ops_are_rejected_with_a_code():
+    pytest.importorskip("platform_common")
+    from app.graphql.schema import user_schema
+    from app.internal.user_changes import UnknownUserChangeOpError
+
+    info = SimpleNamespace(context={"current_user": SimpleNamespace(id="1")})
+    where = user_schema.UserChangeFilterInput(ops=["user_updated", "user_renamed"])
+    with pytest.raises(UnknownUserChangeOpError) as excinfo:
+        user_schema._scoped_filter(info, where)
+    assert excinfo.value.extensions == {"code": "UNKNOWN_USER_CHANGE_OP"}
+    assert "user_renamed" in excinfo.value.message
+
+
+def test_payload_trimmed_once_per_column_set():
+    registry = ConnectionRegistry()
+    index = UserChangeIndex()
+    a, b, full = (_queue(registry) for _ in range(3))
+    index.add(UserChangeFilter(ops=["user_updated"], columns=["name"]), a)
+    index.add(UserChangeFilter(columns=["name"]), b)
+    index.add(UserChangeFilter(), full)
+
+    assert index.publish("user_deleted", _update("1", "o1", name="B")) == 2
+    index.publish("user_updated", _update("1", "o1", name="C"))
+
+    async def last(queue):
+        item = None
+        while queue.pending:
+            item = await queue.get()
+        return item[1]
+
+    from_a, from_b = asyncio.run(last(a)), asyncio.run(last(b))
+    assert from_a is from_b
+    assert from_a["data"] == {"id": "1", "name": "C"}
+    assert "email" in asyncio.run(last(full))["data"]
+
+
+def test_subscriber_gets_a_resync_marker_for_dropped_changes(monkeypatch):
+    pytest.importorskip("platform_common")
+    from app.core.config import get_service_settings
+    from app.graphql.schema import user_schema
+    from app.internal.ws_connections import ws_connections
+
+    monkeypatch.setenv("GRAPHQL_WS_SUBSCRIPTION_QUEUE_SIZE", "1")
+    get_service_settings.cache_clear()
+    index = UserChangeIndex()
+    monkeypatch.setattr(user_schema, "user_change_index", index)
+
+    async def run():
+        ctx = {"ws_connection": ws_connections.open("watcher")}
+        changes = user_schema._stream(
+            SimpleNamespace(context=ctx), "user_changes", UserChangeFilter()
+        )
+        first = asyncio.ensure_future(changes.__anext__())
+        await asyncio.sleep(0)  # subscribed, waiting for a change
+
+        assert index.publish("user_updated", _update("1", "o1", name="B")) == 1
+        # The queue holds one change: these two are dropped.
+        assert index.publish("user_updated", _update("1", "o1", name="C")) == 0
+        assert index.publish("user_updated", _update("1", "o1", name="D")) == 0
+
+        received = [
+            await asyncio.wait_for(first, 1),
+            await asyncio.wait_for(changes.__anext__(), 1),
+        ]
+        await changes.aclose()
+        ws_connections.close(ctx["ws_connection"])
+        return received
+
+    try:
+        first, marker = asyncio.run(run())
+    finally:
+        get_service_settings.cache_clear()
+    assert first.payload["data"]["name"] == "B" and not first.resync_required
+    assert marker.resync_required
+    assert marker.operation == user_schema.RESYNC_OPERATION
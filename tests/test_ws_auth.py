@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("platform_common")
+
+from platform_common.errors.base import AuthError, ForbiddenError  # noqa: E402
+from strawberry.exceptions import ConnectionRejectionError  # noqa: E402
+
+from app.auth import ws_auth  # noqa: E402
+from app.graphql.dashboard import subscription  # noqa: E402
+from app.graphql.router import AppGraphQLRouter  # noqa: E402
+from app.resolvers import datastore_resolvers  # noqa: E402
+
+
+@pytest.fixture
+def users(monkeypatch):
+    """Tokens are user ids; `loads` counts user rows read from the DB."""
+    rows = {"u1": SimpleNamespace(id="u1", name="first")}
+    loads = []
+
+    def decode(token):
+        if token not in rows:
+            raise AuthError("Invalid or expired token")
+        return {"sub": token, "session_id": f"s-{token}"}
+
+    async def load(user_id):
+        loads.append(user_id)
+        return rows[user_id]
+
+    monkeypatch.setattr(ws_auth, "decode_access_token", decode)
+    monkeypatch.setattr(ws_auth, "load_user", load)
+    return SimpleNamespace(rows=rows, loads=loads)
+
+
+def _connect(ctx, params):
+    ctx.connection_params = params
+    # on_ws_connect does not use the router instance.
+    return AppGraphQLRouter.on_ws_connect(None, ctx)
+
+
+def test_socket_without_credentials_is_rejected(users, context_socket):
+    async def run():
+        async with context_socket() as (ctx, _):
+            assert ctx.ws_identity is None
+            with pytest.raises(ConnectionRejectionError):
+                await _connect(ctx, {})
+            with pytest.raises(ConnectionRejectionError):
+                await _connect(ctx, {"accessToken": "nobody"})
+
+    asyncio.run(run())
+
+
+def test_connection_init_payload_authenticates_the_socket(users, context_socket):
+    async def run():
+        async with context_socket() as (ctx, _):
+            await _connect(ctx, {"Authorization": "Bearer u1"})
+            assert ctx.ws_identity.user_id == "u1"
+            assert ctx.session_id == "s-u1"
+            assert ctx.current_user is users.rows["u1"]
+            assert ctx.ws_connection.user_id == "u1"
+
+    asyncio.run(run())
+
+
+def test_identity_is_released_when_the_socket_closes(users, context_socket):
+    async def run():
+        async with context_socket() as (first, _):
+            await _connect(first, {"token": "u1"})
+            async with context_socket() as (second, _):
+                await _connect(second, {"token": "u1"})
+                assert ws_auth._USERS["u1"].refs == 2
+            assert ws_auth._USERS["u1"].refs == 1
+        assert "u1" not in ws_auth._USERS
+
+    asyncio.run(run())
+    # Both sockets shared one user row.
+    assert users.loads == ["u1"]
+
+
+def test_invalidate_user_reloads_on_the_next_operation(users):
+    async def run():
+        identity = await ws_auth.authenticate_connection("u1")
+        try:
+            await identity.current_user()
+            assert users.loads == ["u1"]
+
+            users.rows["u1"] = SimpleNamespace(id="u1", name="renamed")
+            ws_auth.invalidate_user("u1")
+            assert (await identity.current_user()).name == "renamed"
+            assert (await identity.current_user()).name == "renamed"
+            assert users.loads == ["u1", "u1"]
+        finally:
+            identity.release()
+
+    asyncio.run(run())
+
+
+def _subscriptions(datastore_id, info):
+    sub = subscription.Subscription
+    return [
+        sub.datastore_updated(None, datastore_id, info),
+        sub.datastore_deltas(None, datastore_id, info),
+        sub.file_status_updated(None, datastore_id, None, info),
+    ]
+
+
+def test_subscriptions_check_the_datastore_belongs_to_the_user(monkeypatch):
+    async def load(datastore_id):
+        return SimpleNamespace(id=datastore_id, user_id="owner")
+
+    monkeypatch.setattr(datastore_resolvers, "_load_datastore", load)
+
+    async def run():
+        anonymous = SimpleNamespace(context={"current_user": None})
+        for events in _subscriptions("ds-authz", anonymous):
+            with pytest.raises(AuthError):
+                await events.__anext__()
+
+        other = SimpleNamespace(context={"current_user": SimpleNamespace(id="u2")})
+        for events in _subscriptions("ds-authz", other):
+            with pytest.raises(ForbiddenError):
+                await events.__anext__()
+
+    asyncio.run(run())
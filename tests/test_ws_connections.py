@@ -0,0 +1,208 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.internal.ws_connections import (
+    SLOW_CONSUMER_CLOSE_CODE,
+    ConnectionRegistry,
+    SlowConsumerError,
+    SubscriptionLimitError,
+    SubscriptionQueue,
+)
+
+
+class _Ctx(dict):
+    pass
+
+
+def test_subscription_caps(monkeypatch):
+    monkeypatch.setenv("GRAPHQL_WS_MAX_SUBSCRIPTIONS_PER_CONNECTION", "2")
+    monkeypatch.setenv("GRAPHQL_WS_MAX_SUBSCRIPTIONS_PER_USER", "3")
+    from app.core.config import get_service_settings
+
+    get_service_settings.cache_clear()
+    try:
+        registry = ConnectionRegistry()
+        a = registry.open("u1")
+        b = registry.open("u1")
+
+        with registry.subscription(_Ctx(ws_connection=a), "x"):
+            with registry.subscription(_Ctx(ws_connection=a), "y"):
+                with pytest.raises(SubscriptionLimitError):
+                    with registry.subscription(_Ctx(ws_connection=a), "z"):
+                        pass
+                with registry.subscription(_Ctx(ws_connection=b), "x"):
+                    with pytest.raises(SubscriptionLimitError):
+                        with registry.subscription(_Ctx(ws_connection=b), "y"):
+                            pass
+        assert a.active_subscriptions == 0
+        assert b.active_subscriptions == 0
+    finally:
+        get_service_settings.cache_clear()
+
+
+def test_queue_accounting_and_drops():
+    async def run():
+        registry = ConnectionRegistry()
+        conn = registry.open("u1")
+        q = SubscriptionQueue(conn, maxsize=2)
+
+        assert q.offer("a" * 100)
+        assert q.offer("b" * 100)
+        assert not q.offer("c")
+        assert conn.queued_events == 2
+        assert conn.dropped_total == 1
+        queued = conn.queued_bytes
+
+        assert await q.get() == "a" * 100
+        assert conn.queued_events == 1
+        assert conn.events_total == 1
+        assert conn.queued_bytes < queued
+
+        q.discard()
+        assert conn.queued_events == 0
+        assert conn.queued_bytes == 0
+        assert registry.heaviest(1)[0]["connection_id"] == conn.connection_id
+
+    asyncio.run(run())
+
+
+def test_dropped_events_surface_as_one_resync_marker():
+    async def run():
+        conn = ConnectionRegistry().open("u1")
+        q = SubscriptionQueue(conn, maxsize=2, resync=lambda: "resync")
+
+        assert q.offer("a")
+        assert q.offer("b")
+        assert not q.offer("c")
+        assert not q.offer("d")
+        assert conn.queued_events == 2
+
+        # Queued events first, then one marker for the run of drops.
+        assert [await q.get() for _ in range(3)] == ["a", "b", "resync"]
+        assert q.offer("e")
+        assert await q.get() == "e"
+        assert conn.queued_events == 0
+        assert conn.queued_bytes == 0
+
+        # Too big for the connection's budget with nothing queued.
+        assert not q.offer("x" * 10_000_000)
+        assert await q.get() == "resync"
+
+    asyncio.run(run())
+
+
+def test_slow_consumer_is_coalesced_then_evicted(monkeypatch):
+    monkeypatch.setenv("GRAPHQL_WS_SLOW_CONSUMER_DEPTH", "3")
+    monkeypatch.setenv("GRAPHQL_WS_EVICT_CONSUMER_DEPTH", "5")
+    from app.core.config import get_service_settings
+
+    get_service_settings.cache_clear()
+
+    async def run():
+        closed = []
+
+        async def closer(code, reason):
+            closed.append((code, reason))
+
+        registry = ConnectionRegistry()
+        conn = registry.open("u1", closer)
+        q = SubscriptionQueue(conn, coalesce_key=lambda e: e[0])
+
+        for event in [("f1", 1), ("f2", 1), ("f1", 2)]:
+            q.offer(event)
+        # Third event crossed the slow threshold: f1 collapsed to its latest.
+        assert q.degraded
+        assert q.pending == 2
+        assert conn.queued_events == 2
+        assert q.offer(("f2", 2))
+        assert q.pending == 2
+
+        assert await q.get() == ("f1", 2)
+        assert await q.get() == ("f2", 2)
+        assert not q.degraded  # caught up
+
+        for i in range(3):
+            q.offer((f"g{i}", 0))
+        assert q.degraded
+        for i in range(3, 6):
+            q.offer((f"g{i}", 0))
+        assert q.evicted
+        await asyncio.sleep(0)
+        assert closed == [(SLOW_CONSUMER_CLOSE_CODE, "slow consumer")]
+        with pytest.raises(SlowConsumerError):
+            await q.get()
+
+        q.discard()
+        assert conn.queued_events == 0
+        assert conn.queued_bytes == 0
+        assert not conn.queues
+
+    try:
+        asyncio.run(run())
+    finally:
+        get_service_settings.cache_clear()
+
+
+def test_evicted_consumer_closes_its_socket(monkeypatch, context_socket):
+    monkeypatch.setenv("GRAPHQL_WS_SLOW_CONSUMER_DEPTH", "2")
+    monkeypatch.setenv("GRAPHQL_WS_EVICT_CONSUMER_DEPTH", "3")
+    from app.core.config import get_service_settings
+
+    get_service_settings.cache_clear()
+
+    async def run():
+        async with context_socket() as (ctx, websocket):
+            q = SubscriptionQueue(ctx.ws_connection)
+            for i in range(4):
+                q.offer(i)
+            assert q.evicted
+            await asyncio.sleep(0)
+            assert websocket.closed == [(SLOW_CONSUMER_CLOSE_CODE, "slow consumer")]
+            q.discard()
+
+    try:
+        asyncio.run(run())
+    finally:
+        get_service_settings.cache_clear()
+
+
+@pytest.mark.parametrize("rejection", ["over_cap", "draining"])
+def test_rejected_datastore_subscription_reads_nothing(monkeypatch, rejection):
+    pytest.importorskip("platform_common")
+    from app.core.config import get_service_settings
+    from app.graphql.dashboard import subscription
+    from app.internal.ws_connections import DrainingError
+
+    registry = ConnectionRegistry()
+    conn = registry.open("u1")
+    if rejection == "over_cap":
+        monkeypatch.setenv("GRAPHQL_WS_MAX_SUBSCRIPTIONS_PER_CONNECTION", "1")
+        get_service_settings.cache_clear()
+        registry.acquire(conn, "file_status_updated")
+    else:
+        registry.accepting = False
+    monkeypatch.setattr(subscription, "ws_connections", registry)
+    fetched = []
+
+    async def authorize(info, datastore_id):
+        pass
+
+    async def fetch(datastore_id):
+        fetched.append(datastore_id)
+
+    monkeypatch.setattr(subscription, "_authorize_datastore", authorize)
+    monkeypatch.setattr(subscription, "_fetch_datastore_snapshot", fetch)
+
+    async def run():
+        info = SimpleNamespace(context=_Ctx(ws_connection=conn))
+        events = subscription.Subscription.datastore_updated(None, "ds-rejected", info)
+        with pytest.raises((SubscriptionLimitError, DrainingError)):
+            await events.__anext__()
+
+    try:
+        asyncio.run(run())
+    finally:
+        get_service_settings.cache_clear()
+    assert fetched == []